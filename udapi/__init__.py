@@ -1,3 +1,34 @@
-from .core.document import Document
-from .core.run import create_block
-from .core.node import CycleError
+"""Udapi - Python framework for processing Universal Dependencies data.
+
+The most commonly used names (`Document`, `create_block` and `CycleError`)
+are imported lazily on the first access, so that `import udapi.core.node`
+or starting `udapy` does not need to load the whole framework.
+"""
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # for static analysis only, the names are imported lazily by __getattr__
+    from udapi.core.document import Document
+    from udapi.core.node import CycleError
+    from udapi.core.run import create_block
+
+_LAZY_ATTRS = {
+    'Document': 'udapi.core.document',
+    'create_block': 'udapi.core.run',
+    'CycleError': 'udapi.core.node',
+}
+
+__all__ = ['Document', 'create_block', 'CycleError']
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module 'udapi' has no attribute '{name}'")
+    import importlib
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
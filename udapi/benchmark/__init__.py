@@ -0,0 +1,7 @@
+"""Benchmarks of Udapi (not needed for the normal usage of Udapi).
+
+* `udapi.benchmark.align` compares the character alignment of `udapi.core.align` with difflib,
+* `udapi.benchmark.startup` measures the import time of udapy,
+* `udapi.benchmark.suite` measures the core hot paths (reading, writing, tree editing, blocks),
+* `udapi.benchmark.synthetic` generates synthetic CoNLL-U treebanks used by the suite.
+"""
@@ -0,0 +1,103 @@
+"""Benchmark of the character-level alignment (udapi.core.align) on long inputs.
+
+The alignment is compared with ``difflib.SequenceMatcher`` (used previously in ud.ComplyWithText)
+on pairs of long strings with a few differences, including the pathological case
+of many repeated characters, and ud.ComplyWithText is measured on long synthetic sentences
+whose text contains typos, missing spaces and extra punctuation.
+
+Usage:
+  python -m udapi.benchmark.align
+  python -m udapi.benchmark.align --lengths 20000 --repeat 1
+"""
+import argparse
+import difflib
+import logging
+import random
+import statistics
+import sys
+import time
+
+from udapi.benchmark.synthetic import generate_conllu
+from udapi.core.align import diff_opcodes
+from udapi.core.document import Document
+
+
+def perturb(text, rng, edits):
+    """Return the text with `edits` random character edits typical for tokenization mismatches."""
+    chars = list(text)
+    for _ in range(edits):
+        i = rng.randrange(len(chars))
+        choice = rng.random()
+        if choice < 0.3 and chars[i] == ' ':
+            del chars[i]
+        elif choice < 0.6:
+            chars.insert(i, rng.choice(',."'))
+        else:
+            chars[i] = rng.choice('aeiou')
+    return ''.join(chars)
+
+
+def _median_time(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def string_pairs(length, rng):
+    """Return a list of (name, a, b) pairs of strings of approximately the given length."""
+    words = generate_conllu(sentences=length // 50 + 1, seed=rng.random()).split()
+    text = ' '.join(w for w in words if w.isalpha())[:length]
+    repeated = ' '.join(rng.choice(('a', 'aa', 'a a')) for _ in range(length // 3))[:length]
+    return [
+        ('text, 5 edits', text, perturb(text, rng, 5)),
+        ('text, 1% edits', text, perturb(text, rng, length // 100)),
+        ('repeated chars, 5 edits', repeated, perturb(repeated, rng, 5)),
+    ]
+
+
+def comply_with_text_doc(words, rng):
+    """Return a document with one long sentence whose text does not match the tokens."""
+    doc = Document()
+    doc.from_conllu_string(generate_conllu(sentences=1, min_words=words, max_words=words,
+                                           seed=rng.random(), coref=False))
+    root = next(doc.trees)
+    root.text = perturb(root.compute_text(), rng, words // 50 + 1)
+    return doc
+
+
+def main(argv=None):
+    argparser = argparse.ArgumentParser(description=__doc__,
+                                        formatter_class=argparse.RawDescriptionHelpFormatter)
+    argparser.add_argument('--lengths', default='1000,5000',
+                           help='comma-separated lengths (in characters) of the aligned strings')
+    argparser.add_argument('--words', default='100,500',
+                           help='comma-separated lengths (in words) of sentences for ud.ComplyWithText')
+    argparser.add_argument('--repeat', type=int, default=3, help='the median time is reported')
+    argparser.add_argument('--seed', type=int, default=42, help='random seed')
+    args = argparser.parse_args(argv)
+    rng = random.Random(args.seed)
+
+    print(f'{"strings":<25} {"length":>7} {"difflib [s]":>12} {"align [s]":>10} {"speedup":>8}')
+    for length in (int(x) for x in args.lengths.split(',')):
+        for name, a, b in string_pairs(length, rng):
+            old = _median_time(lambda: difflib.SequenceMatcher(None, a, b, autojunk=False)
+                               .get_opcodes(), args.repeat)
+            new = _median_time(lambda: diff_opcodes(a, b), args.repeat)
+            print(f'{name:<25} {length:7d} {old:12.4f} {new:10.4f} {old / new:8.1f}')
+
+    # Imported here, so that the benchmark of strings works even without the `regex` module.
+    from udapi.block.ud.complywithtext import ComplyWithText
+    logging.disable(logging.CRITICAL)
+    print(f'\n{"ud.ComplyWithText":<25} {"words":>7} {"time [s]":>12}')
+    for words in (int(x) for x in args.words.split(',')):
+        docs = [comply_with_text_doc(words, rng) for _ in range(args.repeat)]
+        elapsed = _median_time(lambda: ComplyWithText().run(docs.pop()), args.repeat)
+        print(f'{"long sentence":<25} {words:7d} {elapsed:12.4f}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
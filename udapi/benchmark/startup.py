@@ -0,0 +1,106 @@
+"""Startup-time benchmark based on `python -X importtime`.
+
+Thousands of tiny udapy invocations (e.g. from Makefiles) pay the import cost of Udapi each time,
+so we want to keep it low. This benchmark imports the given modules in a fresh Python interpreter
+(several times, taking the median) and checks the cumulative import time against a budget.
+It also checks that modules which should be loaded lazily (visualizers, coreference)
+are not imported at startup.
+
+Usage:
+  python -m udapi.benchmark.startup
+  python -m udapi.benchmark.startup --budget_ms 60 --repeat 9 --top 15 udapi.cli udapi.core.document
+The exit code is 1 if the budget is exceeded or some lazy module was imported eagerly.
+"""
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+
+DEFAULT_MODULES = ['udapi.cli']
+
+# The cumulative import time of `udapi.cli` (what `udapy` loads before parsing the scenario)
+# is about 40 ms on a typical machine, most of it being the standard library (argparse, logging).
+DEFAULT_BUDGET_MS = 80
+
+# Modules which must not be imported just by starting udapy or importing udapi.core.document.
+LAZY_MODULES = [
+    'udapi.core.coref',
+    'udapi.block.write.textmodetrees',
+    'udapi.block.read.conllu',
+    'udapi.block.write.conllu',
+    'colorama',
+    'termcolor',
+]
+
+RE_IMPORTTIME = re.compile(r'^import time:\s*(\d+)\s*\|\s*(\d+)\s*\|( *)(\S+)')
+
+
+def measure_imports(modules):
+    """Import `modules` in a fresh interpreter and return a list of (module, self_us, cumul_us, level).
+
+    The level is the nesting depth of the import (0 for the top-level imports).
+    """
+    code = '; '.join(f'import {module}' for module in modules)
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          stderr=subprocess.PIPE, stdout=subprocess.DEVNULL, text=True, check=True)
+    result = []
+    for line in proc.stderr.splitlines():
+        match = RE_IMPORTTIME.match(line)
+        if match:
+            self_us, cumul_us, indent, name = match.groups()
+            result.append((name, int(self_us), int(cumul_us), len(indent) // 2))
+    return result
+
+
+def total_ms(records, modules):
+    """Return the cumulative import time (in ms) of the given top-level modules and all they import.
+
+    The interpreter startup (site, encodings,...) is not included.
+    """
+    prefixes = tuple(m.split('.')[0] for m in modules)
+    return sum(cumul for name, _, cumul, level in records
+               if level == 0 and name.startswith(prefixes)) / 1000
+
+
+def main(argv=None):
+    argparser = argparse.ArgumentParser(description=__doc__,
+                                        formatter_class=argparse.RawDescriptionHelpFormatter)
+    argparser.add_argument('modules', nargs='*', default=DEFAULT_MODULES,
+                           help='modules to import (default: %(default)s)')
+    argparser.add_argument('--budget_ms', type=float, default=DEFAULT_BUDGET_MS,
+                           help='maximal allowed median import time in ms (default: %(default)s)')
+    argparser.add_argument('--repeat', type=int, default=5,
+                           help='number of measurements, the median is reported (default: %(default)s)')
+    argparser.add_argument('--top', type=int, default=10,
+                           help='print this many modules with the highest self import time')
+    args = argparser.parse_args(argv)
+
+    # The first run warms up the filesystem cache and compiles *.pyc files.
+    measure_imports(args.modules)
+    runs = [measure_imports(args.modules) for _ in range(args.repeat)]
+    times = [total_ms(records, args.modules) for records in runs]
+    median = statistics.median(times)
+
+    records = runs[times.index(sorted(times)[len(times) // 2])]
+    if args.top:
+        print(f'{"self [ms]":>10} {"cumulative [ms]":>16}  module')
+        for name, self_us, cumul_us, level in sorted(records, key=lambda r: -r[1])[:args.top]:
+            print(f'{self_us / 1000:10.1f} {cumul_us / 1000:16.1f}  {"  " * level}{name}')
+
+    status = 0
+    imported = {name for name, _, _, _ in records}
+    eager = [m for m in LAZY_MODULES if m in imported]
+    if eager:
+        print('ERROR: these modules should be imported lazily: ' + ', '.join(eager))
+        status = 1
+    print(f'import {" ".join(args.modules)}: median {median:.1f} ms '
+          f'(min {min(times):.1f}, max {max(times):.1f}), budget {args.budget_ms:g} ms')
+    if median > args.budget_ms:
+        print('ERROR: the startup time budget was exceeded')
+        status = 1
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,308 @@
+"""Benchmarks of the core hot paths of Udapi with JSON results for regression tracking.
+
+A synthetic treebank (see `udapi.benchmark.synthetic`) of a given size is generated
+(or a real CoNLL-U file is used with `--treebank`) and the following operations are measured:
+reading and writing CoNLL-U, `node.descendants`, `node.shift_*`, `node.remove`,
+single-key lookups in not yet deserialized FEATS and MISC (`DualDict._lookup`), `compute_text`,
+loading and storing coreference annotation and several common `ud.*` blocks.
+Each benchmark is run `--repeat` times on a freshly loaded document (loading is not measured)
+and the median time is reported.
+
+The results can be stored (`--output`) as JSON and compared (`--compare`) with results
+of another commit. Only results measured on the same machine with the same parameters
+are comparable, of course.
+
+Usage:
+  python -m udapi.benchmark.suite --sentences 5000 --output before.json
+  git checkout my-optimization
+  python -m udapi.benchmark.suite --sentences 5000 --compare before.json --output after.json
+  python -m udapi.benchmark.suite --only 'shift|remove' --repeat 9
+  python -m udapi.benchmark.suite --only 'compute_text|lookup' --extra_misc 5
+The exit code is 1 if some benchmark is slower than in the `--compare` results
+by more than `--threshold` (relative, default 0.1, i.e. 10%).
+"""
+import argparse
+import datetime
+import gc
+import json
+import logging
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from udapi.benchmark.synthetic import generate_conllu
+from udapi.core.document import Document
+from udapi.core.run import find_block_class
+
+RESULTS_FORMAT = 'udapi-benchmark-1'
+
+DEFAULT_BLOCKS = ['ud.FixPunct', 'ud.MarkBugs', 'ud.FixChain', 'ud.Lemmatize',
+                  'ud.FixAdvmodByUpos', 'ud.AddPunctType', 'ud.SetSpaceAfterFromText']
+
+# name -> (function, setup), where setup is one of
+# 'file' (the function gets the treebank filename),
+# 'doc' (the function gets a freshly loaded document),
+# 'coref' (the same, but with coreference already loaded, i.e. doc.coref_entities called).
+BENCHMARKS = {}
+
+
+def benchmark(name, setup='doc'):
+    """Decorator registering a benchmark function."""
+    def decorator(func):
+        BENCHMARKS[name] = (func, setup)
+        return func
+    return decorator
+
+
+def _write_conllu(doc):
+    # Imported here, so that the import is not part of the first measurement.
+    from udapi.block.write.conllu import Conllu as ConlluWriter
+    with open(os.devnull, 'w', encoding='utf-8') as devnull:
+        ConlluWriter(filehandle=devnull).apply_on_document(doc)
+
+
+@benchmark('read.Conllu', setup='file')
+def bench_read_conllu(filename):
+    Document(filename)
+
+
+@benchmark('write.Conllu')
+def bench_write_conllu(doc):
+    _write_conllu(doc)
+
+
+@benchmark('descendants')
+def bench_descendants(doc):
+    for root in doc.trees:
+        for node in root.descendants:
+            node.descendants  # pylint: disable=pointless-statement
+            node.descendants(add_self=True)
+
+
+@benchmark('shift_subtree')
+def bench_shift_subtree(doc):
+    for root in doc.trees:
+        nodes = root.descendants
+        for i, node in enumerate(nodes):
+            reference = nodes[(i * 7 + 3) % len(nodes)]
+            if reference is not node:
+                if i % 2:
+                    node.shift_after_subtree(reference, skip_if_descendant=True)
+                else:
+                    node.shift_before_node(reference, skip_if_descendant=True)
+
+
+@benchmark('shift_node')
+def bench_shift_node(doc):
+    for root in doc.trees:
+        nodes = root.descendants
+        for i, node in enumerate(nodes):
+            reference = nodes[(i * 7 + 3) % len(nodes)]
+            if reference is not node:
+                node.shift_after_node(reference, without_children=True)
+
+
+@benchmark('remove')
+def bench_remove(doc):
+    for root in doc.trees:
+        for i, node in enumerate(root.descendants):
+            if i % 3 == 1:
+                node.remove(children='rehang')
+
+
+@benchmark('feats.lookup')
+def bench_feats_lookup(doc):
+    # pylint: disable=pointless-statement
+    # The document is freshly loaded, so FEATS and MISC are still strings
+    # and each key is found in the string without deserializing it.
+    for root in doc.trees:
+        for node in root.descendants:
+            feats, misc = node.feats, node.misc
+            feats['Case']
+            feats['Number']
+            feats['Typo']
+            misc['SpaceAfter']
+
+
+@benchmark('compute_text')
+def bench_compute_text(doc):
+    # Only SpaceAfter is needed from MISC, see --extra_misc for treebanks with large MISC columns.
+    for root in doc.trees:
+        root.compute_text()
+
+
+@benchmark('coref.load')
+def bench_coref_load(doc):
+    doc.coref_entities  # pylint: disable=pointless-statement
+
+
+@benchmark('coref.store', setup='coref')
+def bench_coref_store(doc):
+    _write_conllu(doc)
+
+
+def _block_benchmark(block_name):
+    block_class = find_block_class(block_name)
+
+    def bench_block(doc):
+        block_class().run(doc)
+    return bench_block
+
+
+def run_benchmarks(filename, names, repeat=5):
+    """Run the given benchmarks on the treebank `filename` and return a dict with the results.
+
+    The automatic garbage collection is disabled during the measurements (as in `udapy`).
+    """
+    results = {}
+    logging_disable = logging.root.manager.disable
+    # Some blocks (e.g. ud.MarkBugs) log a lot, but we want to measure their speed, not the logging.
+    logging.disable(logging.CRITICAL)
+    try:
+        for name in names:
+            if name in BENCHMARKS:
+                func, setup = BENCHMARKS[name]
+            else:
+                func, setup = _block_benchmark(name), 'doc'
+            times = []
+            for _ in range(repeat):
+                arg = filename
+                if setup != 'file':
+                    arg = Document(filename)
+                    if setup == 'coref':
+                        arg.coref_entities  # pylint: disable=pointless-statement
+                gc.collect()
+                gc_was_enabled = gc.isenabled()
+                gc.disable()
+                start = time.perf_counter()
+                func(arg)
+                times.append(time.perf_counter() - start)
+                if gc_was_enabled:
+                    gc.enable()
+                del arg
+            results[name] = {'median': statistics.median(times), 'min': min(times), 'repeat': repeat}
+    finally:
+        logging.disable(logging_disable)
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(__file__),
+                              stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold=0.1):
+    """Print a comparison of `results` with `baseline` and return the list of regressed benchmarks."""
+    if results['params'] != baseline['params']:
+        print(f'WARNING: different parameters: {baseline["params"]} vs. {results["params"]}')
+    if results['machine'] != baseline['machine']:
+        print(f'WARNING: different machines: {baseline["machine"]} vs. {results["machine"]}')
+    regressions = []
+    print(f'{"benchmark":<30} {"before [s]":>11} {"after [s]":>11} {"ratio":>7}')
+    for name, result in results['results'].items():
+        if name not in baseline['results']:
+            continue
+        before, after = baseline['results'][name]['median'], result['median']
+        ratio = after / before if before else float('inf')
+        mark = ''
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            mark = '  REGRESSION'
+        elif ratio < 1 - threshold:
+            mark = '  faster'
+        print(f'{name:<30} {before:11.4f} {after:11.4f} {ratio:7.2f}{mark}')
+    return regressions
+
+
+def main(argv=None):
+    argparser = argparse.ArgumentParser(description=__doc__,
+                                        formatter_class=argparse.RawDescriptionHelpFormatter)
+    argparser.add_argument('--sentences', type=int, default=2000,
+                           help='number of sentences of the synthetic treebank (default: %(default)s)')
+    argparser.add_argument('--max_words', type=int, default=40,
+                           help='maximal sentence length of the synthetic treebank')
+    argparser.add_argument('--seed', type=int, default=42, help='random seed of the synthetic treebank')
+    argparser.add_argument('--extra_misc', type=int, default=0,
+                           help='number of additional MISC attributes of each node (0-6)'
+                                ' of the synthetic treebank (default: %(default)s)')
+    argparser.add_argument('--treebank', help='use this CoNLL-U file instead of a synthetic treebank')
+    argparser.add_argument('--repeat', type=int, default=5,
+                           help='number of measurements, the median is reported (default: %(default)s)')
+    argparser.add_argument('--blocks', default=','.join(DEFAULT_BLOCKS),
+                           help='comma-separated list of blocks to benchmark (default: %(default)s)')
+    argparser.add_argument('--only', help='run only benchmarks whose name matches this regex')
+    argparser.add_argument('--output', help='store the results into this JSON file')
+    argparser.add_argument('--compare', metavar='JSON', help='compare the results with a previous run')
+    argparser.add_argument('--threshold', type=float, default=0.1,
+                           help='relative slowdown reported as a regression (default: %(default)s)')
+    args = argparser.parse_args(argv)
+
+    names = list(BENCHMARKS) + [b for b in args.blocks.split(',') if b]
+    if args.only:
+        names = [name for name in names if re.search(args.only, name)]
+
+    if args.treebank:
+        params = {'treebank': os.path.abspath(args.treebank)}
+        filename, tmp_dir = args.treebank, None
+    else:
+        params = {'sentences': args.sentences, 'max_words': args.max_words, 'seed': args.seed,
+                  'extra_misc': args.extra_misc}
+        tmp_dir = tempfile.TemporaryDirectory(prefix='udapi-benchmark-')
+        filename = os.path.join(tmp_dir.name, 'synthetic.conllu')
+        with open(filename, 'w', encoding='utf-8') as conllu:
+            conllu.write(generate_conllu(sentences=args.sentences, max_words=args.max_words,
+                                         seed=args.seed, extra_misc=args.extra_misc))
+    try:
+        doc = Document(filename)
+        nodes = sum(len(root.descendants) for root in doc.trees)
+        del doc
+        results = run_benchmarks(filename, names, args.repeat)
+    finally:
+        if tmp_dir is not None:
+            tmp_dir.cleanup()
+
+    for result in results.values():
+        result['nodes_per_s'] = round(nodes / result['median']) if result['median'] else None
+    results = {
+        'format': RESULTS_FORMAT,
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'machine': f'{platform.node()} {platform.machine()} {platform.processor()}'.strip(),
+        'params': params,
+        'nodes': nodes,
+        'results': results,
+    }
+
+    status = 0
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline.get('format') != RESULTS_FORMAT:
+            raise ValueError(f'{args.compare} is not a file with Udapi benchmark results')
+        if compare(results, baseline, args.threshold):
+            status = 1
+    else:
+        print(f'{"benchmark":<30} {"median [s]":>11} {"min [s]":>11} {"nodes/s":>11}')
+        for name, result in results['results'].items():
+            print(f'{name:<30} {result["median"]:11.4f} {result["min"]:11.4f} '
+                  f'{result["nodes_per_s"] or 0:11d}')
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            json.dump(results, output, indent=2)
+            output.write('\n')
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""Generator of synthetic CoNLL-U treebanks for benchmarking.
+
+The generated data is linguistically meaningless, but it has the features which matter
+for the speed of Udapi: random (mostly non-projective) trees of variable size,
+morphological features, multi-word tokens, empty nodes with enhanced dependencies,
+sentence-level comments (newdoc, newpar, sent_id, text) and coreference annotation
+(`Entity` in MISC, including multi-word mentions of entities spanning several sentences).
+Optionally, each node gets more MISC attributes (e.g. `Gloss`, `Translit`), as in treebanks
+with large MISC columns.
+The output is deterministic for a given seed, so results of benchmarks are comparable.
+
+Usage:
+  python -m udapi.benchmark.synthetic --sentences 10000 --seed 42 > synthetic.conllu
+"""
+import argparse
+import random
+import sys
+
+UPOS_DEPRELS = {
+    'NOUN': ('nsubj', 'obj', 'obl', 'nmod', 'conj'),
+    'PROPN': ('nsubj', 'obj', 'flat', 'nmod'),
+    'VERB': ('conj', 'advcl', 'ccomp', 'acl'),
+    'ADJ': ('amod',),
+    'ADV': ('advmod',),
+    'DET': ('det',),
+    'ADP': ('case',),
+    'PRON': ('nsubj', 'obj', 'iobj'),
+    'AUX': ('aux', 'cop'),
+    'CCONJ': ('cc',),
+    'PUNCT': ('punct',),
+}
+UPOS_LIST = list(UPOS_DEPRELS)
+UPOS_WEIGHTS = [25, 5, 12, 8, 5, 10, 10, 6, 4, 4, 11]
+FEATS = {
+    'NOUN': ('Gender=Fem|Number=Sing', 'Gender=Masc|Number=Plur', 'Number=Sing'),
+    'PROPN': ('Number=Sing', '_'),
+    'VERB': ('Mood=Ind|Number=Sing|Person=3|Tense=Pres|VerbForm=Fin', 'VerbForm=Inf'),
+    'ADJ': ('Degree=Pos|Gender=Fem|Number=Sing', 'Degree=Cmp'),
+    'DET': ('Definite=Def|PronType=Art', 'PronType=Dem'),
+    'PRON': ('Case=Nom|Number=Sing|Person=1|PronType=Prs', 'PronType=Rel'),
+    'AUX': ('Mood=Ind|Tense=Past|VerbForm=Fin',),
+}
+ENTITY_TYPES = ('person', 'organization', 'place', 'object', '')
+SYLLABLES = ('ka', 'ro', 'mi', 'tes', 'lu', 'van', 'de', 'sor', 'pi', 'nel', 'a', 'ut')
+EXTRA_MISC = ('Gloss', 'Translit', 'LTranslit', 'MSeg', 'Ref', 'Lang')
+
+
+def _word(rng):
+    return ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 4)))
+
+
+def _random_tree(rng, length):
+    """Return a list of parent ords (0 = root) of a random tree with one root child."""
+    order = list(range(1, length + 1))
+    rng.shuffle(order)
+    parents = [0] * (length + 1)
+    attached = [order[0]]
+    for ord_ in order[1:]:
+        # Prefer near heads, so the trees are not too flat and mostly (but not always) projective.
+        candidates = sorted(attached, key=lambda a: abs(a - ord_))[:3]
+        parents[ord_] = rng.choice(candidates) if rng.random() < 0.9 else rng.choice(attached)
+        attached.append(ord_)
+    return parents[1:]
+
+
+def generate_sentence_lines(rng, sent_id, length, mwt_ratio=0.03, empty_ratio=0.02,
+                            entities=None, mention_ratio=0.1, extra_misc=0):
+    """Return a list of CoNLL-U lines (without the final empty line) of one random sentence.
+
+    `entities` is a list of entity IDs shared across sentences (so that entities
+    have mentions in several sentences); new entities are appended to it.
+    `extra_misc` is the number of additional MISC attributes of each node (at most 6),
+    their values are derived from the form, so the random state is not affected.
+    """
+    parents = _random_tree(rng, length)
+    rows = []
+    for i in range(1, length + 1):
+        upos = 'PUNCT' if i == length else rng.choices(UPOS_LIST, UPOS_WEIGHTS)[0]
+        form = '.' if i == length else _word(rng)
+        if parents[i - 1] == 0:
+            upos, deprel = 'VERB', 'root'
+        else:
+            deprel = rng.choice(UPOS_DEPRELS[upos])
+        feats = rng.choice(FEATS[upos]) if upos in FEATS else '_'
+        misc = [f'{name}={form}{i}' for name in EXTRA_MISC[:extra_misc]]
+        if i < length - 1 and rng.random() < 0.05:
+            misc.append('SpaceAfter=No')
+        rows.append([str(i), form, form.lower(), upos, '_', feats,
+                     str(parents[i - 1]), deprel, '_', misc])
+
+    # Coreference mentions: spans of one to three words, not crossing each other.
+    if entities is not None:
+        i = 0
+        while i < length - 1:
+            if rng.random() < mention_ratio:
+                span = min(rng.randint(1, 3), length - 1 - i)
+                if entities and rng.random() < 0.6:
+                    eid = rng.choice(entities[-50:])
+                else:
+                    eid = f'{sent_id.split("-")[0]}e{len(entities) + 1}'
+                    entities.append(eid)
+                etype = ENTITY_TYPES[int(eid.rsplit('e', 1)[1]) % len(ENTITY_TYPES)]
+                head = rng.randint(1, span)
+                if span == 1:
+                    rows[i][9].append(f'Entity=({eid}-{etype}-{head})')
+                else:
+                    rows[i][9].append(f'Entity=({eid}-{etype}-{head}')
+                    rows[i + span - 1][9].append(f'Entity={eid})')
+                i += span
+            i += 1
+
+    lines, text = [], []
+    mwt_start = None
+    for i, row in enumerate(rows, 1):
+        if mwt_start is None and i < length - 1 and rng.random() < mwt_ratio:
+            mwt_start = i
+            for word_misc in (rows[i - 1][9], rows[i][9]):
+                if 'SpaceAfter=No' in word_misc:
+                    word_misc.remove('SpaceAfter=No')
+            mwt_form = rows[i - 1][1] + rows[i][1]
+            lines.append(f'{i}-{i + 1}\t{mwt_form}\t_\t_\t_\t_\t_\t_\t_\t_')
+            text.append(mwt_form + ' ')
+        elif mwt_start is None:
+            no_space = 'SpaceAfter=No' in row[9]
+            text.append(row[1] + ('' if no_space or i == length else ' '))
+        elif i == mwt_start + 1:
+            mwt_start = None
+        misc = '|'.join(sorted(row[9])) or '_'
+        lines.append('\t'.join(row[:9] + [misc]))
+        if rng.random() < empty_ratio:
+            lines.append(f'{i}.1\t{_word(rng)}\t_\tVERB\t_\t_\t_\t_\t{row[6]}:conj\t_')
+    header = [f'# sent_id = {sent_id}', '# text = ' + ''.join(text).rstrip()]
+    return header + lines
+
+
+def generate_conllu(sentences=1000, min_words=3, max_words=40, sentences_per_doc=100,
+                    sentences_per_par=5, seed=42, coref=True, **kwargs):
+    """Return a string with a synthetic treebank in CoNLL-U.
+
+    Sentence lengths are uniformly distributed between `min_words` and `max_words`.
+    Other keyword arguments are passed to `generate_sentence_lines`.
+    """
+    rng = random.Random(seed)
+    output, entities = [], None
+    for number in range(1, sentences + 1):
+        doc_number = (number - 1) // sentences_per_doc + 1
+        if (number - 1) % sentences_per_doc == 0:
+            output.append(f'# newdoc id = doc{doc_number}')
+            if coref:
+                output.append('# global.Entity = eid-etype-head-other')
+                entities = []
+        if (number - 1) % sentences_per_par == 0:
+            output.append(f'# newpar id = doc{doc_number}-p{(number - 1) // sentences_per_par + 1}')
+        length = rng.randint(min_words, max_words)
+        output.extend(generate_sentence_lines(rng, f'doc{doc_number}-s{number}', length,
+                                              entities=entities, **kwargs))
+        output.append('')
+    return '\n'.join(output) + '\n'
+
+
+def main(argv=None):
+    argparser = argparse.ArgumentParser(description=__doc__,
+                                        formatter_class=argparse.RawDescriptionHelpFormatter)
+    argparser.add_argument('--sentences', type=int, default=1000, help='number of sentences')
+    argparser.add_argument('--min_words', type=int, default=3, help='minimal sentence length')
+    argparser.add_argument('--max_words', type=int, default=40, help='maximal sentence length')
+    argparser.add_argument('--sentences_per_doc', type=int, default=100,
+                           help='start a new document (newdoc) after this many sentences')
+    argparser.add_argument('--seed', type=int, default=42, help='random seed')
+    argparser.add_argument('--no_coref', action='store_true', help='no coreference annotation')
+    argparser.add_argument('--extra_misc', type=int, default=0,
+                           help='number of additional MISC attributes of each node (0-6)')
+    args = argparser.parse_args(argv)
+    sys.stdout.write(generate_conllu(
+        sentences=args.sentences, min_words=args.min_words, max_words=args.max_words,
+        sentences_per_doc=args.sentences_per_doc, seed=args.seed, coref=not args.no_coref,
+        extra_misc=args.extra_misc))
+
+
+if __name__ == '__main__':
+    main()
@@ -27,6 +27,15 @@ class MiscStats(Block):
             self.valuecounter[shortattrname][node.misc[attrname]] += 1
             self.totalcounter[shortattrname] += 1
 
+    def export_state(self):
+        return {'valuecounter': {name: dict(c) for name, c in self.valuecounter.items()},
+                'totalcounter': dict(self.totalcounter)}
+
+    def merge_state(self, state):
+        for attrname, values in state['valuecounter'].items():
+            self.valuecounter.setdefault(attrname, Counter()).update(values)
+        self.totalcounter.update(state['totalcounter'])
+
     def process_end(self):
         for attrname in self.valuecounter:
             print()
@@ -113,6 +113,31 @@ class Stats(Block):
                     doc_words = 0
                 doc_words += len(tree.descendants)
 
+    def export_state(self):
+        if self.per_doc:
+            raise ValueError('corefud.Stats per_doc=1 prints the statistics after each document, '
+                             'so there is no state to be exported')
+        return {'counter': dict(self.counter), 'mentions': self.mentions, 'entities': self.entities,
+                'singletons': self.singletons, 'total_nodes': self.total_nodes,
+                'longest_mention': self.longest_mention, 'longest_entity': self.longest_entity,
+                'm_words': self.m_words, 'entity_ranges': self.entity_ranges}
+
+    def merge_state(self, state):
+        # max_words_per_doc is a maximum, not a sum.
+        max_words_per_doc = max(self.counter['max_words_per_doc'],
+                                state['counter'].get('max_words_per_doc', 0))
+        self.counter.update(state['counter'])
+        if max_words_per_doc:
+            self.counter['max_words_per_doc'] = max_words_per_doc
+        self.mentions += state['mentions']
+        self.entities += state['entities']
+        self.singletons += state['singletons']
+        self.total_nodes += state['total_nodes']
+        self.longest_mention = max(self.longest_mention, state['longest_mention'])
+        self.longest_entity = max(self.longest_entity, state['longest_entity'])
+        self.m_words += state['m_words']
+        self.entity_ranges.extend(state['entity_ranges'])
+
     def after_process_document(self, doc):
         if self.per_doc:
             self.process_end(skip=False, doc=doc)
@@ -199,6 +199,12 @@ class Conll18(BaseWriter):
                 return False
         return True
 
+    def export_state(self):
+        return {'total_count': dict(self.total_count)}
+
+    def merge_state(self, state):
+        self.total_count.update(state['total_count'])
+
     def process_end(self):
         if not self.print_results:
             return
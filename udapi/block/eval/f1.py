@@ -156,6 +156,25 @@ class F1(BaseWriter):
                 self._pred[x] += 1
                 self._total[x] += 1
 
+    def export_state(self):
+        state = {'correct': self.correct, 'pred': self.pred, 'gold': self.gold,
+                 'visited_zones': dict(self.visited_zones)}
+        if self.details:
+            state.update(common=dict(self._common), pred_tokens=dict(self._pred),
+                         gold_tokens=dict(self._gold), total=dict(self._total))
+        return state
+
+    def merge_state(self, state):
+        self.correct += state['correct']
+        self.pred += state['pred']
+        self.gold += state['gold']
+        self.visited_zones.update(state['visited_zones'])
+        if self.details:
+            self._common.update(state['common'])
+            self._pred.update(state['pred_tokens'])
+            self._gold.update(state['gold_tokens'])
+            self._total.update(state['total'])
+
     @property
     def f1(self):
         pred, gold = self.pred or 1, self.gold or 1  # prevent division by zero
@@ -7,6 +7,9 @@ import udapi.block.read.conllu
 from udapi.core.root import Root
 from udapi.core.node import Node
 
+# Standard node attributes which are passed to the Node constructor.
+NODE_ATTRS = ('form', 'lemma', 'upos', 'xpos', 'feats', 'deprel', 'misc')
+
 
 class Conll(udapi.block.read.conllu.Conllu):
     """A reader of the CoNLL-U files."""
@@ -40,17 +43,97 @@ class Conll(udapi.block.read.conllu.Conllu):
             For CoNLL-2009 you can use `attributes=ord,form,lemma,_,upos,_,feats,_,head,_,deprel`.
             You will loose the predicted_* attributes and semantic/predicate annotation.
 
-            TODO: allow storing the rest of columns in misc, e.g. `node.misc[feats]`
-            for feats which do not use the name1=value1|name2=value2 format.
+            Columns with other names (e.g. `attributes=ord,form,...,misc,parseme:mwe`)
+            are stored in a side table of each tree, see `Node.get_column`.
         """
         super().__init__(**kwargs)
         self.node_attributes = attributes.split(',')
         self.separator = separator
+        # Values "_" in the FORM column are stored as None (like in other columns).
+        self.keep_underscore_form = False
+        self._compiled_attributes = None
+
+    def compile_row_parser(self):
+        """Compile `self.node_attributes` into a specialized function creating a node from fields.
+
+        The function `parse_row(fields, root)` creates a new node with all the standard attributes
+        (form, lemma, upos, xpos, feats, deprel and misc) set in one constructor call,
+        appends it to `root._descendants` (the dependency parent is set later)
+        and stores the values of extra columns in the side table of the tree.
+        Column indices are hard-coded in the function, so there is no per-column dispatch
+        when reading each line.
+        Columns "ord", "head" and "deps" (and extra columns not stored in the side table)
+        are handled in `parse_node_line` using the indices stored by this method.
+        """
+        self._ord_index = self._head_index = self._deps_index = self._misc_index = None
+        self._extra_indices, self._extra_names = [], []
+        indices = {}
+        for index, name in enumerate(self.node_attributes):
+            if name == 'ord':
+                self._ord_index = index
+            elif name == 'head':
+                self._head_index = index
+            elif name == 'deps':
+                self._deps_index = index
+            elif name in NODE_ATTRS:
+                indices[name] = index
+                if name == 'misc':
+                    self._misc_index = index
+            elif name != '_':
+                self._extra_indices.append(index)
+                self._extra_names.append(self.extra_column_name(index))
+        self._extra_names = tuple(self._extra_names)
+        kwargs = []
+        for name, index in indices.items():
+            if name in ('feats', 'misc') or name == 'form' and self.keep_underscore_form:
+                kwargs.append(f"{name}=fields[{index}]")
+            else:
+                kwargs.append(f"{name}=None if fields[{index}] == '_' else fields[{index}]")
+        source = (f"def parse_row(fields, root):\n"
+                  f"    node = Node(root=root, {', '.join(kwargs)})\n"
+                  f"    descendants = root._descendants\n"
+                  f"    descendants.append(node)\n"
+                  f"    node._ord = len(descendants)\n")
+        self._table_in_parser = bool(self._extra_indices) and self.extra_columns_in_table()
+        if self._table_in_parser:
+            values = ''.join(f"fields[{index}], " for index in self._extra_indices)
+            source += (f"    if root._extra_values is None:\n"
+                       f"        root.extra_columns, root._extra_values = extra_names, {{}}\n"
+                       f"    root._extra_values[node] = ({values})\n")
+        source += "    return node\n"
+        namespace = {'Node': Node, 'extra_names': self._extra_names}
+        exec(source, namespace)  # pylint: disable=exec-used
+        self._parse_row = namespace['parse_row']
+        self._compiled_attributes = self.node_attributes
+
+    def extra_column_name(self, index):
+        """Return the name of the extra (non-standard) column with the given index."""
+        return self.node_attributes[index]
+
+    def extra_columns_in_table(self):
+        """Should the extra columns be stored in the side table of each tree?
+
+        If True (default), the compiled row parser stores them in `root._extra_values`
+        (see `Node.get_column`), otherwise `store_extra_columns` is called for each node.
+        """
+        return True
+
+    def store_extra_columns(self, node, values):
+        """Store the values of the extra columns of the node.
 
-    # pylint: disable=too-many-locals,too-many-branches,too-many-statements
-    # Maybe the code could be refactored, but it is speed-critical,
-    # so benchmarking is needed because calling extra methods may result in slowdown.
+        This is called only if `extra_columns_in_table` returns False.
+        This implementation stores the values in the side table of the tree anyway
+        (the same as the compiled row parser), subclasses can store them elsewhere,
+        e.g. read.Conllup stores them in MISC.
+        """
+        # pylint: disable=protected-access
+        root = node._root
+        if root._extra_values is None:
+            root.extra_columns, root._extra_values = self._extra_names, {}
+        root._extra_values[node] = values
 
+    # pylint: disable=too-many-branches
+    # The code is speed-critical, so benchmarking is needed before refactoring.
     def parse_node_line(self, line, root, nodes, parents, mwts):
         if self.separator == 'tab':
             fields = line.split('\t')
@@ -69,37 +152,45 @@ class Conll(udapi.block.read.conllu.Conllu):
             mwts.append(fields)
             return
         if '.' in fields[0]:
-            empty = root.create_empty_child(form=fields[1], lemma=fields[2], upos=fields[3],
-                                            xpos=fields[4], feats=fields[5], misc=fields[9])
-            empty.ord = fields[0]
-            empty.raw_deps = fields[8]  # TODO
+            self.parse_empty_node_line(fields, root)
             return
 
-        # This implementation is slower than in read.Conllu,
-        # but it allows for arbitrary columns
-        node = root.create_child()
-        for (n_attribute, attribute_name) in enumerate(self.node_attributes):
-            value = fields[n_attribute]
-            if attribute_name == 'head':
-                try:
-                    parents.append(int(value))
-                except ValueError as exception:
-                    if not self.strict and value == '_':
-                        if self.empty_parent == 'warn':
-                            logging.warning("Empty parent/head index in '%s'", line)
-                        parents.append(0)
-                    else:
-                        raise exception
-            elif attribute_name == 'ord':
-                if int(value) != node._ord:
-                    raise ValueError(f"Node {node} ord mismatch: {value}, but expecting {node._ord} at:\n{line}")
-            elif attribute_name == 'deps':
-                setattr(node, 'raw_deps', value)
-            elif attribute_name != '_' and value != '_':
-                setattr(node, attribute_name, value)
-
+        if self._compiled_attributes is not self.node_attributes:
+            self.compile_row_parser()
+        node = self._parse_row(fields, root)
+        if self._ord_index is not None and int(fields[self._ord_index]) != node._ord:
+            raise ValueError(f"Node {node} ord mismatch: {fields[self._ord_index]}, "
+                             f"but expecting {node._ord} at:\n{line}")
+        if self._deps_index is not None:
+            node._raw_deps = fields[self._deps_index]
+        if self._head_index is not None:
+            self.parse_head(fields[self._head_index], line, parents)
+        else:
+            parents.append(0)
+        if self._extra_indices and not self._table_in_parser:
+            self.store_extra_columns(node, tuple([fields[i] for i in self._extra_indices]))
         nodes.append(node)
 
+    def parse_head(self, value, line, parents):
+        """Append the parent index (HEAD) to `parents`."""
+        try:
+            parents.append(int(value))
+        except ValueError as exception:
+            if not self.strict and value == '_':
+                if self.empty_parent == 'warn':
+                    logging.warning("Empty parent/head index in '%s'", line)
+                parents.append(0)
+            else:
+                raise exception
+
+    @staticmethod
+    def parse_empty_node_line(fields, root):
+        """Create an empty node from the fields (in the CoNLL-U column order)."""
+        empty = root.create_empty_child(form=fields[1], lemma=fields[2], upos=fields[3],
+                                        xpos=fields[4], feats=fields[5], misc=fields[9])
+        empty.ord = fields[0]
+        empty.raw_deps = fields[8]  # TODO
+
     # Acknowledged code duplication with read.Conllu
     def read_tree_from_lines(self, lines):
         root = Root()
@@ -154,9 +245,14 @@ class Conll(udapi.block.read.conllu.Conllu):
             parent._children.append(node)
 
         # Create multi-word tokens.
+        misc_index = self._misc_index
         for fields in mwts:
             range_start, range_end = fields[0].split('-')
             words = nodes[int(range_start):int(range_end) + 1]
-            root.create_multiword_token(words, form=fields[1], misc=fields[-1])
+            mwt = root.create_multiword_token(words, form=fields[1],
+                                              misc=fields[misc_index] if misc_index is not None else None)
+            if self._table_in_parser:
+                # pylint: disable=unsupported-assignment-operation
+                root._extra_values[mwt] = tuple([fields[i] for i in self._extra_indices])
 
         return root
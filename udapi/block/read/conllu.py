@@ -20,7 +20,7 @@ RE_GLOBAL_ENTITY = re.compile(r'^# global.Entity\s*=\s*(\S+)')
 class Conllu(BaseReader):
     """A reader of the CoNLL-U files."""
 
-    def __init__(self, strict=False, empty_parent='warn', fix_cycles=False, **kwargs):
+    def __init__(self, strict=False, empty_parent='warn', fix_cycles=False, index='auto', **kwargs):
         """Create the Conllu reader object.
 
         Args:
@@ -28,11 +28,18 @@ class Conllu(BaseReader):
         empty_parent: What to do if HEAD is _? Default=warn: issue a warning and attach to the root
             or if strict=1 issue an exception. With `empty_parent=ignore` no warning is issued.
         fix_cycles: fix cycles by attaching a node in the cycle to the root; fix also HEAD index out of range
+        index: With `sent_id_filter`, use the sidecar index of byte offsets of sentences
+            (see `udapi.core.conlluindex`), so only the matching trees are read and parsed.
+            Default=auto: use the index if it exists and it is up to date.
+            index=1: build (and save) the index if needed. index=0: never use the index.
         """
         super().__init__(**kwargs)
         self.strict = strict
         self.empty_parent = empty_parent
         self.fix_cycles = fix_cycles
+        self.index = index
+        self._indexed_file_number = None
+        self._indexed_trees = None
 
     def parse_comment_line(self, line, root):
         """Parse one line of CoNLL-U and fill sent_id, text, newpar, newdoc in root."""
@@ -108,6 +115,54 @@ class Conllu(BaseReader):
                 lines.append(line)
         return trees
 
+    def filtered_read_tree(self):
+        if self.sent_id_filter is None or not self.index:
+            return super().filtered_read_tree()
+        if self._indexed_file_number != self.file_number:
+            self._indexed_file_number = self.file_number
+            self._indexed_trees = self.iter_indexed_trees()
+        if self._indexed_trees is None:
+            return super().filtered_read_tree()
+        return next(self._indexed_trees, None)
+
+    def iter_indexed_trees(self):
+        """Return an iterator over the trees of the current file matching `sent_id_filter`.
+
+        The trees are read using the sidecar index or None is returned if there is no index
+        (and `index=auto`) or the file cannot be indexed (e.g. STDIN or a compressed file).
+        """
+        from udapi.core.conlluindex import ConlluIndex, can_index
+        if not can_index(self.filename):
+            return None
+        index = ConlluIndex.load(self.filename, self.files.encoding)
+        if index is None:
+            if self.index == 'auto':
+                return None
+            index = ConlluIndex.open(self.filename, encoding=self.files.encoding)
+        return self._iter_index(index)
+
+    def _iter_index(self, index):
+        # The same semantics as BaseReader.filtered_read_tree, just the non-matching trees
+        # are not parsed unless they contain newdoc or other document-level comments.
+        skipped_newdoc = None
+        try:
+            for position, (_, _, sent_id, newdoc, doc_meta) in enumerate(index.entries):
+                if self.sent_id_filter.match(sent_id or '?') is None:
+                    if newdoc or doc_meta:
+                        tree = index.get_tree(position, self)
+                        if tree is not None and tree.newdoc:
+                            skipped_newdoc = tree.newdoc
+                    continue
+                tree = index.get_tree(position, self)
+                if tree is None:
+                    continue
+                if skipped_newdoc and not tree.newdoc:
+                    tree.newdoc = skipped_newdoc
+                skipped_newdoc = None
+                yield tree
+        finally:
+            index.close()
+
     def read_tree(self):
         if self.filehandle is None:
             return None
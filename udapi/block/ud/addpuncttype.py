@@ -4,7 +4,7 @@ punctuation symbols. This block can be used to add such features to data where
 they are missing – the classification is mostly deterministic. If the input
 data already contains such features, their values will be overwritten.
 """
-from udapi.core.block import Block
+from udapi.core.ruleblock import RuleBlock
 
 # TODO We need to know the language, there are many other quotation styles,
 #      e.g. Finnish and Swedish uses the same symbol for opening and closing: ”X”.
@@ -72,20 +72,20 @@ PUNCT_SIDES = {
 }
 
 
-class AddPunctType(Block):
+class AddPunctType(RuleBlock):
     """Add features PunctType and PunctSide where applicable."""
 
-    def process_node(self, node):
+    depends_on = ('upos', 'form')
+
+    def __init__(self, memoize=False, **kwargs):
+        # The decision is just two dict lookups, so memoizing it does not pay off by default.
+        super().__init__(memoize=memoize, **kwargs)
+
+    def decide(self, node):
         # The two features apply only to PUNCT. If they already occur elsewhere, erase them.
         if node.upos != 'PUNCT':
-            node.feats['PunctType'] = ''
-            node.feats['PunctSide'] = ''
-        else:
-            if node.form in PUNCT_TYPES:
-                node.feats['PunctType'] = PUNCT_TYPES[node.form]
-            else:
-                node.feats['PunctType'] = ''
-            if node.form in PUNCT_SIDES:
-                node.feats['PunctSide'] = PUNCT_SIDES[node.form]
-            else:
-                node.feats['PunctSide'] = ''
+            return '', ''
+        return PUNCT_TYPES.get(node.form, ''), PUNCT_SIDES.get(node.form, '')
+
+    def apply(self, node, decision):
+        node.feats['PunctType'], node.feats['PunctSide'] = decision
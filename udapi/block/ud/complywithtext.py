@@ -6,8 +6,8 @@ However, there may be also rare cases when it is not clear how to align the toke
 (nodes in the tree) with the raw text (stored in ``root.text``).
 This block tries to solve the general case using several heuristics.
 
-It starts with running a LCS-like algorithm (LCS = longest common subsequence)
-``difflib.SequenceMatcher`` on the raw text and concatenation of tokens' forms,
+It starts with running a LCS algorithm (LCS = longest common subsequence)
+``udapi.core.align.diff_opcodes`` on the raw text and concatenation of tokens' forms,
 i.e. on sequences of characters (as opposed to running LCS on sequences of tokens).
 
 To prevent mis-alignment problems, we keep the spaces present in the raw text
@@ -22,10 +22,10 @@ may result in énfase -> énfas.
 
 Author: Martin Popel
 """
-import difflib
 import logging
 import regex
 
+from udapi.core.align import diff_opcodes
 from udapi.core.block import Block
 from udapi.core.mwt import MWT
 
@@ -116,14 +116,20 @@ class ComplyWithText(Block):
             if self.previous_text_label:
                 root.add_comment(f'{self.previous_text_label} = {root.text}')
             root.text = text
-        if text == root.compute_text():
+        tree_chars, spans = root.char_spans()
+        if text == tree_chars:
             return
 
-        tree_chars, char_nodes = _nodes_to_chars(root.token_descendants)
+        # The first character of each token is mapped to the token, other characters to None.
+        char_nodes = [None] * len(tree_chars)
+        for token in root.token_descendants:
+            start = spans[token][0]
+            if start < len(char_nodes):
+                char_nodes[start] = token
 
-        # Align. difflib may not give LCS, but usually it is good enough.
-        matcher = difflib.SequenceMatcher(None, tree_chars, text, autojunk=False)
-        diffs = list(matcher.get_opcodes())
+        # Align. For very different (long) strings, diff_opcodes may not give LCS,
+        # but usually it is good enough.
+        diffs = diff_opcodes(tree_chars, text)
         _log_diffs(diffs, tree_chars, text, 'matcher')
 
         diffs = self.unspace_diffs(diffs, tree_chars, text)
@@ -317,18 +323,6 @@ class ComplyWithText(Block):
                 node.form = form
 
 
-def _nodes_to_chars(nodes):
-    chars, char_nodes = [], []
-    for node in nodes:
-        form = node.form
-        if node.misc['SpaceAfter'] != 'No' and node != nodes[-1]:
-            form += ' '
-        chars.extend(form)
-        char_nodes.append(node)
-        char_nodes.extend([None] * (len(form) - 1))
-    return ''.join(chars), char_nodes
-
-
 def _log_diffs(diffs, tree_chars, text, msg):
     if logging.getLogger().isEnabledFor(logging.DEBUG):
         logging.warning('=== After %s:', msg)
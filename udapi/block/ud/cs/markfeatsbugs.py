@@ -23,6 +23,11 @@ class MarkFeatsBugs(udapi.block.ud.markfeatsbugs.MarkFeatsBugs):
     # in the future.
     pdt20 = False # True = like in PDT 2.0; False = like in ČNK
 
+    def cache_key(self, node):
+        # The rules below depend on the lowercased form only for these UPOS tags.
+        upos, lemma, _, feats = super().cache_key(node)
+        return upos, lemma, node.form.lower() if upos in ('PRON', 'DET', 'VERB', 'AUX') else None, feats
+
     def process_node(self, node):
         # Czech constraints should not be applied to foreign words.
         if node.feats['Foreign'] == 'Yes':
@@ -2,102 +2,109 @@
 Block ud.FixAdvmodByUpos will change the dependency relation from advmod to something else
 if the UPOS is not ADV.
 """
-from udapi.core.block import Block
+from udapi.core.ruleblock import RuleBlock
 
 
-class FixAdvmodByUpos(Block):
+class FixAdvmodByUpos(RuleBlock):
     """
     Make sure advmod is not used with UPOS it should not be used with.
     """
 
-    def process_node(self, node):
+    depends_on = ('udeprel', 'upos', 'parent.upos', 'parent.udeprel')
+
+    def decide(self, node):
+        """Return the new deprel or None if it should not be changed."""
         if node.udeprel == 'advmod':
             if node.upos in ['NOUN', 'PROPN', 'PRON', 'DET', 'NUM']:
-                node.deprel = 'obl'
+                return 'obl'
             elif node.upos == 'VERB':
-                node.deprel = 'advcl'
+                return 'advcl'
             elif node.upos == 'AUX':
-                node.deprel = 'aux'
+                return 'aux'
             elif node.upos in ['ADP', 'SCONJ']:
                 if node.parent.upos == 'VERB':
-                    node.deprel = 'mark'
+                    return 'mark'
                 else:
-                    node.deprel = 'case'
+                    return 'case'
             elif node.upos == 'CCONJ':
-                node.deprel = 'cc'
+                return 'cc'
             elif node.upos == 'INTJ':
-                node.deprel = 'discourse'
+                return 'discourse'
             else:
-                node.deprel = 'dep'
+                return 'dep'
         ###!!! The following are not advmod so they should probably have their
         ###!!! own block or this block should have a different name.
         elif node.udeprel == 'expl':
             if node.upos == 'AUX':
-                node.deprel = 'aux'
+                return 'aux'
             elif node.upos == 'ADP':
-                node.deprel = 'case'
+                return 'case'
             elif node.upos == 'ADV':
-                node.deprel = 'advmod'
+                return 'advmod'
             elif node.upos == 'CCONJ':
-                node.deprel = 'cc'
+                return 'cc'
         elif node.udeprel in ['aux', 'cop']:
             if node.upos != 'AUX':
-                node.deprel = 'dep'
+                return 'dep'
         elif node.udeprel == 'case':
             if node.upos == 'ADJ':
-                node.deprel = 'amod'
+                return 'amod'
             elif node.upos == 'DET':
-                node.deprel = 'det'
+                return 'det'
             elif node.upos == 'PRON':
-                node.deprel = 'nmod'
+                return 'nmod'
         elif node.udeprel == 'mark':
             if node.upos in ['PRON', 'DET']:
-                node.deprel = 'nsubj' # it could be also obj, iobj, obl or nmod; just guessing what might be more probable
+                return 'nsubj' # it could be also obj, iobj, obl or nmod; just guessing what might be more probable
             elif node.upos == 'NOUN':
-                node.deprel = 'obl'
+                return 'obl'
             elif node.upos == 'ADJ':
-                node.deprel = 'amod'
+                return 'amod'
             elif node.upos == 'INTJ':
-                node.deprel = 'discourse'
+                return 'discourse'
         elif node.udeprel == 'cc':
             if node.upos == 'AUX':
-                node.deprel = 'aux'
+                return 'aux'
             elif node.upos == 'DET':
-                node.deprel = 'det'
+                return 'det'
             elif node.upos == 'INTJ':
-                node.deprel = 'discourse'
+                return 'discourse'
             elif node.upos == 'NOUN':
-                node.deprel = 'dep'
+                return 'dep'
         elif node.udeprel == 'det':
             if node.upos == 'NOUN':
-                node.deprel = 'nmod'
+                return 'nmod'
             elif node.upos == 'ADJ':
-                node.deprel = 'amod'
+                return 'amod'
             elif node.upos == 'NUM':
-                node.deprel = 'nummod'
+                return 'nummod'
             elif node.upos == 'ADV':
-                node.deprel = 'advmod'
+                return 'advmod'
             elif node.upos == 'AUX':
-                node.deprel = 'aux'
+                return 'aux'
             elif node.upos == 'VERB':
-                node.deprel = 'dep'
+                return 'dep'
             elif node.upos == 'SCONJ':
-                node.deprel = 'mark'
+                return 'mark'
             elif node.upos == 'CCONJ':
-                node.deprel = 'cc'
+                return 'cc'
             elif node.upos == 'X':
-                node.deprel = 'dep'
+                return 'dep'
         elif node.udeprel == 'nummod':
             if node.upos == 'ADJ':
-                node.deprel = 'amod'
+                return 'amod'
             elif node.upos == 'PRON':
-                node.deprel = 'nmod'
+                return 'nmod'
             elif node.upos == 'DET':
-                node.deprel = 'det'
+                return 'det'
             elif node.upos == 'ADP':
-                node.deprel = 'case'
+                return 'case'
         elif node.udeprel == 'punct':
             if node.upos != 'PUNCT':
-                node.deprel = 'dep'
+                return 'dep'
         elif node.udeprel == 'obl' and node.parent.upos in ['NOUN', 'PROPN', 'PRON'] and node.parent.udeprel in ['nsubj', 'obj', 'iobj', 'obl', 'vocative', 'dislocated', 'expl', 'nmod']:
-            node.deprel = 'nmod'
+            return 'nmod'
+        return None
+
+    def apply(self, node, decision):
+        node.deprel = decision
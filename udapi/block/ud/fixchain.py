@@ -12,6 +12,11 @@ class FixChain(Block):
         super().__init__(**kwargs)
         self.deprels = deprels.split(',')
 
+    @staticmethod
+    def is_tree_local():
+        """This block modifies each tree independently."""
+        return True
+
     def process_node(self, node):
         for deprel in self.deprels:
             if node.udeprel == deprel and node.parent.udeprel == deprel:
@@ -17,6 +17,11 @@ class FixPseudoCop(Block):
         self.lemmas = lemmas.split(',')
         self.noncopaux = noncopaux
 
+    @staticmethod
+    def is_tree_local():
+        """This block modifies each tree independently."""
+        return True
+
     def process_node(self, node):
         pseudocop = self.lemmas
         if node.lemma in pseudocop:
@@ -72,6 +72,11 @@ class FixPunct(Block):
             return True
         return False
 
+    @staticmethod
+    def is_tree_local():
+        """This block modifies each tree independently."""
+        return True
+
     def process_tree(self, root):
         # First, make sure no PUNCT has children.
         # This may introduce multiple subroots, which will be fixed later on
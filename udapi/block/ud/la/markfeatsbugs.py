@@ -24,6 +24,12 @@ class MarkFeatsBugs(udapi.block.ud.markfeatsbugs.MarkFeatsBugs):
         super().__init__(**kwargs)
         self.flavio = flavio
 
+    def cache_key(self, node):
+        # The rules below do not depend on the form,
+        # but the rules for verbs depend on MISC TraditionalMood.
+        upos, lemma, _, feats = super().cache_key(node)
+        return upos, lemma, node.misc['TraditionalMood'] if upos in ('VERB', 'AUX') else None, feats
+
     def process_node(self, node):
         rf = []
         af = {}
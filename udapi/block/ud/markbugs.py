@@ -61,133 +61,175 @@ class MarkBugs(Block):
         self.stats = collections.Counter()
         self.tests_re = re.compile(tests) if (tests is not None and tests != '') else None
         self.skip_re = re.compile(skip) if (skip is not None and skip != '') else None
+        # short_msg -> should it be reported (according to tests_re and skip_re)?
+        self._report = {}
         self.max_cop_lemmas = max_cop_lemmas
         self.cop_count = collections.Counter()
         self.cop_nodes = collections.defaultdict(list)
 
+    def _should_report(self, short_msg):
+        """Should the test `short_msg` be reported according to the `tests` and `skip` regexes?"""
+        report = self._report.get(short_msg)
+        if report is None:
+            report = ((self.tests_re is None or self.tests_re.search(short_msg) is not None)
+                      and (self.skip_re is None or self.skip_re.search(short_msg) is None))
+            self._report[short_msg] = report
+        return report
+
     def log(self, node, short_msg, long_msg):
         """Log node.address() + long_msg and add ToDo=short_msg to node.misc."""
-        if self.tests_re is not None and not self.tests_re.search(short_msg):
-            return
-        if self.skip_re is not None and self.skip_re.search(short_msg):
+        if not self._should_report(short_msg):
             return
-        logging.debug('node %s %s: %s', node.address(), short_msg, long_msg)
-        if node.misc['Bug']:
-            if short_msg not in node.misc['Bug']:
-                node.misc['Bug'] += ',' + short_msg
+        if logging.root.isEnabledFor(logging.DEBUG):
+            logging.debug('node %s %s: %s', node.address(), short_msg, long_msg)
+        bugs = node.misc['Bug']
+        if bugs:
+            if short_msg not in bugs:
+                node.misc['Bug'] = bugs + ',' + short_msg
         else:
             node.misc['Bug'] = short_msg
         self.stats[short_msg] += 1
 
-    # pylint: disable=too-many-branches, too-many-statements
-    def process_node(self, node):
-        form, udeprel, upos, feats = node.form, node.udeprel, node.upos, node.feats
-        parent = node.parent
-
-        for dep in ('aux', 'fixed', 'goeswith', 'list'):
-            if udeprel == dep and parent.udeprel == dep:
-                self.log(node, dep + '-chain', dep + ' dependencies should not form a chain.')
-
-        # 'appos-chain' is more difficult to test because nested appositions are allowed.
-        # The commented-out code below prevents just some of the false alarms
-        # (those where changing the nested appos into flat would result in non-projectivity).
-        # Unfortunatelly, there are still too many false alarms, so let's skip this test completely.
-        # It seems that multiple appositions as siblings are much less common than nested.
-        # if deprel == 'appos' and parent.deprel == 'appos':
-        #     if not node.precedes(parent.children[-1]):
-        #         self.log(node, 'appos-chain', 'appos should not form a chain except when nested.')
-
-        for dep in ('flat', 'fixed', 'conj', 'appos', 'goeswith', 'list'):
-            if udeprel == dep and node.precedes(parent):
-                self.log(node, dep + '-rightheaded',
-                         dep + ' relations should be left-headed, not right.')
+    def process_tree(self, tree):
+        nodes = tree.descendants
+        self._check_nodes(tree, nodes, enumerate(nodes, 1))
 
-        if udeprel == 'cop' and upos not in ('AUX', 'PRON'):
-            self.log(node, 'cop-upos', 'deprel=cop upos!=AUX|PRON (but %s)' % upos)
-
-        if udeprel == 'mark' and upos == 'PRON':
-            self.log(node, 'mark-upos', 'deprel=mark upos=PRON')
-
-        if udeprel == 'det' and upos not in ('DET', 'PRON'):
-            self.log(node, 'det-upos', 'deprel=det upos!=DET|PRON (but %s)' % upos)
-
-        if udeprel == 'punct' and upos != 'PUNCT':
-            self.log(node, 'punct-upos', 'deprel=punct upos!=PUNCT (but %s)' % upos)
-
-        for i_upos, i_feat in REQUIRED_FEATURE_FOR_UPOS.items():
-            if upos == i_upos and not feats[i_feat]:
+    def process_node(self, node):
+        """Check just one node (`process_tree` is faster for checking all nodes of a tree)."""
+        root = node.root
+        self._check_nodes(root, root.descendants, [(node.ord, node)])
+
+    # pylint: disable=too-many-branches, too-many-statements, too-many-locals
+    def _check_nodes(self, root, descendants, nodes):
+        """Check the given `(ord, node)` pairs from the tree `root` with the given `descendants`."""
+        # Per-tree indexes: the i-th item belongs to the node with ord=i (0 is the technical root).
+        all_nodes = [root] + descendants
+        deprels = [n.deprel or '' for n in all_nodes]
+        udeprels = [deprel.split(':', 1)[0] for deprel in deprels]
+        parents = [0] + [n._parent._ord for n in descendants]  # pylint: disable=protected-access
+        subj_children = [0] * len(all_nodes)
+        obj_children = [0] * len(all_nodes)
+        for i in range(1, len(all_nodes)):
+            udeprel = udeprels[i]
+            if udeprel == 'obj':
+                obj_children[parents[i]] += 1
+            elif 'subj' in udeprel and deprels[i] != udeprel + ':outer':
+                subj_children[parents[i]] += 1
+        verbform_optional = root.zone.split('_')[0] in {'id', 'jv', 'tl', 'hil', 'ifb', 'naq'}
+        # ord -> is_nonprojective_gap() of parents of PUNCT nodes
+        nonproj_gaps = {}
+
+        for i, node in nodes:
+            form, udeprel, upos, feats = node.form, udeprels[i], node.upos, node.feats
+            p_ord = parents[i]
+            parent, p_udeprel = all_nodes[p_ord], udeprels[p_ord]
+
+            if udeprel in ('aux', 'fixed', 'goeswith', 'list') and p_udeprel == udeprel:
+                self.log(node, udeprel + '-chain', udeprel + ' dependencies should not form a chain.')
+
+            # 'appos-chain' is more difficult to test because nested appositions are allowed.
+            # The commented-out code below prevents just some of the false alarms
+            # (those where changing the nested appos into flat would result in non-projectivity).
+            # Unfortunatelly, there are still too many false alarms, so let's skip this test completely.
+            # It seems that multiple appositions as siblings are much less common than nested.
+            # if deprel == 'appos' and parent.deprel == 'appos':
+            #     if not node.precedes(parent.children[-1]):
+            #         self.log(node, 'appos-chain', 'appos should not form a chain except when nested.')
+
+            if udeprel in ('flat', 'fixed', 'conj', 'appos', 'goeswith', 'list') and i < p_ord:
+                self.log(node, udeprel + '-rightheaded',
+                         udeprel + ' relations should be left-headed, not right.')
+
+            if udeprel == 'cop' and upos not in ('AUX', 'PRON'):
+                self.log(node, 'cop-upos', 'deprel=cop upos!=AUX|PRON (but %s)' % upos)
+
+            if udeprel == 'mark' and upos == 'PRON':
+                self.log(node, 'mark-upos', 'deprel=mark upos=PRON')
+
+            if udeprel == 'det' and upos not in ('DET', 'PRON'):
+                self.log(node, 'det-upos', 'deprel=det upos!=DET|PRON (but %s)' % upos)
+
+            if udeprel == 'punct' and upos != 'PUNCT':
+                self.log(node, 'punct-upos', 'deprel=punct upos!=PUNCT (but %s)' % upos)
+
+            i_feat = REQUIRED_FEATURE_FOR_UPOS.get(upos)
+            if i_feat is not None and not feats[i_feat]:
                 # Some languages do not distinguish finite and non-finite forms of verbs.
                 # The VerbForm feature is not obligatory in those languages.
-                if i_feat != 'VerbForm' or not node.root.zone.split('_')[0] in {'id', 'jv', 'tl', 'hil', 'ifb', 'naq'}:
+                if i_feat != 'VerbForm' or not verbform_optional:
                     self.log(node, 'no-' + i_feat, 'upos=%s but %s feature is missing' % (upos, i_feat))
 
-        if feats['VerbForm'] == 'Fin':
-            if upos not in ('VERB', 'AUX'):
-                self.log(node, 'finverb-upos', 'VerbForm=Fin upos!=VERB|AUX (but %s)' % upos)
-            if not feats['Mood']:
-                self.log(node, 'finverb-mood', 'VerbForm=Fin but Mood feature is missing')
-
-        subject_children = [n for n in node.children if 'subj' in n.udeprel and n.sdeprel != 'outer']
-        if len(subject_children) > 1:
-            self.log(node, 'multi-subj', 'More than one (non-outer) [nc]subj child')
-
-        # Since "ccomp" is considered a clausal counterpart of "obj" in UD v2,
-        # one may conclude that "obj" and "ccomp" are mutually exclusive.
-        # However, this has always be a gray zone and people have occasionally
-        # brought up examples where they would want the two relations to co-occur.
-        # Also, there is no clausal counterpart for "iobj", which may cause some
-        # of the problems. It is probably safer not to consider "ccomp" in this
-        # test. Nevertheless, two "obj" under the same parent are definitely an
-        # error.
-        object_children = [n for n in node.children if n.udeprel == 'obj']
-        if len(object_children) > 1:
-            self.log(node, 'multi-obj', 'More than one obj|ccomp child')
-
-        # See http://universaldependencies.org/u/overview/syntax.html#the-status-of-function-words
-        # TODO: Promotion by Head Elision: It is difficult to detect this exception.
-        #       So far, I have just excluded "det" from the forbidded parent.deprel set
-        #       because it is quite often the promoted head and the false-alarm probability is high.
-        #       In future, we could check the enhanced dependencies for empty nodes.
-        # TODO: Function word modifiers: so far I have included advmod to the allowed deprel set.
-        #       This catches the cases like "not every", "exactly two" and "just when".
-        #       It seems the documentation does not allow any other deprel than advmod,
-        #       so there should be no false alarms. Some errors are not reported, i.e. the cases
-        #       when advmod incorrectly depends on a function word ("right before midnight").
-        if parent.udeprel in ('aux', 'cop', 'mark', 'clf', 'case'):
-            if udeprel not in ('conj', 'cc', 'punct', 'fixed', 'goeswith', 'advmod', 'reparandum'):
-                self.log(node, parent.deprel + '-child',
-                         'parent.deprel=%s deprel!=conj|cc|punct|fixed|goeswith' % parent.deprel)
-
-        # goeswith should be left-headed, but this is already checked, so let's skip right-headed.
-        if udeprel == 'goeswith' and parent.precedes(node):
-            span = node.root.descendants(add_self=1)[parent.ord:node.ord]
-            intruder = next((n for n in span[1:] if n.udeprel != "goeswith"), None)
-            if intruder is not None:
-                self.log(intruder, 'goeswith-gap', "deprel!=goeswith but lies within goeswith span")
-            else:
-                for goeswith_node in span:
-                    if goeswith_node.misc['SpaceAfter'] == 'No':
-                        self.log(goeswith_node, 'goeswith-space', "deprel=goeswith SpaceAfter=No")
-
-        if upos == 'SYM' and form.isalpha():
-            self.log(node, 'sym-alpha', "upos=SYM but all form chars are alphabetical: " + form)
-
-        if upos == 'PUNCT' and any(char.isalpha() for char in form):
-            self.log(node, 'punct-alpha', "upos=PUNCT but form has alphabetical char(s): " + form)
-
-        if upos == 'PUNCT' and udeprel not in ('punct', 'fixed', 'goeswith', 'root'):
-            self.log(node, 'punct-deprel', 'upos=PUNCT deprel!=punct|fixed|goeswith|root (but %s)'
-                     % udeprel)
-
-        if upos == 'PUNCT' and node.is_nonprojective():
-            self.log(node, 'punct-nonproj', 'upos=PUNCT and edge is non-projective')
-        if upos == 'PUNCT' and node.is_nonprojective_gap() and not parent.is_nonprojective_gap():
-            self.log(node, 'punct-nonproj-gap', 'upos=PUNCT and causing a non-projectivity')
-
-        if udeprel == 'cop':
-            lemma = node.lemma if node.lemma != '_' else form
-            self.cop_nodes[lemma].append(node)
-            self.cop_count[lemma] += 1
+            if feats['VerbForm'] == 'Fin':
+                if upos not in ('VERB', 'AUX'):
+                    self.log(node, 'finverb-upos', 'VerbForm=Fin upos!=VERB|AUX (but %s)' % upos)
+                if not feats['Mood']:
+                    self.log(node, 'finverb-mood', 'VerbForm=Fin but Mood feature is missing')
+
+            if subj_children[i] > 1:
+                self.log(node, 'multi-subj', 'More than one (non-outer) [nc]subj child')
+
+            # Since "ccomp" is considered a clausal counterpart of "obj" in UD v2,
+            # one may conclude that "obj" and "ccomp" are mutually exclusive.
+            # However, this has always be a gray zone and people have occasionally
+            # brought up examples where they would want the two relations to co-occur.
+            # Also, there is no clausal counterpart for "iobj", which may cause some
+            # of the problems. It is probably safer not to consider "ccomp" in this
+            # test. Nevertheless, two "obj" under the same parent are definitely an
+            # error.
+            if obj_children[i] > 1:
+                self.log(node, 'multi-obj', 'More than one obj|ccomp child')
+
+            # See http://universaldependencies.org/u/overview/syntax.html#the-status-of-function-words
+            # TODO: Promotion by Head Elision: It is difficult to detect this exception.
+            #       So far, I have just excluded "det" from the forbidded parent.deprel set
+            #       because it is quite often the promoted head and the false-alarm probability is high.
+            #       In future, we could check the enhanced dependencies for empty nodes.
+            # TODO: Function word modifiers: so far I have included advmod to the allowed deprel set.
+            #       This catches the cases like "not every", "exactly two" and "just when".
+            #       It seems the documentation does not allow any other deprel than advmod,
+            #       so there should be no false alarms. Some errors are not reported, i.e. the cases
+            #       when advmod incorrectly depends on a function word ("right before midnight").
+            if p_udeprel in ('aux', 'cop', 'mark', 'clf', 'case'):
+                if udeprel not in ('conj', 'cc', 'punct', 'fixed', 'goeswith', 'advmod', 'reparandum'):
+                    self.log(node, parent.deprel + '-child',
+                             'parent.deprel=%s deprel!=conj|cc|punct|fixed|goeswith' % parent.deprel)
+
+            # goeswith should be left-headed, but this is already checked, so let's skip right-headed.
+            if udeprel == 'goeswith' and p_ord < i:
+                span = all_nodes[p_ord:i]
+                intruder = next((n for j, n in enumerate(span[1:], p_ord + 1)
+                                 if udeprels[j] != "goeswith"), None)
+                if intruder is not None:
+                    self.log(intruder, 'goeswith-gap', "deprel!=goeswith but lies within goeswith span")
+                else:
+                    for goeswith_node in span:
+                        if goeswith_node.misc['SpaceAfter'] == 'No':
+                            self.log(goeswith_node, 'goeswith-space', "deprel=goeswith SpaceAfter=No")
+
+            if upos == 'SYM' and form.isalpha():
+                self.log(node, 'sym-alpha', "upos=SYM but all form chars are alphabetical: " + form)
+
+            if upos == 'PUNCT':
+                if any(char.isalpha() for char in form):
+                    self.log(node, 'punct-alpha', "upos=PUNCT but form has alphabetical char(s): " + form)
+
+                if udeprel not in ('punct', 'fixed', 'goeswith', 'root'):
+                    self.log(node, 'punct-deprel', 'upos=PUNCT deprel!=punct|fixed|goeswith|root (but %s)'
+                             % udeprel)
+
+                if node.is_nonprojective():
+                    self.log(node, 'punct-nonproj', 'upos=PUNCT and edge is non-projective')
+                if node.is_nonprojective_gap():
+                    parent_gap = nonproj_gaps.get(p_ord)
+                    if parent_gap is None:
+                        parent_gap = nonproj_gaps[p_ord] = parent.is_nonprojective_gap()
+                    if not parent_gap:
+                        self.log(node, 'punct-nonproj-gap', 'upos=PUNCT and causing a non-projectivity')
+
+            if udeprel == 'cop':
+                lemma = node.lemma if node.lemma != '_' else form
+                self.cop_nodes[lemma].append(node)
+                self.cop_count[lemma] += 1
 
     def after_process_document(self, document):
         for lemma, _count in self.cop_count.most_common()[self.max_cop_lemmas:]:
@@ -5,13 +5,123 @@ used in filters and highlighted in text output. This is a base block that only
 implements service methods. A language-specific block must be derived from this
 one and define the actual rules valid in that language.
 
+The rules can be specified either in Python code (overriding `process_node`),
+or declaratively as a list of dicts in the class attribute `rules`
+(see `FeatureRules` for the format and `udapi.block.ud.ml.markfeatsbugs` for an example).
+The Czech and Latin rules stay in Python code because they also depend on the form,
+MISC attributes or block parameters, which the declarative format cannot express.
+In both cases, the bugs found for a node are cached (see `MarkFeatsBugs.cache_key`),
+so nodes with the same attributes are checked only once.
+
 Usage (Czech example): cat *.conllu | udapy -HAMX layout=compact ud.cs.MarkFeatsBugs > bugs.html
 """
 from udapi.core.block import Block
 
+
+class FeatureRules:
+    """Declarative feature-validation rules compiled into lookup tables.
+
+    The rules are a list of dicts, the first rule matching a node is applied.
+    A rule may contain the following conditions (all must be satisfied):
+    `upos`: one UPOS tag or more tags separated by `|`, e.g. `'NOUN|PROPN'`,
+    `lemma`: one lemma or a list of lemmas,
+    `feats`: a dict of feature names and their values (or lists of values),
+        the empty string means that the feature is missing, e.g. `{'PronType': ['Prs', 'Rcp']}`.
+    A rule without conditions matches all nodes.
+    And it may contain the following checks:
+    `required`: a list of feature names which must be present,
+    `allowed`: a dict of feature names and lists of their allowed values.
+        If `allowed` is missing or None, any features are allowed (e.g. for foreign words).
+
+    For each UPOS, the compiler selects the rules which may apply and the features
+    (and whether the lemma) these rules depend on, i.e. the relevant feature signature.
+    The checks for a given (upos, lemma, signature) are found just once
+    and stored in a lookup table as a tuple of required features and a dict of frozensets.
+    """
+
+    def __init__(self, rules):
+        self.rules = []
+        for rule in rules:
+            feats = {}
+            for name, values in rule.get('feats', {}).items():
+                feats[name] = frozenset([values] if isinstance(values, str) else values)
+            lemmas = rule.get('lemma')
+            if isinstance(lemmas, str):
+                lemmas = [lemmas]
+            allowed = rule.get('allowed')
+            if allowed is not None:
+                allowed = {name: frozenset(values) for name, values in allowed.items()}
+            checks = (tuple(dict.fromkeys(rule.get('required', ()))), allowed)
+            upos = rule.get('upos')
+            self.rules.append((set(upos.split('|')) if upos else None,
+                               frozenset(lemmas) if lemmas is not None else None, feats, checks))
+        all_upos = set().union(*[rule[0] for rule in self.rules if rule[0]])
+        self._tables = {upos: self._compile([r for r in self.rules if r[0] is None or upos in r[0]])
+                        for upos in all_upos}
+        self._default = self._compile([r for r in self.rules if r[0] is None])
+
+    @staticmethod
+    def _compile(rules):
+        """Return (rules, relevant feature names, uses lemma, lookup table) for one UPOS."""
+        features = tuple(dict.fromkeys(name for rule in rules for name in rule[2]))
+        uses_lemma = any(rule[1] is not None for rule in rules)
+        return rules, features, uses_lemma, {}
+
+    def uses_lemma(self, upos):
+        """Does any of the rules which may apply to nodes with the given UPOS depend on the lemma?"""
+        return self._tables.get(upos, self._default)[2]
+
+    def signature(self, node):
+        """Return the lookup-table key of the node: (upos, lemma or None, values of relevant features)."""
+        upos = node.upos
+        _, features, uses_lemma, _ = self._tables.get(upos, self._default)
+        feats = node.feats
+        return upos, node.lemma if uses_lemma else None, tuple(feats[name] for name in features)
+
+    def checks(self, node):
+        """Return (required, allowed) for the node or None if no rule matches."""
+        key = self.signature(node)
+        rules, features, _, table = self._tables.get(key[0], self._default)
+        try:
+            return table[key]
+        except KeyError:
+            pass
+        values = dict(zip(features, key[2]))
+        result = None
+        for _, lemmas, feats, checks in rules:
+            if (lemmas is None or key[1] in lemmas) and all(values[n] in v for n, v in feats.items()):
+                result = checks
+                break
+        table[key] = result
+        return result
+
+
 class MarkFeatsBugs(Block):
 
+    # Declarative rules, see FeatureRules. If None, `process_node` must be overridden.
+    rules = None
+
+    # Maximum number of cached results (the cache is cleared when it gets bigger).
+    cache_size = 200_000
+
+    def __init__(self, cache=True, **kwargs):
+        """Create the MarkFeatsBugs block.
+
+        Args:
+        cache: remember the bugs found for each combination of attributes (see `cache_key`)
+            and do not check the same combination again (default=True).
+            Use cache=0 if `process_node` in a derived block depends on other attributes.
+        """
+        super().__init__(**kwargs)
+        self.cache = cache
+        self._compiled_rules = FeatureRules(self.rules) if self.rules is not None else None
+        self._cache = {}
+        self._recorded = None
+
     def bug(self, node, bugstring):
+        if self._recorded is not None:
+            self._recorded.append(bugstring)
+            return
         bugs = []
         if node.misc['Bug']:
             bugs = node.misc['Bug'].split('+')
@@ -41,10 +151,66 @@ class MarkFeatsBugs(Block):
             if not f in node.feats:
                 self.bug(node, 'Feat' + f + 'Missing')
 
+    def cache_key(self, node):
+        """Return a key of all the node attributes the rules depend on.
+
+        For the declarative `rules`, these are the UPOS, the lemma (only if needed)
+        and the features. Otherwise, the form is added as well because
+        the rules in `process_node` may depend on it.
+        The features are represented by their string as long as it has not been deserialized,
+        so the features of cache hits are not parsed at all.
+        """
+        # pylint: disable=protected-access
+        feats = node._feats
+        if feats is None:
+            feats_key = '_'
+        elif feats._dict:
+            # The order of features matters (it is the order of bugs reported by
+            # check_allowed_features) and the string may be sorted differently.
+            feats_key = tuple(feats._dict.items())
+        else:
+            feats_key = feats._string or '_'
+        if self._compiled_rules is not None:
+            upos = node.upos
+            return upos, node.lemma if self._compiled_rules.uses_lemma(upos) else None, feats_key
+        return node.upos, node.lemma, node.form, feats_key
+
+    @staticmethod
+    def is_tree_local():
+        """This block checks each node independently."""
+        return True
+
+    def process_tree(self, tree):
+        if not self.cache:
+            super().process_tree(tree)
+            return
+        cache = self._cache
+        for node in tree.descendants:
+            key = self.cache_key(node)
+            bugs = cache.get(key)
+            if bugs is None:
+                if len(cache) >= self.cache_size:
+                    cache.clear()
+                # Let `bug()` just record the bugs, they are marked below.
+                self._recorded = recorded = []
+                try:
+                    self.process_node(node)
+                finally:
+                    self._recorded = None
+                bugs = cache[key] = (recorded, '+'.join(dict.fromkeys(recorded))) if recorded else ()
+            if bugs:
+                if node.misc['Bug']:
+                    for bugstring in bugs[0]:
+                        self.bug(node, bugstring)
+                else:
+                    node.misc['Bug'] = bugs[1]
+
     def process_node(self, node):
         """
-        This is a generic block, do nothing here. In a language-specific block
-        based on this one, rules similar to the examples below can be specified:
+        Check the node according to the declarative `rules`.
+
+        Alternatively, a language-specific block based on this one can override this method
+        and specify the rules in Python code, similarly to the examples below:
 
         # NOUNS ################################################################
         if node.upos == 'NOUN':
@@ -70,4 +236,11 @@ class MarkFeatsBugs(Block):
         else:
             self.check_allowed_features(node, {})
         """
-        return
+        if self._compiled_rules is None:
+            return
+        checks = self._compiled_rules.checks(node)
+        if checks is not None:
+            required, allowed = checks
+            self.check_required_features(node, required)
+            if allowed is not None:
+                self.check_allowed_features(node, allowed)
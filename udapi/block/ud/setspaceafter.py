@@ -21,6 +21,11 @@ class SetSpaceAfter(Block):
         self.fix_text = fix_text
         self.changed = False
 
+    @staticmethod
+    def is_tree_local():
+        """This block modifies each tree independently."""
+        return True
+
     def process_tree(self, root):
         nodes = root.descendants
         count_of_form = collections.Counter([n.form for n in nodes])
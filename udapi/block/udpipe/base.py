@@ -127,13 +127,20 @@ class Base(Block):
     # pylint: disable=too-many-arguments
     def __init__(self, model=None, model_alias=None, online=False,
                  tokenize=True, tag=True, parse=True, resegment=False,
-                 ranges=False, delete_nodes=False, **kwargs):
+                 ranges=False, delete_nodes=False, server=None, workers=4, batch_chars=100_000, **kwargs):
         super().__init__(**kwargs)
         self.model, self.model_alias, self.online = model, model_alias, online
+        # Parameters of the online tool: REST API URL, number of parallel requests, request size.
+        self.server, self.workers, self.batch_chars = server, workers, batch_chars
         self._tool = None
         self.tokenize, self.tag, self.parse, self.resegment = tokenize, tag, parse, resegment
         self.ranges, self.delete_nodes = ranges, delete_nodes
 
+    @staticmethod
+    def is_cacheable():
+        """Return False because the results depend on the (downloaded or online) UDPipe model."""
+        return False
+
     @property
     def tool(self):
         """Return the tool (UDPipe in this case), created lazily."""
@@ -147,7 +154,9 @@ class Base(Block):
             else:
                 self.model = KNOWN_MODELS[self.model_alias]
         if self.online:
-            self._tool = UDPipeOnline(model=self.model)
+            kwargs = {'server': self.server} if self.server else {}
+            self._tool = UDPipeOnline(model=self.model, workers=self.workers,
+                                      batch_chars=self.batch_chars, **kwargs)
         else:
             if not UDPIPE_AVAILABLE:
                 raise ImportError("UDPipe is not available. Install ufal.udpipe or use online=1")
@@ -160,42 +169,60 @@ class Base(Block):
             self.tool.process_document(doc, tok, tag, par, reseg, ranges)
             return
         old_bundles = doc.bundles
-        new_bundles = []
+        selected = []
         for bundle in old_bundles:
             for tree in bundle:
-                new_bundles.append(bundle)
                 if self._should_process_tree(tree):
                     if self.delete_nodes:
                         for subroot in tree.children:
                             subroot.remove()
-                    if tok:
-                        new_trees = self.tool.tokenize_tag_parse_tree(tree, resegment=reseg,
-                                                                      tag=tag, parse=par, ranges=ranges)
-                        if self.resegment and len(new_trees) > 1:
-                            orig_bundle_id = bundle.bundle_id
-                            bundle.bundle_id = orig_bundle_id + '-1'
-                            for i, new_tree in enumerate(new_trees[1:], 2):
-                                new_bundle = Bundle(document=doc, bundle_id=f"{orig_bundle_id}-{i}")
-                                new_tree.zone = tree.zone
-                                new_bundle.add_tree(new_tree)
-                                new_bundles.append(new_bundle)
-                    elif not tok and not reseg and (tag or par):
-                        self.tool.tag_parse_tree(tree, tag=tag, parse=par)
-                    elif not tok and reseg and not tag and not par:
-                        sentences = self.tool.segment_text(tree.text)
-                        if len(sentences) > 1:
-                            orig_bundle_id = bundle.bundle_id
-                            bundle.bundle_id = orig_bundle_id + '-1'
-                            tree.text = sentences[0]
-                            for i, sentence in enumerate(sentences[1:], 2):
-                                new_bundle = Bundle(document=doc, bundle_id=f"{orig_bundle_id}-{i}")
-                                new_tree = new_bundle.create_tree(zone=tree.zone)
-                                new_tree.text = sentence
-                                new_bundles.append(new_bundle)
-                    else:
-                        raise ValueError(f"Unimplemented tokenize={tok} tag={tag} parse={par} resegment={reseg}")
+                    selected.append(tree)
+        if not selected:
+            return
+
+        # All the selected trees are passed to the tool at once,
+        # so that the online tool can send them in batches and parallel requests.
+        if tok:
+            results = self.tool.tokenize_tag_parse_trees(selected, resegment=reseg, tag=tag, parse=par,
+                                                         ranges=ranges)
+        elif not reseg and (tag or par):
+            self.tool.tag_parse_trees(selected, tag=tag, parse=par)
+            return
+        elif reseg and not tag and not par:
+            results = self.tool.segment_texts([tree.text for tree in selected])
+        else:
+            raise ValueError(f"Unimplemented tokenize={tok} tag={tag} parse={par} resegment={reseg}")
+
+        results = dict(zip(map(id, selected), results))
+        new_bundles = []
+        for bundle in old_bundles:
+            new_bundles.append(bundle)
+            for tree in bundle:
+                result = results.get(id(tree))
+                if result is None or len(result) < 2 or not self.resegment:
+                    continue
+                orig_bundle_id = bundle.bundle_id
+                bundle.bundle_id = orig_bundle_id + '-1'
+                if tok:
+                    for i, new_tree in enumerate(result[1:], 2):
+                        new_bundle = Bundle(document=doc, bundle_id=f"{orig_bundle_id}-{i}")
+                        new_tree.zone = tree.zone
+                        new_bundle.add_tree(new_tree)
+                        new_bundles.append(new_bundle)
+                else:
+                    tree.text = result[0]
+                    for i, sentence in enumerate(result[1:], 2):
+                        new_bundle = Bundle(document=doc, bundle_id=f"{orig_bundle_id}-{i}")
+                        new_tree = new_bundle.create_tree(zone=tree.zone)
+                        new_tree.text = sentence
+                        new_bundles.append(new_bundle)
         doc.bundles = new_bundles
 
+    def process_end(self):
+        if self.online and self._tool is not None:
+            self._tool.close()
+        super().process_end()
+
 '''
 Udapi::Block::UDPipe::Base - tokenize, tag and parse into UD
 
@@ -93,10 +93,8 @@ class Filter(Block):
                     return
 
         if self.delete_subtree is not None:
-            for node in tree.descendants:
-                if eval(self.delete_subtree):
-                    node.remove()
-                    continue
+            nodes_to_delete = [node for node in tree.descendants if eval(self.delete_subtree)]
+            tree.remove_nodes(nodes_to_delete)
 
         if self.keep_tree is not None:
             if not eval(self.keep_tree):
@@ -127,13 +125,11 @@ class Filter(Block):
             else:
                 for node in kept_subtrees:
                     node.parent = root
-                for orig_subroot in [n for n in root.children if n not in kept_subtrees]:
-                    orig_subroot.remove()
+                root.remove_nodes([n for n in root.children if n not in kept_subtrees])
 
         if self.keep_node is not None:
             nodes_to_delete = [node for node in tree.descendants if not eval(self.keep_node)]
             if nodes_to_delete == tree.descendants:
                 tree.remove()
                 return
-            for node in nodes_to_delete:
-                node.remove(children='rehang')
+            tree.remove_nodes(nodes_to_delete, children='rehang')
@@ -11,61 +11,251 @@ This will create the file bug.conllu with the bundle, which caused the bug.
 
 The second.Block can have any parameters, e.g.
   udapy first.Block util.FindBug block=second.Block param1=value1 param2=value2 > bug.conllu
+
+Each bundle is tested on its own copy (created via CoNLL-U serialization),
+so the processed document is never modified (nor copied as a whole).
+With `minimize=1`, the failing bundle is further shrunk by delta debugging:
+nodes are removed (their children are re-attached to the nearest remaining ancestor)
+as long as the block fails with the same exception (raised at the same line of code),
+so bug.conllu contains a minimal reproducer.
+With `workers=N` (`workers=0` means all CPU cores), the bundles (and the candidate
+reduced bundles) are tested in parallel by a pool of forked processes, e.g.
+
+  udapy read.Conllu files=big.conllu util.FindBug block=second.Block minimize=1 workers=0 > bug.conllu
+
+Note that with workers>1 each worker uses its own instance of the block,
+so bugs which depend on the state kept by the block from previous bundles may not be found.
 """
-import copy
+import contextlib
+import io
 import logging
+import multiprocessing
+import os
+import sys
 
 from udapi.core.basewriter import BaseWriter
 from udapi.block.write.conllu import Conllu
-from udapi.core.run import _parse_block_name
+from udapi.core.document import Document
+from udapi.core.run import find_block_class
+
+# State inherited by the forked worker processes, the first item is the FindBug block.
+_FORKED_STATE = None
+
+
+def _signature(exc):
+    """Return the type of the exception and the place (file and line) where it was raised."""
+    traceback = exc.__traceback__
+    while traceback is not None and traceback.tb_next is not None:
+        traceback = traceback.tb_next
+    if traceback is None:
+        return (type(exc).__name__, None, None)
+    return (type(exc).__name__, traceback.tb_frame.f_code.co_filename, traceback.tb_lineno)
+
+
+def _test_bundles_in_worker(numbers):
+    finder, document, first_only = _FORKED_STATE
+    return finder.test_bundles(document, numbers, first_only)
+
+
+def _test_candidate_in_worker(kept):
+    finder, string, signature = _FORKED_STATE
+    return finder.fails(string, kept, signature)
 
 
 class FindBug(BaseWriter):
     """Debug another block by finding a minimal testcase conllu file."""
 
-    def __init__(self, block, first_error_only=True,
+    def __init__(self, block, first_error_only=True, minimize=False, workers=1,
                  files='-', filehandle=None, docname_as_file=False, encoding='utf-8',
                  newline='\n', overwrite=False,
                  **kwargs):
-        """Args: block, first_error_only.
+        """Args: block, first_error_only, minimize, workers.
+        minimize: shrink the failing bundle to a minimal set of nodes (default=False)
+        workers: number of processes testing the bundles.
+            Default=1 means no parallelization, 0 means all CPU cores.
         All other parameters (which are not parameters of BaseWriter)
         will be passed to the block being inspected.
         """
         super().__init__(files, filehandle, docname_as_file, encoding, newline, overwrite)
         self.block = block
         self.first_error_only = first_error_only
+        self.minimize = minimize
+        self.workers = workers or os.cpu_count() or 1
         self._kwargs = kwargs
+        self._serializer = Conllu()
 
-    def process_document(self, document):
-        sub_path, class_name = _parse_block_name(self.block)
-        module = "udapi.block." + sub_path + "." + class_name.lower()
-        try:
-            command = "from " + module + " import " + class_name + " as B"
-            logging.debug("Trying to run command: %s", command)
-            exec(command)  # pylint: disable=exec-used
-        except Exception:
-            logging.warning("Error when trying import the block %s", self.block)
-            raise
-
-        command = "B(**self._kwargs)"
-        logging.debug("Trying to evaluate this: %s", command)
-        new_block = eval(command)  # pylint: disable=eval-used
-
-        doc_copy = copy.deepcopy(document)
-        writer = Conllu(files=self.orig_files)
+    def new_block(self):
+        """Return a new instance of the block being inspected."""
+        return find_block_class(self.block)(**self._kwargs)
+
+    def bundle_to_conllu(self, bundle):
+        """Return the CoNLL-U serialization of all trees in the bundle."""
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            for tree in bundle:
+                self._serializer.process_tree(tree)
+        return output.getvalue()
+
+    @staticmethod
+    def conllu_to_bundle(string, kept=None):
+        """Return a new bundle loaded from the CoNLL-U string.
+
+        If `kept` is specified, only (empty) nodes with (tree number, str(ord)) in `kept` are preserved.
+        """
+        document = Document()
+        document.from_conllu_string(string)
+        bundle = document.bundles[0] if document.bundles else document.create_bundle()
+        if kept is None:
+            return bundle
+        for tree_no, tree in enumerate(bundle.trees):
+            nodes = tree.descendants_and_empty
+            removed = {node for node in nodes if (tree_no, str(node.ord)) not in kept}
+            if not removed:
+                continue
+            # Deserialized enhanced dependencies follow the renumbering of nodes.
+            for node in nodes:
+                if node not in removed and node.raw_deps not in (None, '_'):
+                    deps = [dep for dep in node.deps if dep['parent'] not in removed]
+                    if deps:
+                        node.deps = deps
+                    else:
+                        node.raw_deps = '_'
+            for empty in [node for node in removed if node.is_empty()]:
+                empty.remove()
+            words = [node for node in removed if not node.is_empty()]
+            if words:
+                tree.remove_nodes(words, children='rehang')
+        return bundle
+
+    def test_bundles(self, document, numbers, first_only=True):
+        """Apply a new instance of the block on copies of the given bundles.
 
-        for bundle_no, bundle in enumerate(doc_copy.bundles, 1):
+        Return a list of failures (bundle number, exception signature, exception repr).
+        """
+        block, failures = self.new_block(), []
+        for bundle_no in numbers:
+            bundle = document.bundles[bundle_no - 1]
             logging.debug('Block %s processing bundle #%d (id=%s)',
                           self.block, bundle_no, bundle.bundle_id)
+            bundle_copy = self.conllu_to_bundle(self.bundle_to_conllu(bundle))
             try:
-                new_block.process_bundle(bundle)
+                block.process_bundle(bundle_copy)
             except Exception as exc:  # pylint: disable=broad-except
-                logging.warning('util.FindBug found a problem in bundle %d in block %s: %r',
-                                bundle_no, self.block, exc)
-                logging.warning('Printing a minimal example to %s', self.orig_files)
+                failures.append((bundle_no, _signature(exc), repr(exc)))
+                if first_only:
+                    break
+            finally:
+                # Udapy runs with the garbage collector disabled, so free the copy explicitly.
+                bundle_copy.release()
+        return failures
+
+    def fails(self, string, kept, signature):
+        """Does a new instance of the block fail on the reduced bundle in the same way?"""
+        bundle = self.conllu_to_bundle(string, set(kept))
+        try:
+            self.new_block().process_bundle(bundle)
+        except Exception as exc:  # pylint: disable=broad-except
+            return _signature(exc) == signature
+        finally:
+            bundle.release()
+        return False
+
+    def _pool(self, state, tasks):
+        """Return a pool of forked workers inheriting the state, or None if parallelization is not possible."""
+        global _FORKED_STATE  # pylint: disable=global-statement
+        workers = min(self.workers, tasks)
+        if workers < 2:
+            return None
+        try:
+            context = multiprocessing.get_context('fork')
+        except ValueError:
+            logging.warning('util.FindBug workers=%d not supported on this platform', self.workers)
+            return None
+        # Unflushed output would be duplicated in the forked processes.
+        sys.stdout.flush()
+        _FORKED_STATE = state
+        try:
+            return context.Pool(workers)
+        finally:
+            _FORKED_STATE = None
+
+    def find_failures(self, document):
+        """Return a list of failures (bundle number, exception signature, exception repr)."""
+        numbers = range(1, len(document.bundles) + 1)
+        pool = self._pool((self, document, self.first_error_only), len(numbers))
+        if pool is None:
+            return self.test_bundles(document, numbers, self.first_error_only)
+        chunksize = max(1, min(1000, len(numbers) // (pool._processes * 4)))  # pylint: disable=protected-access
+        chunks = [numbers[i:i + chunksize] for i in range(0, len(numbers), chunksize)]
+        failures = []
+        with pool:
+            # The results are ordered, so the first failure found is the first one in the document.
+            for chunk_failures in pool.imap(_test_bundles_in_worker, chunks):
+                failures.extend(chunk_failures)
+                if failures and self.first_error_only:
+                    break
+        return failures
+
+    def minimize_bundle(self, string, signature):
+        """Return the minimal list of (tree number, str(ord)) pairs which still cause the failure.
+
+        This is the ddmin algorithm (Zeller and Hildebrandt, 2002).
+        All the candidate subsets and complements of one step are tested in parallel.
+        """
+        bundle = self.conllu_to_bundle(string)
+        kept = [(tree_no, str(node.ord)) for tree_no, tree in enumerate(bundle.trees)
+                for node in tree.descendants_and_empty]
+        bundle.release()
+        if not self.fails(string, kept, signature):
+            logging.warning('util.FindBug: the failure cannot be reproduced on a copy of the bundle'
+                            ' with a new instance of %s, so it cannot be minimized', self.block)
+            return kept
+        pool = self._pool((self, string, signature), len(kept))
+        granularity = 2
+        try:
+            while len(kept) >= 2:
+                size = len(kept) / granularity
+                subsets = [kept[round(i * size):round((i + 1) * size)] for i in range(granularity)]
+                complements = [kept[:round(i * size)] + kept[round((i + 1) * size):] for i in range(granularity)]
+                candidates = subsets + complements if granularity > 2 else subsets
+                if pool is None:
+                    results = (self.fails(string, candidate, signature) for candidate in candidates)
+                else:
+                    results = pool.map(_test_candidate_in_worker, candidates, 1)
+                failing = next((i for i, result in enumerate(results) if result), None)
+                if failing is not None and failing < granularity:
+                    kept, granularity = candidates[failing], 2
+                elif failing is not None:
+                    kept, granularity = candidates[failing], max(granularity - 1, 2)
+                elif granularity < len(kept):
+                    granularity = min(len(kept), 2 * granularity)
+                else:
+                    break
+                logging.info('util.FindBug: %d nodes left', len(kept))
+        finally:
+            if pool is not None:
+                pool.terminate()
+        return kept
+
+    def process_document(self, document):
+        writer = Conllu(files=self.orig_files)
+        for bundle_no, signature, exc_repr in self.find_failures(document):
+            logging.warning('util.FindBug found a problem in bundle %d in block %s: %s',
+                            bundle_no, self.block, exc_repr)
+            logging.warning('Printing a minimal example to %s', self.orig_files)
+            bundle = document.bundles[bundle_no - 1]
+            if self.minimize:
+                string = self.bundle_to_conllu(bundle)
+                kept = self.minimize_bundle(string, signature)
+                logging.warning('util.FindBug minimized the bundle from %d to %d nodes',
+                                sum(len(tree.descendants_and_empty) for tree in bundle), len(kept))
+                bundle = self.conllu_to_bundle(string, set(kept))
 
-                for tree in document.bundles[bundle_no - 1].trees:
-                    writer.process_tree(tree)
+            for tree in bundle.trees:
+                writer.process_tree(tree)
 
-                if self.first_error_only:
-                    raise
+            if self.first_error_only:
+                # Raise the original exception (with its traceback) if it can be reproduced.
+                self.new_block().process_bundle(self.conllu_to_bundle(self.bundle_to_conllu(bundle)))
+                raise RuntimeError(f'util.FindBug: block {self.block} failed on bundle {bundle_no}'
+                                   f' with {exc_repr}')
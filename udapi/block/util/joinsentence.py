@@ -39,7 +39,7 @@ class JoinSentence(Block):
 
     def process_document(self, document):
         previous_tree = None
-        for bundle_no, bundle in enumerate(document.bundles):
+        for bundle in document.bundles:
             # In general, a bundle may contain multiple trees in different zones.
             # In UD data, we always expect just one zone (labeled '') per bundle.
             # This code could be extended to join all zones but we do not try to do it at present.
@@ -0,0 +1,53 @@
+"""MemStats is a special block for printing the memory footprint of documents.
+
+Example usage::
+
+  udapy read.Conllu files=big.conllu util.MemStats > memory.txt
+  udapy read.Conllu files=big.conllu corefud.Load util.MemStats max_trees=0
+
+For each component (Node objects, their strings, FEATS, MISC, lists of children,
+coreference mentions and entities, comments etc.) the number of bytes per node
+and the estimated total size is printed, see `udapi.core.memory` for details.
+The sizes are summed over all documents (i.e. all rounds), the peak RSS is the maximum.
+"""
+from udapi.core.block import Block
+from udapi.core.memory import COMPONENTS, document_memory, format_mib, format_report, peak_rss
+
+
+class MemStats(Block):
+    """Print the memory footprint of the processed documents per component."""
+
+    def __init__(self, max_trees=1000, **kwargs):
+        """Create the MemStats block object.
+
+        Params:
+        max_trees: the maximum number of trees sampled in each document (0 means all trees)
+        """
+        super().__init__(**kwargs)
+        self.max_trees = max_trees
+        self.stats = dict.fromkeys(COMPONENTS + ('nodes', 'trees', 'sampled_trees'), 0)
+        self.peak_rss = None
+
+    @staticmethod
+    def is_cacheable():
+        """The results depend on the Python version and the state of the process."""
+        return False
+
+    def process_document(self, document):
+        stats = document_memory(document, self.max_trees)
+        for key in self.stats:
+            self.stats[key] += stats[key]
+        self.peak_rss = peak_rss()
+
+    def export_state(self):
+        return {'stats': self.stats, 'peak_rss': self.peak_rss}
+
+    def merge_state(self, state):
+        for key in self.stats:
+            self.stats[key] += state['stats'][key]
+        if state['peak_rss'] is not None:
+            self.peak_rss = max(self.peak_rss or 0, state['peak_rss'])
+
+    def process_end(self):
+        print(format_report(self.stats))
+        print(f'peak RSS: {format_mib(self.peak_rss)}')
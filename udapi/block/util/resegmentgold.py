@@ -1,6 +1,6 @@
 """util.ResegmentGold is a block for sentence alignment and re-segmentation of two zones."""
 import logging
-import unicodedata
+from udapi.core.align import strip_spaces
 from udapi.core.block import Block
 from udapi.core.mwt import MWT
 from udapi.core.root import Root
@@ -20,10 +20,6 @@ class ResegmentGold(Block):
         super().__init__(**kwargs)
         self.gold_zone = gold_zone
 
-    @staticmethod
-    def _strip_spaces(string):
-        return ''.join(filter(lambda c: unicodedata.category(c) != "Zs", string))
-
     def process_document(self, document):
         if not document.bundles:
             return
@@ -36,10 +32,8 @@ class ResegmentGold(Block):
         for bundle_no, bundle in enumerate(document.bundles):
             g_tree = bundle.trees[0]
             p_tree = pred_trees.pop()
-            g_chars = self._strip_spaces(''.join(t.form for t in g_tree.token_descendants))
-            p_chars = self._strip_spaces(''.join(t.form for t in p_tree.token_descendants))
-            g_chars = ''.join(filter(lambda c: unicodedata.category(c) != "Zs", g_chars))
-            p_chars = ''.join(filter(lambda c: unicodedata.category(c) != "Zs", p_chars))
+            g_chars = strip_spaces(''.join(t.form for t in g_tree.token_descendants))
+            p_chars = strip_spaces(''.join(t.form for t in p_tree.token_descendants))
             if g_chars == p_chars:
                 bundle.add_tree(p_tree)
                 continue
@@ -50,7 +44,7 @@ class ResegmentGold(Block):
                 if not pred_trees:
                     raise ValueError('no pred_trees:\n%s\n%s' % (p_chars, g_chars))
                 new_p_tree = pred_trees.pop()
-                p_chars += self._strip_spaces(''.join(t.form for t in new_p_tree.token_descendants))
+                p_chars += strip_spaces(''.join(t.form for t in new_p_tree.token_descendants))
                 moved_roots.extend(new_p_tree.children)
                 p_tree.steal_nodes(new_p_tree.descendants)
             self.choose_root(p_tree, was_subroot, g_tree)
@@ -63,11 +57,15 @@ class ResegmentGold(Block):
                 continue
 
             # Now p_tree contains more nodes than it should.
-            p_chars = ''
+            # Instead of concatenating the pred tokens, we just count their characters.
+            p_len, g_len = 0, len(g_chars)
             tokens = p_tree.token_descendants
             for index, token in enumerate(tokens):
-                p_chars += self._strip_spaces(token.form)
-                if len(p_chars) > len(g_chars):
+                token_chars = strip_spaces(token.form)
+                p_len += len(token_chars)
+                if p_len > g_len:
+                    # The characters beyond g_len are all in the current token.
+                    overflow = token_chars[len(token_chars) - (p_len - g_len):]
                     logging.warning('Pred token crossing gold sentences: %s', g_tree.sent_id)
                     # E.g. gold cs ln95048-151-p2s8 contains SpaceAfter=No on the last word
                     # of the sentence, resulting in "uklidnila.Komentář" in the raw text.
@@ -76,15 +74,15 @@ class ResegmentGold(Block):
                     if index + 1 == len(tokens):
                         next_p_tree = Root(zone=p_tree.zone)
                         pred_trees.append(next_p_tree)
-                        next_p_tree.create_child(deprel='wrong', form=p_chars[len(g_chars):],
+                        next_p_tree.create_child(deprel='wrong', form=overflow,
                                                  misc='Rehanged=Yes')
                         bundle.add_tree(p_tree)
                         break
                     else:
                         next_tok = tokens[index + 1]
-                        next_tok.form = p_chars[len(g_chars):] + next_tok.form
-                        p_chars = g_chars
-                if len(p_chars) == len(g_chars):
+                        next_tok.form = overflow + next_tok.form
+                        p_len = g_len
+                if p_len == g_len:
                     next_p_tree = Root(zone=p_tree.zone)
                     words = []
                     for token in tokens[index + 1:]:
@@ -100,6 +100,17 @@ class See(Block):
                     self.match[stat]['T O T A L'] += 1
         return matching
 
+    def export_state(self):
+        return {'overall': dict(self.overall),
+                'match': {stat: dict(self.match[stat]) for stat in self.stats},
+                'every': {stat: dict(self.every[stat]) for stat in self.stats}}
+
+    def merge_state(self, state):
+        self.overall.update(state['overall'])
+        for stat in self.stats:
+            self.match[stat].update(state['match'][stat])
+            self.every[stat].update(state['every'][stat])
+
     def process_end(self):
         print(self.node)
         print("matches %d out of %d nodes (%.1f%%) in %d out of %d trees (%.1f%%)"
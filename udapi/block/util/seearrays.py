@@ -0,0 +1,207 @@
+"""Block util.SeeArrays is a variant of util.See computing the statistics using NumPy arrays.
+
+Example usage from the command line::
+
+  udapy util.SeeArrays node='(upos == "NOUN") & (p_upos == "VERB")' n=3 \
+   stats=dir,children,c_upos,p_lemma,deprel,feats_split < in.conllu
+
+  udapy write.Npz files=corpus.npz < corpus.conllu
+  udapy util.SeeArrays node='feats["Case"] == "Gen"' npz=corpus.npz
+
+The output is the same as of util.See (including the ordering of values with equal counts),
+but the statistics are computed on `udapi.core.arrays.NodeArrays`,
+either converted from the processed documents or loaded from .npz files (parameter `npz`).
+
+The parameter `node` is a NumPy expression (evaluated once for all nodes, not for each node),
+which should return a boolean array. The following variables can be used in the expression:
+ * `ord`, `head`, `depth`, `children`, `tree`, `edge`, `siblings` (integer arrays),
+ * `form`, `lemma`, `upos`, `xpos`, `deprel`, `dir` (string arrays),
+ * `p_form`, `p_lemma`, `p_upos`, `p_xpos`, `p_deprel` (the parent's strings or "<ROOT>"),
+ * `feats` (e.g. ``feats["Number"] == "Plur"``), `has_feat` (e.g. ``has_feat("Number=Plur")``),
+ * `np` (the numpy module) and `arrays` (the `NodeArrays` object).
+Note that `&`, `|` and `~` must be used instead of `and`, `or` and `not`
+and that they have a higher priority than `==`, so parentheses are needed.
+
+The supported statistics are `dir`, `edge`, `depth`, `children`, `siblings`, `ord`,
+`form`, `lemma`, `upos`, `xpos`, `deprel` and `feats_split`,
+optionally with the prefixes `p_`, `c_`, `l_` and `r_` as in util.See.
+Empty nodes are not supported.
+"""
+import numpy as np
+
+from udapi.block.util.see import See, STATS
+from udapi.core.arrays import NodeArrays
+
+# We need eval in this block
+# pylint: disable=eval-used
+
+_NUMERIC = ('ord', 'depth', 'children', 'edge', 'siblings')
+_STRINGS = ('form', 'lemma', 'upos', 'xpos', 'deprel')
+_DIRS = ['root', 'left', 'right']
+
+
+class _FeatValues:
+    """Helper for ``feats["Name"]`` in the `node` expression."""
+
+    def __init__(self, arrays):
+        self.arrays = arrays
+
+    def __getitem__(self, name):
+        return self.arrays.feat_values(name)
+
+
+class _Namespace(dict):
+    """Variables for the `node` expression, which are computed lazily."""
+
+    def __init__(self, block, arrays):
+        super().__init__(np=np, arrays=arrays, feats=_FeatValues(arrays), has_feat=arrays.has_feat)
+        self.block = block
+        self.arrays = arrays
+
+    def __missing__(self, name):
+        arrays = self.arrays
+        if name in arrays.columns and name not in _STRINGS:
+            value = arrays[name]
+        elif name in _STRINGS + ('dir', 'edge', 'siblings') or name.startswith('p_') and name[2:] in _STRINGS:
+            targets = arrays.head_index if name.startswith('p_') else np.arange(len(arrays))
+            positions, codes, labels = self.block.attr_values(arrays, name.replace('p_', '', 1), targets)
+            value = np.empty(len(arrays), dtype=object)
+            value[positions] = np.array(labels, dtype=object)[codes]
+            value = value.astype(int if name in _NUMERIC else str)
+        else:
+            raise KeyError(name)
+        self[name] = value
+        return value
+
+
+class SeeArrays(See):
+    """Print statistics about the nodes specified by the NumPy expression `node`."""
+
+    def __init__(self, node, n=5, stats=STATS, npz=None, **kwargs):
+        """Args:
+        `node`: NumPy expression returning a boolean array of the "matching" nodes.
+        `n`: Top n values will be printed for each statistic.
+        `stats`: a list of comma-separated statistics to be printed.
+        `npz`: comma-separated list of .npz files (created by write.Npz) to be processed
+        """
+        super().__init__(node=node, n=n, stats=stats, **kwargs)
+        if self.empty:
+            raise ValueError('util.SeeArrays does not support empty nodes')
+        self.npz = npz
+        if npz:
+            # The runner treats blocks with the attribute `finished` as readers,
+            # so no documents will be read from stdin.
+            self.finished = True
+
+    def process_start(self):
+        super().process_start()
+        if self.npz:
+            for filename in self.npz.split(','):
+                self.process_arrays(NodeArrays.load(filename))
+
+    def process_document(self, document):
+        self.process_arrays(document.to_arrays())
+
+    def process_arrays(self, arrays):
+        """Add the statistics of the given NodeArrays."""
+        size = len(arrays)
+        matching = np.asarray(eval(self.node, {}, _Namespace(self, arrays)), dtype=bool)
+        if matching.shape != (size,):
+            matching = np.broadcast_to(matching, (size,))
+        self.overall['trees'] += arrays.num_trees
+        self.overall['nodes'] += size
+        self.overall['matching_nodes'] += int(matching.sum())
+        self.overall['matching_trees'] += len(np.unique(arrays['tree'][matching]))
+        feat_pairs = arrays.feat_pairs() if any('feats_split' in stat for stat in self.stats) else None
+        for stat in self.stats:
+            owners, codes, labels = self.stat_values(arrays, stat, feat_pairs)
+            self._count(self.every[stat], codes, labels)
+            self._count(self.match[stat], codes[matching[owners]], labels)
+
+    @staticmethod
+    def _count(counter, codes, labels):
+        """Add the counts of `codes` to the counter in the order of their first occurrence."""
+        if not len(codes):
+            return
+        values, first, counts = np.unique(codes, return_index=True, return_counts=True)
+        for i, j in enumerate(np.argsort(first, kind='stable')):
+            counter[labels[values[j]]] += int(counts[j])
+            if i == 0:
+                counter['T O T A L'] += len(codes)
+
+    def stat_values(self, arrays, stat, feat_pairs=None):
+        """Return `(owners, codes, labels)` for the given statistic.
+
+        `labels[codes[i]]` is the i-th value of the statistic, which belongs to the node `owners[i]`.
+        The values are sorted by their owner nodes as they would be by util.See.
+        """
+        owners = np.arange(len(arrays))
+        if stat[:2] in ('p_', 'c_', 'l_', 'r_'):
+            prefix, stat = stat[:2], stat[2:]
+            head_index, ords = arrays.head_index, arrays['ord']
+            if prefix == 'p_':
+                targets = head_index
+            elif prefix == 'c_':
+                targets = np.flatnonzero(head_index >= 0)
+                targets = targets[np.argsort(head_index[targets], kind='stable')]
+                owners = head_index[targets]
+            elif prefix == 'l_':
+                targets = np.where(ords > 1, owners - 1, -1)
+            else:
+                owners = owners[ords < arrays.trees['words'][arrays['tree']]]
+                targets = owners + 1
+        else:
+            targets = owners
+        positions, codes, labels = self.attr_values(arrays, stat, targets, feat_pairs, owners)
+        return owners[positions], codes, labels
+
+    @staticmethod
+    def attr_values(arrays, name, targets, feat_pairs=None, owners=None):
+        """Return `(positions, codes, labels)` of the attribute `name` of the `targets`.
+
+        `targets` are indices of nodes, -1 means the technical root (of the tree of `owners`).
+        `positions` are indices into `targets`, which are repeated for multi-valued `feats_split`.
+        """
+        # pylint: disable=too-many-locals,too-many-return-statements
+        if owners is None:
+            owners = targets
+        positions = np.arange(len(targets))
+        is_root = targets < 0
+        nodes = np.where(is_root, 0, targets)
+        if name in _STRINGS:
+            labels = list(arrays.vocabs[name]) + ['<ROOT>']
+            return positions, np.where(is_root, len(labels) - 1, arrays[name][nodes]), labels
+        if name == 'feats_split':
+            rows, ids = feat_pairs if feat_pairs is not None else arrays.feat_pairs()
+            labels = list(arrays.vocabs['feats']) + ['_']
+            starts = np.zeros(len(arrays) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(rows, minlength=len(arrays)), out=starts[1:])
+            num_feats = np.where(is_root, 0, starts[nodes + 1] - starts[nodes])
+            repeats = np.maximum(num_feats, 1)
+            positions = np.repeat(positions, repeats)
+            offsets = np.arange(len(positions)) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+            has_feats = num_feats[positions] > 0
+            codes = np.full(len(positions), len(labels) - 1, dtype=np.int64)
+            codes[has_feats] = ids[starts[nodes[positions]][has_feats] + offsets[has_feats]]
+            return positions, codes, labels
+        head = arrays['head'][nodes]
+        if name == 'dir':
+            codes = np.where(head == 0, 0, np.where(arrays['ord'][nodes] < head, 1, 2))
+            return positions, np.where(is_root, 0, codes), _DIRS
+        if name == 'edge':
+            values = np.where(is_root | (head == 0), 0, arrays['ord'][nodes] - head)
+        elif name in ('children', 'siblings'):
+            trees = arrays['tree']
+            root_children = np.bincount(trees[arrays['head'] == 0], minlength=arrays.num_trees)
+            if name == 'children':
+                values = np.where(is_root, root_children[trees[owners]], arrays['children'][nodes])
+            else:
+                parent_children = np.where(head == 0, root_children[trees[nodes]],
+                                           arrays['children'][arrays.head_index[nodes]])
+                values = np.where(is_root, 0, parent_children - 1)
+        elif name in ('ord', 'depth'):
+            values = np.where(is_root, 0, arrays[name][nodes])
+        else:
+            raise ValueError(f'util.SeeArrays does not support the statistic {name}')
+        values, codes = np.unique(values, return_inverse=True)
+        return positions, codes.reshape(-1), [str(v) for v in values]
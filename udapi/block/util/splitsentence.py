@@ -40,7 +40,7 @@ class SplitSentence(Block):
         self.misc_value = misc_value
 
     def process_document(self, document):
-        for bundle_no, bundle in enumerate(document.bundles):
+        for bundle in document.bundles:
             # In general, a bundle may contain multiple trees in different zones.
             # In UD data, we always expect just one zone (labeled '') per bundle.
             # This code could be extended to split all zones but we do not try to do it at present.
@@ -58,8 +58,11 @@ class SplitSentence(Block):
                     n_new = len(split_points)
                     current_bid = bundle.bundle_id
                     idletter = 'B' # a letter will be added to bundle ids to distinguish them
+                    previous_bundle = bundle
                     for i in range(n_new):
-                        new_bundle = document.create_bundle()
+                        # Create the new bundle right after the previous one.
+                        new_bundle = document.create_bundle(after=previous_bundle)
+                        previous_bundle = new_bundle
                         new_bundle.bundle_id = current_bid + idletter
                         new_root = Root(zone='')
                         new_bundle.add_tree(new_root)
@@ -73,10 +76,6 @@ class SplitSentence(Block):
                         new_root.steal_nodes(nodes_to_move)
                         self.make_zeros_roots(new_root)
                         new_root.text = new_root.compute_text()
-                        # The new bundle was created at the end of the document.
-                        # Move it to the position right after the current bundle.
-                        document.bundles.pop()
-                        document.bundles.insert(bundle_no + i + 1, new_bundle)
                         idletter = chr(ord(idletter) + 1)
                         # Remove from the node the MISC attribute that triggered the sentence split.
                         split_points[i].misc[self.misc_name] = ''
@@ -84,27 +83,14 @@ class SplitSentence(Block):
                     bundle.bundle_id += 'A'
                     self.make_zeros_roots(root)
                     root.text = root.compute_text()
-                    # Update the bundle numbers of the new bundles and all bundles after them.
-                    updated_no = bundle_no + 1
-                    for b in document.bundles[(bundle_no+1):]:
-                        b.number = updated_no
-                        updated_no += 1
             elif bundle.bundle_id == self.sent_id:
                 logging.info('Found!')
                 root = bundle.get_tree()
                 nodes_to_move = [n for n in root.descendants if n.ord >= self.word_id]
                 if len(nodes_to_move) == 0:
                     logging.fatal('No nodes to move to the new sentence; word_id may be out of range')
-                # Create a new bundle at the end of the current document.
-                new_bundle = document.create_bundle()
-                # Move the new bundle to the position right after the current bundle.
-                new_bundle_no = bundle_no + 1
-                document.bundles.pop()
-                document.bundles.insert(new_bundle_no, new_bundle)
-                updated_no = new_bundle_no
-                for b in document.bundles[new_bundle_no:]:
-                    b.number = updated_no
-                    updated_no += 1
+                # Create a new bundle right after the current bundle.
+                new_bundle = document.create_bundle(after=bundle)
                 new_bundle.bundle_id = bundle.bundle_id + 'B'
                 bundle.bundle_id += 'A'
                 new_root = Root(zone='')
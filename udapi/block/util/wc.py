@@ -28,6 +28,15 @@ class Wc(Block):
         if tree.newpar:
             self.paragraphs += 1
 
+    _COUNTS = ('trees', 'words', 'mwts', 'tokens', 'empty', 'docs', 'paragraphs')
+
+    def export_state(self):
+        return {name: getattr(self, name) for name in self._COUNTS}
+
+    def merge_state(self, state):
+        for name in self._COUNTS:
+            setattr(self, name, getattr(self, name) + state[name])
+
     def process_end(self):
         if self.tsv:
             print('\t'.join(map(str, (self.trees, self.words, self.tokens, self.mwts, self.empty, self.docs, self.paragraphs))))
@@ -0,0 +1,52 @@
+"""WcArrays is a variant of util.Wc computing the statistics using NumPy arrays.
+
+Example usage::
+
+  udapy write.Npz files=corpus.npz < corpus.conllu
+  udapy util.WcArrays npz=corpus.npz
+
+The output is the same as of util.Wc, but with the `npz` parameter
+the statistics are computed from .npz file(s) created by write.Npz
+without loading (and parsing) the CoNLL-U files.
+See `udapi.core.arrays` for details.
+"""
+from udapi.block.util.wc import Wc
+
+
+class WcArrays(Wc):
+    """Print statistics (word count etc.) computed on `udapi.core.arrays.NodeArrays`."""
+
+    def __init__(self, npz=None, **kwargs):
+        """Create the WcArrays block object.
+
+        Params:
+        npz: comma-separated list of .npz files (created by write.Npz) to be counted
+        tsv: print just tab-separated-values (trees, words, tokens, MWTs, empty nodes)
+        """
+        super().__init__(**kwargs)
+        self.npz = npz
+        if npz:
+            # The runner treats blocks with the attribute `finished` as readers,
+            # so no documents will be read from stdin.
+            self.finished = True
+
+    def process_start(self):
+        super().process_start()
+        if self.npz:
+            from udapi.core.arrays import NodeArrays
+            for filename in self.npz.split(','):
+                self.process_arrays(NodeArrays.load(filename))
+
+    def process_document(self, document):
+        self.process_arrays(document.to_arrays())
+
+    def process_arrays(self, arrays):
+        """Add the counts of the given NodeArrays."""
+        trees = arrays.trees
+        self.trees += arrays.num_trees
+        self.words += int(trees['words'].sum())
+        self.mwts += int(trees['mwts'].sum())
+        self.tokens += int(trees['tokens'].sum())
+        self.empty += int(trees['empty'].sum())
+        self.docs += int(trees['newdoc'].sum())
+        self.paragraphs += int(trees['newpar'].sum())
@@ -53,7 +53,7 @@ class Conllu(BaseWriter):
         # keep them at their original position and print also all comment lines preceding them.
         # It they were missing, try to print them at the correct position.
         printed_i = -1
-        if comment_lines and comment_lines[0].startswith(' global.columns'):
+        if comment_lines and comment_lines[0] and comment_lines[0].startswith(' global.columns'):
             printed_i += 1
             yield comment_lines[printed_i]
         if self.print_sent_id:
@@ -101,10 +101,14 @@ class Conllu(BaseWriter):
             for key, value in sorted(tree.json.items()):
                 yield f" json_{key} = {json.dumps(value, ensure_ascii=False, sort_keys=True)}"
 
+    @staticmethod
+    def is_tree_local():
+        """This block just prints each tree."""
+        return True
+
     def process_tree(self, tree):  # pylint: disable=too-many-branches
-        empty_nodes = tree.empty_nodes
-        if empty_nodes:
-            nodes = sorted(tree._descendants + empty_nodes)
+        if tree.empty_nodes:
+            nodes = tree.descendants_and_empty
         else:
             nodes = tree._descendants
 
@@ -153,6 +157,10 @@ class Conllu(BaseWriter):
     def before_process_document(self, document):
         """Print doc_json_* headers."""
         super().before_process_document(document)
+        self.print_document_header(document)
+
+    def print_document_header(self, document):
+        """Print doc_json_* headers (called for each document before its first tree)."""
         if document.json:
             for key, value in sorted(document.json.items()):
                 print("# doc_json_%s = %s"
@@ -0,0 +1,132 @@
+"""Conllup class is a writer of files in the CoNLL-U Plus format.
+
+The ten CoNLL-U columns are followed by the extra columns stored in the side tables
+of the trees (see `Node.get_column`), e.g. loaded by read.Conllup with `extra_columns=table`:
+
+  udapy read.Conllup extra_columns=table files=in.cupt ud.FixPunct write.Conllup > out.cupt
+
+The output starts with the `# global.columns = ...` header.
+"""
+import re
+import sys
+
+from udapi.block.write.conllu import Conllu
+
+STANDARD_COLUMNS = ('ID', 'FORM', 'LEMMA', 'UPOS', 'XPOS', 'FEATS', 'HEAD', 'DEPREL', 'DEPS', 'MISC')
+RE_GLOBAL_COLUMNS = re.compile(r'^ ?global\.columns\s*=')
+
+
+class Conllup(Conllu):
+    """A writer of files in the CoNLL-U Plus format."""
+
+    def __init__(self, columns=None, **kwargs):
+        """Create the Conllup writer object.
+
+        Args:
+        columns: comma-separated list of the extra columns (printed after the ten CoNLL-U columns),
+            e.g. `columns=PARSEME:MWE`. Default=None means all the extra columns
+            of the trees in each document (`root.extra_columns`), in the order of their first occurrence.
+        """
+        super().__init__(**kwargs)
+        self.columns = tuple(columns.split(',')) if columns else None
+        self._doc_columns = self.columns or ()
+        self._header_printed_to = None
+
+    def is_tree_local(self):  # pylint: disable=arguments-differ
+        """Autodetecting the columns needs all the trees of a document.
+
+        Unlike in other blocks, this is not a static method because it depends on `columns`.
+        """
+        return self.columns is not None
+
+    def print_document_header(self, document):
+        """Print the global.columns header (at the beginning of each file) and doc_json_* headers."""
+        if self.columns is None:
+            columns = {}
+            for bundle in document.bundles:
+                for tree in bundle:
+                    if tree.extra_columns:
+                        columns.update(dict.fromkeys(tree.extra_columns))
+            self._doc_columns = tuple(columns)
+        if self._header_printed_to is not sys.stdout:
+            self._header_printed_to = sys.stdout
+            print('# global.columns = ' + ' '.join(STANDARD_COLUMNS + self._doc_columns))
+        super().print_document_header(document)
+
+    def iter_comment_lines(self, tree):
+        for line in super().iter_comment_lines(tree):
+            # The header is printed just once at the beginning of the file.
+            if not RE_GLOBAL_COLUMNS.match(line):
+                yield line
+
+    def extra_columns_getter(self, tree):
+        """Return a function returning the tab-prefixed values of the extra columns of a node or MWT."""
+        # pylint: disable=protected-access
+        columns = self._doc_columns
+        if not columns:
+            return lambda _: ''
+        missing = '\t' + '\t'.join(['_'] * len(columns))
+        table, tree_columns = tree._extra_values, tree.extra_columns
+        if not table:
+            return lambda _: missing
+        if tree_columns == columns:
+            def getter(obj):
+                values = table.get(obj)
+                if values is None:
+                    return missing
+                if len(values) < len(columns):
+                    values = values + ('_',) * (len(columns) - len(values))
+                return '\t' + '\t'.join(values)
+            return getter
+        indices = [tree_columns.index(name) if name in tree_columns else None for name in columns]
+
+        def mapping_getter(obj):
+            values = table.get(obj)
+            if values is None:
+                return missing
+            return '\t' + '\t'.join(values[i] if i is not None and i < len(values) else '_' for i in indices)
+        return mapping_getter
+
+    # Acknowledged code duplication with write.Conllu (the code is speed-critical).
+    def process_tree(self, tree):  # pylint: disable=too-many-branches
+        if tree.empty_nodes:
+            nodes = tree.descendants_and_empty
+        else:
+            nodes = tree._descendants
+
+        if not nodes and not self.print_empty_trees:
+            return
+
+        for line in self.iter_comment_lines(tree):
+            print('#' + line)
+
+        extra = self.extra_columns_getter(tree)
+        last_mwt_id = 0
+        for node in nodes:
+            mwt = node._mwt
+            if mwt and node._ord > last_mwt_id:
+                print('\t'.join((mwt.ord_range,
+                                 '_' if mwt.form is None else mwt.form,
+                                 '_\t_\t_',
+                                 '_' if mwt._feats is None else str(mwt.feats),
+                                 '_\t_\t_',
+                                 '_' if mwt._misc is None else str(mwt.misc))) + extra(mwt))
+                last_mwt_id = mwt.words[-1]._ord
+
+            if node._parent is None:
+                head = '_'  # Empty nodes
+            else:
+                try:
+                    head = str(node._parent._ord)
+                except AttributeError:
+                    head = '0'
+
+            print('\t'.join('_' if v is None else v for v in
+                            (str(node._ord), node.form, node.lemma, node.upos, node.xpos,
+                             '_' if node._feats is None else str(node.feats), head, node.deprel,
+                             node.raw_deps, '_' if node._misc is None else str(node.misc))) + extra(node))
+
+        if not tree._descendants:
+            print("1\t_\t_\t_\t_\t_\t0\t_\t_\tEmpty=Yes" + extra(None))
+
+        print("")
@@ -12,12 +12,25 @@ and browse http://0.0.0.0:8000/my.html.
 
 Non-recommended solution is to run
  google-chrome --new-window --user-data-dir=/tmp/chrome-proxy --allow-file-access-from-files my.html
+
+For big corpora with many documents (newdoc), the secondary documents
+(`docs_dir/doc{i}.html.gz` and `docs_dir/doc{i}.json.gz`) can be generated
+in parallel with `workers=N` (`workers=0` means all CPU cores), e.g.
+  udapy write.CorefHtml workers=0 < corpus.conllu > corpus.html
+The compact index of entities and their mentions (`docs_dir/index.json.gz`)
+allows the browser to load just the documents needed when jumping to an entity
+in the overview table.
 """
 from udapi.core.basewriter import BaseWriter
 from udapi.core.coref import span_to_nodes, CorefEntity, CorefMention
 from collections import Counter
 import udapi.block.write.html
+import contextlib
 import gzip
+import io
+import json
+import logging
+import multiprocessing
 import sys
 import os
 import re
@@ -140,6 +153,27 @@ function load_more() {
   }
 }
 $(window).scroll(load_more);
+
+var entity_index = null;
+async function show_entity(eid) {
+  if (document.getElementById(eid) == null && all_docs > 1) {
+    try {
+      if (entity_index == null) {
+        const res = await fetch(docs_dir + "/index.json.gz");
+        let raw = await res.arrayBuffer();
+        entity_index = JSON.parse(pako.inflate(raw, {to: "string"}));
+      }
+      let doc_num = entity_index.entities[eid][0][0];
+      while (docs_loaded < doc_num) {
+        docs_loaded += 1;
+        await load_doc(docs_loaded);
+      }
+    } catch (error) {
+      console.log("cannot load the entity index: " + error);
+    }
+  }
+  window.location.hash = eid;
+}
 const resizeObserver = new ResizeObserver(entries =>load_more());
 resizeObserver.observe(document.body);
 '''
@@ -188,10 +222,47 @@ add_show_tree_button = function(index, el){
 
 WRITE_HTML = udapi.block.write.html.Html()
 
+# CorefHtml and the list of ud_docs, inherited by the forked worker processes.
+_FORKED_STATE = None
+
+
+def _write_doc_in_worker(doc_num):
+    writer, ud_docs = _FORKED_STATE
+    writer._write_doc_files(ud_docs[doc_num - 1], doc_num)
+
+
+def _capture_stdout(func, *args):
+    """Return a string with everything printed by `func(*args)`."""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        func(*args)
+    return output.getvalue()
+
+
+def _write_gz(filename, string):
+    # Compressing the whole string at once is much faster than printing into gzip.open().
+    # mtime=0 makes the output reproducible.
+    with open(filename, 'wb') as gz_file:
+        gz_file.write(gzip.compress(string.encode('utf-8'), mtime=0))
+
+
 class CorefHtml(BaseWriter):
 
-    def __init__(self, docs_dir='docs', path_to_js='web',
-                 show_trees=True, show_eid=False, show_etype=False, colors=7, rtl=None, **kwargs):
+    def __init__(self, docs_dir='docs', path_to_js='web', show_trees=True, show_eid=False,
+                 show_etype=False, colors=7, rtl=None, workers=1, **kwargs):
+        """Create the CorefHtml writer.
+
+        Args:
+        docs_dir: directory for the secondary documents (loaded lazily) and the entity index
+        path_to_js: 'web' (load JavaScript libraries from CDN) or a local path to them
+        show_trees: add buttons for showing dependency trees
+        show_eid: show entity IDs by default
+        show_etype: show entity types by default
+        colors: number of text colors used for distinguishing entities of the same type
+        rtl: right-to-left script
+        workers: number of processes writing the secondary documents.
+            Default=1 means no parallelization, 0 means all CPU cores.
+        """
         super().__init__(**kwargs)
         self.path_to_js = path_to_js
         self.show_trees = show_trees
@@ -199,6 +270,7 @@ class CorefHtml(BaseWriter):
         self.show_etype = show_etype
         self.colors = colors
         self.rtl = rtl
+        self.workers = workers or os.cpu_count() or 1
         self.js_docs_dir = docs_dir
         self.docs_dir = docs_dir
         if self.path:
@@ -210,6 +282,11 @@ class CorefHtml(BaseWriter):
         self._mention_ids = {}
         self._entity_colors = {}
 
+    @staticmethod
+    def is_cacheable():
+        """Return False because the secondary documents are written to `docs_dir`."""
+        return False
+
     def _representative_word(self, entity):
         # return the first PROPN or NOUN. Or the most frequent one?
         heads = [m.head for m in entity.mentions]
@@ -234,7 +311,6 @@ class CorefHtml(BaseWriter):
                 doc_num += 1
             ud_docs[-1].append(tree)
             sent_id2doc[tree.sent_id] = doc_num
-        # TODO: use sent_id2doc
 
         print('<!DOCTYPE html><html lang="en"><head><meta charset="UTF-8">')
         print('<title>Udapi CorefUD viewer</title>')
@@ -281,7 +357,9 @@ class CorefHtml(BaseWriter):
               '<th title="number of mentions">#m</th>'
               '<th title="a word best representing the entity">word</th></tr></thead>\n<tbody>')
         for entity in doc.coref_entities:
-            print(f'<tr><td><a href="#{_dom_esc(entity.eid)}">{entity.eid}</a></td>'
+            dom_eid = _dom_esc(entity.eid)
+            print(f'<tr><td><a href="#{dom_eid}" onclick="show_entity(\'{dom_eid}\'); return false;">'
+                  f'{entity.eid}</a></td>'
                   f'<td>{len(entity.mentions)}</td>'
                   f'<td>{self._representative_word(entity)}</td></tr>')
         print('</tbody></table>')
@@ -309,19 +387,22 @@ class CorefHtml(BaseWriter):
               '<button id="menubtn" title="Visualization options" onclick="menuclick(this)"><div class="b1"></div><div class="b2"></div><div class="b3"></div></button>\n'
               )
 
-        # The first ud_doc will be printed to the main html file.
-        self.process_ud_doc(ud_docs[0], 1)
-        print('</div>') # id=main
-
-        # Other ud_docs will be printed into separate files (so they can be loaded lazily)
-        orig_stdout = sys.stdout
+        # Other ud_docs will be printed into separate files (so they can be loaded lazily),
+        # possibly in parallel with printing the first ud_doc into the main html file.
+        pool, result = self._start_writing_docs(ud_docs)
         try:
-            for i, ud_doc in enumerate(ud_docs[1:], 2):
-                sys.stdout = gzip.open(f"{self.docs_dir}/doc{i}.html.gz", 'wt')
-                self.process_ud_doc(ud_doc, i)
-                sys.stdout.close()
+            self.process_ud_doc(ud_docs[0], 1)
+            print('</div>') # id=main
+            if pool is not None:
+                result.get()
+            else:
+                for i, ud_doc in enumerate(ud_docs[1:], 2):
+                    self._write_doc_files(ud_doc, i)
         finally:
-            sys.stdout = orig_stdout
+            if pool is not None:
+                pool.terminate()
+        if len(ud_docs) > 1:
+            self._write_index(doc, sent_id2doc)
 
         print(f'<script>\nvar all_docs = {len(ud_docs)};\nvar docs_dir = "{self.js_docs_dir}";')
         print(SCRIPT_BASE)
@@ -329,18 +410,62 @@ class CorefHtml(BaseWriter):
             print('docs_json = [false, ', end='') # 1-based index, so dummy docs_json[0]
             WRITE_HTML.print_doc_json(ud_docs[0])
             print('];')
-            try:
-                for i, ud_doc in enumerate(ud_docs[1:], 2):
-                    sys.stdout = gzip.open(f"{self.docs_dir}/doc{i}.json.gz", 'wt')
-                    WRITE_HTML.print_doc_json(ud_doc)
-                    sys.stdout.close()
-            finally:
-                sys.stdout = orig_stdout
             print(SCRIPT_SHOWTREE)
         print('$("#doc1 .sentence").each(add_show_tree_button);')
         print('</script>')
         print('</div></body></html>')
 
+    def _write_doc_files(self, ud_doc, doc_num):
+        """Write the html (and json) files for the secondary ud_doc number `doc_num`."""
+        html = _capture_stdout(self.process_ud_doc, ud_doc, doc_num)
+        _write_gz(f'{self.docs_dir}/doc{doc_num}.html.gz', html)
+        if self.show_trees:
+            _write_gz(f'{self.docs_dir}/doc{doc_num}.json.gz',
+                      _capture_stdout(WRITE_HTML.print_doc_json, ud_doc))
+
+    def _start_writing_docs(self, ud_docs):
+        """Start writing the secondary ud_docs in a pool of worker processes.
+
+        Return the pool and the AsyncResult or (None, None) if the docs should be written serially.
+        The workers are forked, so they inherit the document without any serialization.
+        """
+        global _FORKED_STATE  # pylint: disable=global-statement
+        workers = min(self.workers, len(ud_docs) - 1)
+        if workers < 2:
+            return None, None
+        try:
+            context = multiprocessing.get_context('fork')
+        except ValueError:
+            logging.warning('write.CorefHtml workers=%d not supported on this platform', self.workers)
+            return None, None
+        # Unflushed output would be duplicated in the forked processes.
+        sys.stdout.flush()
+        _FORKED_STATE = (self, ud_docs)
+        try:
+            pool = context.Pool(workers)
+        finally:
+            _FORKED_STATE = None
+        chunksize = max(1, (len(ud_docs) - 1) // (workers * 4))
+        result = pool.map_async(_write_doc_in_worker, range(2, len(ud_docs) + 1), chunksize)
+        pool.close()
+        return pool, result
+
+    def _write_index(self, doc, sent_id2doc):
+        """Write a compact index of all entities: for each entity, a list of [doc_num, mentions]."""
+        entities = {}
+        for entity in doc.coref_entities:
+            docs = []
+            for mention in entity.mentions:
+                doc_num = sent_id2doc[mention.head.root.sent_id]
+                if docs and docs[-1][0] == doc_num:
+                    docs[-1][1] += 1
+                else:
+                    docs.append([doc_num, 1])
+            entities[_dom_esc(entity.eid)] = docs
+        _write_gz(f'{self.docs_dir}/index.json.gz',
+                  json.dumps({'docs': len(set(sent_id2doc.values())), 'entities': entities},
+                             separators=(',', ':')))
+
     def _start_subspan(self, subspan, crossing=False):
         m = subspan.mention
         e = m.entity
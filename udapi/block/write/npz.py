@@ -0,0 +1,42 @@
+"""Npz class is a writer of node attributes as NumPy arrays (.npz files).
+
+Usage::
+
+  udapy write.Npz files=corpus.npz < corpus.conllu
+
+The arrays of all processed documents are concatenated and saved at the end
+into one compressed .npz file, which can be loaded with
+``udapi.core.arrays.NodeArrays.load('corpus.npz')``
+or used by blocks util.SeeArrays and util.WcArrays (parameter `npz`).
+Only the attributes stored in `NodeArrays` are saved (e.g. MISC and DEPS are not),
+so the .npz file is not a replacement of the CoNLL-U file.
+"""
+from udapi.core.block import Block
+
+
+class Npz(Block):
+    """Save node attributes of all documents as NumPy arrays into an .npz file."""
+
+    def __init__(self, files='corpus.npz', **kwargs):
+        """Create the Npz writer block.
+
+        Parameters:
+        files: the name of the .npz file to be created (default=corpus.npz)
+        """
+        super().__init__(**kwargs)
+        self.files = files
+        self._parts = []
+
+    @staticmethod
+    def is_cacheable():
+        """This block creates an extra file."""
+        return False
+
+    def process_document(self, document):
+        self._parts.append(document.to_arrays())
+
+    def process_end(self):
+        from udapi.core.arrays import NodeArrays
+        arrays = self._parts[0] if len(self._parts) == 1 else NodeArrays.concatenate(self._parts)
+        arrays.save(self.files)
+        self._parts = []
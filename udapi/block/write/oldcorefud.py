@@ -5,6 +5,11 @@ import udapi.block.write.conllu
 
 class OldCorefUD(udapi.block.write.conllu.Conllu):
 
+    @staticmethod
+    def is_tree_local():
+        """This block needs the coreference entities of the whole document."""
+        return False
+
     def process_document(self, doc):
         if not doc.coref_entities:
             logging.warning("Using write.OldCorefUD on a document without any coreference annotation")
@@ -4,7 +4,6 @@ import re
 import sys
 
 import colorama
-import collections
 from termcolor import colored
 from udapi.core.basewriter import BaseWriter
 
@@ -17,6 +16,9 @@ COLOR_OF = {
     'misc[Entity]': 'magenta',
 }
 
+# Attributes which can be read directly with getattr(node, attr), see _node_values().
+PLAIN_ATTRS = frozenset(('ord', 'form', 'lemma', 'upos', 'xpos', 'deprel', 'feats', 'misc', 'deps'))
+
 # Too many instance variables, arguments, branches...
 # I don't see how to fix this while not making the code less readable or more difficult to use.
 # pylint: disable=R0902,R0912,R0913,R0914
@@ -218,26 +220,48 @@ class TextModeTrees(BaseWriter):
         if mark is not None and mark != '':
             self.mark_re = re.compile(mark + '=')
             self.comment_mark_re = re.compile(r'^ %s = ' % mark, re.M)
-        self._index_of = []
-        self._gaps = collections.Counter()
         self.lines = []
         self.lengths = []
 
     # We want to be able to call process_tree not only on root node,
     # so this block can be called from node.print_draw(**kwargs)
     # on any node and print its subtree. Thus, we cannot assume that
-    # allnodes[idx].ord == idx. Instead of node.ord, we'll use index_of[node.ord],
-    # which is its index within the printed subtree.
-    # gaps[node.ord] = number of nodes within node's span, which are not its descendants.
-    def _compute_gaps(self, node):
-        lmost, rmost, descs = self._index_of[node.ord], self._index_of[node.ord], 0
-        for child in node.children:
-            _lm, _rm, _de = self._compute_gaps(child)
-            lmost = min(_lm, lmost)
-            rmost = max(_rm, rmost)
-            descs += _de
-        self._gaps[node.ord] = rmost - lmost - descs
-        return lmost, rmost, descs + 1
+    # allnodes[idx].ord == idx. Instead of node.ord, the layout is computed
+    # with idx, which is the node's index within the printed subtree.
+    # The tree structure is converted into two arrays indexed by idx
+    # (parents[idx] is the parent's idx or -1, children[idx] are sorted children's idx),
+    # so that the rest of the layout computation needs no dict lookups or node method calls.
+    @staticmethod
+    def _tree_arrays(root, allnodes):
+        index_of = {node.ord_range if node.is_mwt() else node.ord: idx
+                    for idx, node in enumerate(allnodes)}
+        parents = [-1] * len(allnodes)
+        children = [[] for _ in allnodes]
+        for idx, node in enumerate(allnodes):
+            if node is not root and not node.is_mwt() and not node.is_empty():
+                parent_idx = index_of[node.parent.ord]
+                parents[idx] = parent_idx
+                children[parent_idx].append(idx)
+        return index_of[root.ord], parents, children
+
+    # gaps[idx] = number of nodes within node's span, which are not its descendants.
+    # The nodes are processed bottom-up (children before their parents) without recursion,
+    # so arbitrarily deep trees can be printed.
+    @staticmethod
+    def _compute_gaps(root_idx, parents, children):
+        order = [root_idx]
+        for idx in order:
+            order.extend(children[idx])
+        lmost, rmost = list(range(len(parents))), list(range(len(parents)))
+        descs, gaps = [1] * len(parents), [0] * len(parents)
+        for idx in reversed(order):
+            gaps[idx] = rmost[idx] - lmost[idx] + 1 - descs[idx]
+            parent_idx = parents[idx]
+            if parent_idx >= 0:
+                lmost[parent_idx] = min(lmost[parent_idx], lmost[idx])
+                rmost[parent_idx] = max(rmost[parent_idx], rmost[idx])
+                descs[parent_idx] += descs[idx]
+        return gaps
 
     def should_print_tree(self, root, allnodes):
         """Should this tree be printed?"""
@@ -249,6 +273,11 @@ class TextModeTrees(BaseWriter):
             return False
         return self.comment_mark_re.search(root.comment)
 
+    @staticmethod
+    def is_tree_local():
+        """This block just prints each tree (or bundle)."""
+        return True
+
     def process_tree(self, root, force_print=False):
         """Print the tree to (possibly redirected) sys.stdout."""
         if self.print_empty:
@@ -263,50 +292,64 @@ class TextModeTrees(BaseWriter):
             allnodes = root.descendants(add_self=1, add_mwt=self.print_mwt)
         if not force_print and not self.should_print_tree(root, allnodes):
             return
-        self._index_of = {allnodes[i].ord_range if allnodes[i].is_mwt() else allnodes[i].ord: i for i in range(len(allnodes))}
-        self.lines = [''] * len(allnodes)
-        self.lengths = [0] * len(allnodes)
+        root_idx, parents, children = self._tree_arrays(root, allnodes)
+
+        # Each line is a list of strings (joined just once when printing)
+        # and lengths[idx] is the number of printed characters of the line (excluding color markup).
+        self.lines = lines = [[] for _ in allnodes]
+        self.lengths = lengths = [0] * len(allnodes)
 
         # Precompute the number of non-projective gaps for each subtree
-        if self.minimize_cross:
-            self._compute_gaps(root)
+        gaps = self._compute_gaps(root_idx, parents, children) if self.minimize_cross else None
 
         # Precompute lines for printing
-        stack = [root, ]
+        classic = self.layout == 'classic'
+        # All the drawing segments (self._draw, self._vert, self._space, self._horiz) have this length.
+        draw_length = self.indent + 1
+        edge_ends = '─╭╰╪┡┢'
+        stack = [root_idx]
         while stack:
-            node = stack.pop()
-            children = node.children(add_self=1)
-            min_idx, max_idx = self._index_of[children[0].ord], self._index_of[children[-1].ord]
-            max_length = max([self.lengths[i] for i in range(min_idx, max_idx + 1)])
+            node_idx = stack.pop()
+            min_idx = max_idx = node_idx
+            if children[node_idx]:
+                min_idx = min(node_idx, children[node_idx][0])
+                max_idx = max(node_idx, children[node_idx][-1])
+            max_length = max(lengths[min_idx:max_idx + 1])
             for idx in range(min_idx, max_idx + 1):
-                idx_node = allnodes[idx]
-                filler = '─' if self._ends(idx, '─╭╰╪┡┢') else ' '
-                self._add(idx, filler * (max_length - self.lengths[idx]))
+                line = lines[idx]
+                # Does the line end with an edge (which should be prolonged)?
+                ends_edge = bool(line) and line[-1][-1] in edge_ends
+                if lengths[idx] < max_length:
+                    line.append(('─' if ends_edge else ' ') * (max_length - lengths[idx]))
+                    lengths[idx] = max_length
 
                 topmost = idx == min_idx
                 botmost = idx == max_idx
-                if idx_node is node:
-                    self._add(idx, self._draw[botmost][topmost])
-                    if self.layout == 'classic':
-                        self.add_node(idx, node)
+                if idx == node_idx:
+                    line.append(self._draw[botmost][topmost])
+                    lengths[idx] += draw_length
+                    if classic:
+                        self.add_node(idx, allnodes[idx])
+                elif parents[idx] != node_idx:
+                    line.append(self._vert[ends_edge])
+                    lengths[idx] += draw_length
                 else:
-                    if idx_node.is_mwt() or idx_node.parent is not node:
-                        self._add(idx, self._vert[self._ends(idx, '─╭╰╪┡┢')])
+                    precedes_parent = idx < node_idx
+                    line.append(self._space[precedes_parent][topmost or botmost])
+                    lengths[idx] += draw_length
+                    if children[idx]:
+                        stack.append(idx)
                     else:
-                        precedes_parent = idx < self._index_of[node.ord]
-                        self._add(idx, self._space[precedes_parent][topmost or botmost])
-                        if idx_node.is_leaf():
-                            self._add(idx, self._horiz)
-                            if self.layout == 'classic':
-                                self.add_node(idx, idx_node)
-                        else:
-                            stack.append(idx_node)
+                        line.append(self._horiz)
+                        lengths[idx] += draw_length
+                        if classic:
+                            self.add_node(idx, allnodes[idx])
 
             # sorting the stack to minimize crossings of edges
-            if self.minimize_cross:
-                stack.sort(key=lambda x: -self._gaps[x.ord])
+            if gaps is not None:
+                stack.sort(key=lambda x: -gaps[x])
 
-        if self.layout == 'classic':
+        if classic:
             for idx, node in enumerate(allnodes):
                 if node.is_empty() or node.is_mwt():
                     self.add_node(idx, node)
@@ -314,20 +357,17 @@ class TextModeTrees(BaseWriter):
             columns_attrs = [[a] for a in self.attrs] if self.layout == 'align' else [self.attrs]
             for col_attrs in columns_attrs:
                 self.attrs = col_attrs
-                max_length = max(self.lengths)
+                max_length = max(lengths)
                 for idx, node in enumerate(allnodes):
-                    if self.layout.startswith('align'):
-                        self._add(idx, ' ' * (max_length - self.lengths[idx]))
+                    if self.layout.startswith('align') and lengths[idx] < max_length:
+                        self._add(idx, ' ' * (max_length - lengths[idx]))
                     self.add_node(idx, node)
             self.attrs = [a for sublist in columns_attrs for a in sublist]
 
         # Print headers (if required) and the tree itself
         self.print_headers(root)
-        for line in self.lines:
-            print(line)
-
-        if self.add_empty_line:
-            print('')
+        sys.stdout.write('\n'.join(''.join(line) for line in lines)
+                         + ('\n\n' if self.add_empty_line else '\n'))
 
     def print_headers(self, root):
         """Print sent_id, text and other comments related to the tree."""
@@ -339,7 +379,7 @@ class TextModeTrees(BaseWriter):
             print('#' + self.colorize_comment(root.comment.rstrip().replace('\n', '\n#')))
 
     def _ends(self, idx, chars):
-        return bool(self.lines[idx] and self.lines[idx][-1] in chars)
+        return bool(self.lines[idx] and self.lines[idx][-1][-1] in chars)
 
     def before_process_document(self, document):
         """Initialize ANSI colors if color is True or 'auto'.
@@ -362,23 +402,32 @@ class TextModeTrees(BaseWriter):
                     print('%s = %s' % (key, value))
 
     def _add(self, idx, text):
-        self.lines[idx] += text
+        self.lines[idx].append(text)
         self.lengths[idx] += len(text)
 
     def add_node(self, idx, node):
         """Render a node with its attributes."""
         if node.is_mwt() or not node.is_root():
-            values = node.get_attrs(self.attrs, undefs=self.print_undef_as)
+            values = self._node_values(node)
             self.lengths[idx] += 1 + len(' '.join(values))
             marked = self.is_marked(node)
             if self.color:
                 for i, attr in enumerate(self.attrs):
                     values[i] = self.colorize_attr(attr, values[i], marked)
             if not self.color and marked:
-                self.lines[idx] += ' **' + ' '.join(values) + '**'
+                self.lines[idx].append(' **' + ' '.join(values) + '**')
                 self.lengths[idx] += 4
             else:
-                self.lines[idx] += ' ' + ' '.join(values)
+                self.lines[idx].append(' ' + ' '.join(values))
+
+    def _node_values(self, node):
+        """Return a list of strings with values of self.attrs for a given node."""
+        if node.is_mwt() or not PLAIN_ATTRS.issuperset(self.attrs):
+            return node.get_attrs(self.attrs, undefs=self.print_undef_as)
+        # Faster equivalent of node.get_attrs() for the most common attributes
+        undef = self.print_undef_as
+        return [undef if value is None else str(value)
+                for value in (getattr(node, attr) for attr in self.attrs)]
 
     def is_marked(self, node):
         """Should a given node be highlighted?"""
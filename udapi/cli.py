@@ -58,6 +58,64 @@ argparser.add_argument(
          "to speed up everything (especially reading CoNLL-U files). In edge cases,\n"
          "when processing many files and running out of memory, you can disable this\n"
          "optimization (i.e. enable garbage collection) with 'udapy --gc'.")
+argparser.add_argument(
+    "--gc_mode", choices=['off', 'full', 'tuned'],
+    help="Garbage collection mode: 'off' is the default (see above), 'full' is the same as --gc.\n"
+         "'tuned' keeps the automatic garbage collection disabled while processing\n"
+         "(and freezes all objects created during the startup), but runs a full\n"
+         "collection after each document is processed (i.e. once per round).\n"
+         "This keeps memory bounded in long multi-file runs at a fraction of the cost of --gc,\n"
+         "especially together with --release_docs.")
+argparser.add_argument(
+    "--release_docs", action="store_true",
+    help="Break reference cycles in each document (Document.release()) after the last block\n"
+         "of the scenario has processed it, so its memory is freed immediately even without\n"
+         "garbage collection. Do not use it with blocks which keep references to nodes\n"
+         "of previous documents.")
+argparser.add_argument(
+    "--stream", action="store_true",
+    help="If the scenario starts with one reader and all other blocks are tree-local\n"
+         "(e.g. 'read.Conllu ud.FixPunct write.Conllu', see Block.is_tree_local()),\n"
+         "process each sentence (bundle) by all blocks as soon as it is read and then free it,\n"
+         "so the whole document is never loaded in memory.\n"
+         "Otherwise, only the tree-local blocks before the first other block are streamed\n"
+         "and the document is kept in memory for the remaining blocks.\n"
+         "Document-level metadata (e.g. doc_json_*) are then taken from the comments\n"
+         "read before the first sentence is processed.")
+argparser.add_argument(
+    "--memory_report", action="store_true",
+    help="After each round (i.e. after each document is processed by all blocks),\n"
+         "print the current and peak RSS of the process and the estimated size of the document\n"
+         "to STDERR. At the end, print the memory footprint per component (Node objects,\n"
+         "strings, FEATS, MISC, coreference,...), see also block util.MemStats.")
+argparser.add_argument(
+    "--cache_dir", metavar="DIR",
+    help="Cache the output of the scenario in DIR (default: $UDAPI_CACHE_DIR, i.e. no cache).\n"
+         "If the same scenario is applied again on unchanged input files (with the same\n"
+         "version of Udapi), the cached output is printed instead of recomputing it.\n"
+         "Only scenarios printing to STDOUT (no files=, overwrite=1 etc. in writers) are cached,\n"
+         "their STDERR output (including log messages) is cached as well.")
+argparser.add_argument(
+    "--cache_size", metavar="MB", type=float,
+    help="Maximal size of the cache directory in MiB (default 1024). Least recently used\n"
+         "entries are deleted when the cache grows bigger.")
+argparser.add_argument(
+    "--no_cache", action="store_true",
+    help="Do not use the result cache even if --cache_dir or $UDAPI_CACHE_DIR is set.")
+argparser.add_argument(
+    "--save_state", metavar="FILE",
+    help="Do not print the final results of blocks which collect statistics\n"
+         "(util.Wc, util.See, eval.F1, eval.Conll18, corefud.Stats, corefud.MiscStats),\n"
+         "but save their partial results (state) into a JSON FILE instead.\n"
+         "For example, you can process each shard of a corpus on a different machine\n"
+         "  udapy --save_state part1.json read.Conllu files=shard1.conllu util.Wc\n"
+         "and merge the partial results afterwards with --merge_states.")
+argparser.add_argument(
+    "--merge_states", metavar="FILES",
+    help="Merge the partial results saved with --save_state and print the final results.\n"
+         "The scenario is loaded from the state files, so it should not be specified.\n"
+         "FILES can be a comma-separated list, !wildcard or @filelist (as in files=),\n"
+         "for example: udapy --merge_states '!part*.json'")
 argparser.add_argument(
     'scenario', nargs=argparse.REMAINDER, help="A sequence of blocks and their parameters.")
 
@@ -100,7 +158,13 @@ def main(argv=None):
     # The udapy wrapper is aimed for one-time tasks, not a long-running server,
     # so in a typical case a document is loaded and almost no memory is freed before the end.
     # Udapi documents have a many cyclic references, so running GC is quite slow.
-    if not args.gc:
+    if args.gc:
+        args.gc_mode = 'full'
+    if args.gc_mode == 'tuned':
+        # Objects created so far (modules, classes,...) are never garbage, so exclude them
+        # from all future collections, which then need to traverse just the document objects.
+        gc.freeze()
+    if args.gc_mode != 'full':
         gc.disable()
         # When an exception/error has happened, udapy should exit with a non-zero exit code,
         # so that users can use `udapy ... || echo "Error detected"` (or Makefile reports errors).
@@ -0,0 +1,210 @@
+"""Character-level alignment of two strings (e.g. tree tokens vs. raw text).
+
+The main function `diff_opcodes(a, b)` returns the same format as
+``difflib.SequenceMatcher(None, a, b, autojunk=False).get_opcodes()``,
+i.e. a list of ``(tag, a_lo, a_hi, b_lo, b_hi)`` tuples with tags
+``equal``, ``replace``, ``delete`` and ``insert``, but it is much faster
+on long sequences with few differences (which is the typical case in Udapi):
+
+1. The common prefix and suffix are skipped (in C speed, using string comparisons).
+2. The rest is aligned with the O(ND) algorithm by Eugene W. Myers (1986),
+   which finds a minimal edit script (i.e. the LCS) in time proportional
+   to the length of the strings times the number of differences D.
+3. If D is higher than `max_d`, which means the two strings are very different,
+   the O(ND) algorithm would be too slow, so an LCS restricted to a diagonal band
+   (of width `band` characters around the main diagonal) is used instead.
+   The result is still a valid alignment, but it may be suboptimal.
+
+difflib's heuristic (the longest contiguous matching block first, recursively)
+is quadratic in the worst case, e.g. on long strings with many repeated characters,
+which is common when aligning characters of natural-language texts.
+"""
+
+DEFAULT_MAX_D = 500
+DEFAULT_BAND = 100
+
+# Unicode category Zs (space separators), see unicodedata.category(c) == 'Zs'.
+SPACE_SEPARATORS = ('\u0020\u00a0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006'
+                    '\u2007\u2008\u2009\u200a\u202f\u205f\u3000')
+_DELETE_SPACES = str.maketrans('', '', SPACE_SEPARATORS)
+
+
+def strip_spaces(string):
+    """Return the string without any space separators (Unicode category Zs)."""
+    return string.translate(_DELETE_SPACES)
+
+
+def common_prefix_length(a, b):
+    """Return the length of the longest common prefix of two sequences."""
+    lo, hi = 0, min(len(a), len(b))
+    if a[:hi] == b[:hi]:
+        return hi
+    # Binary search with slice comparisons is much faster than a Python loop over characters.
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[lo:mid] == b[lo:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def common_suffix_length(a, b):
+    """Return the length of the longest common suffix of two sequences."""
+    lo, hi = 0, min(len(a), len(b))
+    len_a, len_b = len(a), len(b)
+    if a[len_a - hi:] == b[len_b - hi:]:
+        return hi
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[len_a - mid:len_a - lo] == b[len_b - mid:len_b - lo]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _myers_matches(a, b, max_d):
+    """Return a list of matching index pairs (i, j) of a minimal diff, or None if D > max_d."""
+    n, m = len(a), len(b)
+    offset = max_d + 1
+    v = [0] * (2 * max_d + 3)
+    trace = []
+    for d in range(max_d + 1):
+        # Store the relevant part of v (diagonals -d-1..d+1) before this round, for the backtracking.
+        trace.append(v[offset - d - 1:offset + d + 2])
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[x] == b[y]:
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                return _myers_backtrack(trace, n, m)
+    return None
+
+
+def _myers_backtrack(trace, x, y):
+    matches = []
+    for d in range(len(trace) - 1, -1, -1):
+        v_d = trace[d]  # v_d[k + d + 1] is the furthest x on diagonal k after round d-1
+        k = x - y
+        if k == -d or (k != d and v_d[k - 1 + d + 1] < v_d[k + 1 + d + 1]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = v_d[prev_k + d + 1] if d else 0
+        prev_y = prev_x - prev_k if d else 0
+        while x > prev_x and y > prev_y:
+            x -= 1
+            y -= 1
+            matches.append((x, y))
+        x, y = prev_x, prev_y
+    matches.reverse()
+    return matches
+
+
+def _banded_matches(a, b, band):
+    """Return a list of matching index pairs of an LCS restricted to a band around the diagonal."""
+    n, m = len(a), len(b)
+    if not n or not m:
+        return []
+    # For each i, only j in [los[i], his[i]] are considered. The band follows the line
+    # from (0, 0) to (n, m) and the bands of neighboring rows overlap, so (n, m) is reachable.
+    band = max(band, m // n + 1)
+    los, his = [], []
+    for i in range(n + 1):
+        center = i * m // n
+        los.append(max(0, center - band))
+        his.append(min(m, center + band))
+    for i in range(1, n + 1):
+        los[i] = min(los[i], his[i - 1])
+
+    # rows[i][j - los[i]] = LCS of a[:i] and b[:j] (via paths within the band), -1 if unreachable
+    rows = [[0] * (his[0] + 1)]
+    for i in range(1, n + 1):
+        prev, prev_lo, prev_hi = rows[-1], los[i - 1], his[i - 1]
+        lo, hi, char = los[i], his[i], a[i - 1]
+        row = []
+        for j in range(lo, hi + 1):
+            best = prev[j - prev_lo] if j <= prev_hi else -1
+            if j > lo and row[-1] > best:
+                best = row[-1]
+            if prev_lo < j <= prev_hi + 1 and b[j - 1] == char and prev[j - 1 - prev_lo] >= best:
+                best = prev[j - 1 - prev_lo] + 1
+            row.append(best)
+        rows.append(row)
+
+    matches = []
+    i, j = n, m
+    while i > 0 and j > 0:
+        lo, prev_lo = los[i], los[i - 1]
+        value = rows[i][j - lo]
+        if prev_lo < j <= his[i - 1] + 1 and a[i - 1] == b[j - 1] \
+                and rows[i - 1][j - 1 - prev_lo] + 1 == value:
+            i, j = i - 1, j - 1
+            matches.append((i, j))
+        elif j > lo and rows[i][j - 1 - lo] == value:
+            j -= 1
+        else:
+            i -= 1
+    matches.reverse()
+    return matches
+
+
+def _matches_to_opcodes(matches, a_lo, b_lo, a_hi, b_hi):
+    opcodes = []
+    i, j = a_lo, b_lo
+    for x, y in matches + [(a_hi - a_lo, b_hi - b_lo)]:
+        x, y = x + a_lo, y + b_lo
+        if x > i and y > j:
+            opcodes.append(('replace', i, x, j, y))
+        elif x > i:
+            opcodes.append(('delete', i, x, j, j))
+        elif y > j:
+            opcodes.append(('insert', i, i, j, y))
+        if x < a_hi:
+            if opcodes and opcodes[-1][0] == 'equal':
+                opcodes[-1] = ('equal', opcodes[-1][1], x + 1, opcodes[-1][3], y + 1)
+            else:
+                opcodes.append(('equal', x, x + 1, y, y + 1))
+        i, j = x + 1, y + 1
+    return opcodes
+
+
+def diff_opcodes(a, b, max_d=DEFAULT_MAX_D, band=DEFAULT_BAND):
+    """Align two sequences and return a list of difflib-style opcodes.
+
+    Args:
+    a, b: the sequences (usually strings) to be aligned
+    max_d: maximum number of differences for the exact O(ND) algorithm
+    band: the width of the diagonal band used if there are more than `max_d` differences
+    """
+    len_a, len_b = len(a), len(b)
+    prefix = common_prefix_length(a, b)
+    if prefix == len_a == len_b:
+        return [('equal', 0, len_a, 0, len_b)] if len_a else []
+    suffix = common_suffix_length(a[prefix:], b[prefix:])
+    a_hi, b_hi = len_a - suffix, len_b - suffix
+    a_mid, b_mid = a[prefix:a_hi], b[prefix:b_hi]
+
+    matches = _myers_matches(a_mid, b_mid, max_d)
+    if matches is None:
+        matches = _banded_matches(a_mid, b_mid, band)
+
+    opcodes = [('equal', 0, prefix, 0, prefix)] if prefix else []
+    for opcode in _matches_to_opcodes(matches, prefix, prefix, a_hi, b_hi):
+        if opcodes and opcode[0] == 'equal' == opcodes[-1][0]:
+            opcodes[-1] = ('equal', opcodes[-1][1], opcode[2], opcodes[-1][3], opcode[4])
+        else:
+            opcodes.append(opcode)
+    if suffix:
+        if opcodes and opcodes[-1][0] == 'equal':
+            opcodes[-1] = ('equal', opcodes[-1][1], len_a, opcodes[-1][3], len_b)
+        else:
+            opcodes.append(('equal', a_hi, len_a, b_hi, len_b))
+    return opcodes
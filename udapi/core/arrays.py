@@ -0,0 +1,266 @@
+"""Columnar (NumPy) representation of Udapi documents for fast corpus statistics.
+
+`Document.to_arrays()` walks all the nodes of a document once and returns a `NodeArrays` object,
+which stores the node attributes as NumPy arrays with one row per node (word),
+ordered by trees and word order. Empty nodes are not included (only counted per tree).
+For example::
+
+  arrays = doc.to_arrays()
+  edges = arrays['ord'] - arrays['head']
+  is_noun = arrays.strings('upos') == 'NOUN'
+  print(np.bincount(np.abs(edges[is_noun & (arrays['head'] > 0)])))
+
+String attributes (form, lemma, upos, xpos, deprel) are interned:
+e.g. ``arrays['upos']`` is an int32 array of indices into the list ``arrays.vocabs['upos']``.
+Morphological features are stored as a bitmap ``arrays.feats`` (see `NodeArrays`).
+The arrays can be saved into a compressed .npz file and loaded again (`save()`, `load()`)
+much faster than parsing the original CoNLL-U file.
+
+See also blocks util.SeeArrays and util.WcArrays, which compute the same statistics
+as util.See and util.Wc using these arrays, and write.Npz.
+
+NumPy is an optional dependency of Udapi (``pip install udapi[arrays]``).
+"""
+try:
+    import numpy as np
+except ImportError as exc:
+    raise ImportError("udapi.core.arrays requires NumPy, install it with: pip install numpy") from exc
+
+# Per-node int32 columns, in addition to the interned STRING_COLUMNS.
+NODE_COLUMNS = ('tree', 'ord', 'head', 'depth', 'children')
+STRING_COLUMNS = ('form', 'lemma', 'upos', 'xpos', 'deprel')
+# Per-tree int32 columns.
+TREE_COLUMNS = ('words', 'tokens', 'mwts', 'empty', 'newdoc', 'newpar')
+
+_FORMAT_VERSION = 1
+
+
+def _feats_bitmap(size, rows, ids, num_feats):
+    """Return a (size, words) uint64 bitmap with bits `ids` set in the given `rows`."""
+    bitmap = np.zeros((size, max(1, (num_feats + 63) // 64)), dtype=np.uint64)
+    if len(rows):
+        bits = np.left_shift(np.uint64(1), (ids & 63).astype(np.uint64))
+        np.bitwise_or.at(bitmap, (rows, ids >> 6), bits)
+    return bitmap
+
+
+class NodeArrays:
+    """Node attributes of one or more documents stored as NumPy arrays.
+
+    Attributes:
+    columns: a dict of int32 arrays with one value per node:
+        `tree` (index of the tree), `ord`, `head` (ord of the parent, 0 for the technical root),
+        `depth` (1 for the children of the technical root), `children` (the number of children)
+        and `form`, `lemma`, `upos`, `xpos`, `deprel` (indices into `vocabs`).
+        Missing (None) values are stored as empty strings.
+    vocabs: a dict of lists of strings for each of STRING_COLUMNS and for `feats`.
+    feats: a uint64 array of shape (nodes, words), where the bit `i % 64` of the word `i // 64`
+        is set iff the node has the feature `vocabs['feats'][i]` (a "Name=Value" string).
+    trees: a dict of int32 arrays with one value per tree:
+        `words`, `tokens`, `mwts` (multi-word tokens), `empty` (empty nodes)
+        and 0/1 flags `newdoc` (the first tree of a document) and `newpar`.
+    sent_ids: a list of sentence IDs of the trees.
+    """
+
+    def __init__(self, columns, vocabs, feats, trees, sent_ids):
+        self.columns = columns
+        self.vocabs = vocabs
+        self.feats = feats
+        self.trees = trees
+        self.sent_ids = sent_ids
+        self._head_index = None
+
+    def __len__(self):
+        return len(self.columns['tree'])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    @property
+    def num_trees(self):
+        """The number of trees."""
+        return len(self.sent_ids)
+
+    @property
+    def tree_offsets(self):
+        """An array with the index of the first node of each tree (and the total number of nodes)."""
+        offsets = np.zeros(self.num_trees + 1, dtype=np.int64)
+        np.cumsum(self.trees['words'], out=offsets[1:])
+        return offsets
+
+    @property
+    def head_index(self):
+        """An array with the (row) index of the parent of each node, or -1 for the technical root."""
+        if self._head_index is None:
+            head = self.columns['head']
+            index = self.tree_offsets[self.columns['tree']] + head - 1
+            self._head_index = np.where(head > 0, index, -1)
+        return self._head_index
+
+    def strings(self, name):
+        """Return an array of strings of the given interned column, e.g. ``strings('upos')``."""
+        return np.array(self.vocabs[name], dtype=str)[self.columns[name]]
+
+    def has_feat(self, feature):
+        """Return a boolean array: which nodes have the given feature, e.g. ``has_feat('Number=Plur')``."""
+        try:
+            i = self.vocabs['feats'].index(feature)
+        except ValueError:
+            return np.zeros(len(self), dtype=bool)
+        return (self.feats[:, i >> 6] >> np.uint64(i & 63)) & np.uint64(1) == 1
+
+    def feat_values(self, name):
+        """Return an array of strings with the values of the given feature (or empty strings)."""
+        values = np.zeros(len(self), dtype=object)
+        values[:] = ''
+        prefix = name + '='
+        for feature in self.vocabs['feats']:
+            if feature.startswith(prefix):
+                values[self.has_feat(feature)] = feature[len(prefix):]
+        return values.astype(str)
+
+    def feat_pairs(self):
+        """Return arrays `(rows, ids)` of all features of all nodes.
+
+        The pairs are sorted by rows and then by the feature name case-insensitively
+        (the order of `str(node.feats)`).
+        """
+        rows, ids = [], []
+        for i in range(len(self.vocabs['feats'])):
+            row = np.flatnonzero((self.feats[:, i >> 6] >> np.uint64(i & 63)) & np.uint64(1))
+            rows.append(row)
+            ids.append(np.full(len(row), i, dtype=np.int32))
+        if not rows:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int32)
+        rows, ids = np.concatenate(rows), np.concatenate(ids)
+        rank = np.argsort(np.argsort([f.lower() for f in self.vocabs['feats']], kind='stable'))
+        order = np.lexsort((rank[ids], rows))
+        return rows[order], ids[order]
+
+    @classmethod
+    def from_document(cls, document):
+        """Return NodeArrays of all the trees (of all zones) in the given document."""
+        # pylint: disable=protected-access,too-many-locals
+        interned = {name: {} for name in STRING_COLUMNS}
+        strings = {name: [] for name in STRING_COLUMNS}
+        feat_index, feats_cache, feat_rows, feat_ids = {}, {}, [], []
+        heads, tree_columns, sent_ids = [], {name: [] for name in TREE_COLUMNS}, []
+        row = 0
+        first_tree = True
+        for tree in document.trees:
+            sent_ids.append(tree.sent_id)
+            words = tree._descendants
+            for name in STRING_COLUMNS:
+                vocab = interned[name]
+                strings[name].extend([vocab.setdefault(getattr(n, name) or '', len(vocab)) for n in words])
+            heads.extend([n._parent._ord for n in words])
+            for node in words:
+                raw = '_' if node._feats is None else str(node._feats)
+                ids = feats_cache.get(raw)
+                if ids is None:
+                    ids = [] if raw == '_' else [feat_index.setdefault(f, len(feat_index)) for f in raw.split('|')]
+                    feats_cache[raw] = ids
+                if ids:
+                    feat_rows.extend([row] * len(ids))
+                    feat_ids.extend(ids)
+                row += 1
+            mwts = tree._mwts
+            tree_columns['words'].append(len(words))
+            tree_columns['mwts'].append(len(mwts))
+            tree_columns['tokens'].append(len(words) + sum(1 - len(mwt.words) for mwt in mwts))
+            tree_columns['empty'].append(len(tree.empty_nodes))
+            tree_columns['newdoc'].append(1 if tree.newdoc or first_tree else 0)
+            tree_columns['newpar'].append(1 if tree.newpar else 0)
+            first_tree = False
+
+        trees = {name: np.array(values, dtype=np.int32) for name, values in tree_columns.items()}
+        size = len(heads)
+        columns = {'tree': np.repeat(np.arange(len(sent_ids), dtype=np.int32), trees['words'])}
+        offsets = np.zeros(len(sent_ids) + 1, dtype=np.int64)
+        np.cumsum(trees['words'], out=offsets[1:])
+        columns['ord'] = (np.arange(size) - offsets[columns['tree']] + 1).astype(np.int32)
+        columns['head'] = np.array(heads, dtype=np.int32)
+        for name in STRING_COLUMNS:
+            columns[name] = np.array(strings[name], dtype=np.int32)
+        vocabs = {name: list(interned[name]) for name in STRING_COLUMNS}
+        vocabs['feats'] = list(feat_index)
+        feats = _feats_bitmap(size, np.array(feat_rows, dtype=np.int64),
+                              np.array(feat_ids, dtype=np.int64), len(feat_index))
+        arrays = cls(columns, vocabs, feats, trees, sent_ids)
+        arrays._compute_structure()
+        return arrays
+
+    def _compute_structure(self):
+        """Compute the `depth` and `children` columns from the `head` column."""
+        head_index = self.head_index
+        has_parent = head_index >= 0
+        self.columns['children'] = np.bincount(head_index[has_parent], minlength=len(self)).astype(np.int32)
+        depth = np.ones(len(self), dtype=np.int32)
+        ancestor = head_index.copy()
+        active = np.flatnonzero(has_parent)
+        # Pointer jumping: in each iteration, the nodes with a non-root ancestor go one level up.
+        while len(active):
+            depth[active] += 1
+            ancestor[active] = head_index[ancestor[active]]
+            active = active[ancestor[active] >= 0]
+        self.columns['depth'] = depth
+
+    @classmethod
+    def concatenate(cls, parts):
+        """Return NodeArrays with all the trees of the given NodeArrays objects."""
+        parts = list(parts)
+        columns, vocabs, trees = {}, {}, {}
+        mappings = {}
+        for name in STRING_COLUMNS + ('feats',):
+            index = {}
+            mappings[name] = [np.array([index.setdefault(v, len(index)) for v in part.vocabs[name]],
+                                       dtype=np.int32) for part in parts]
+            vocabs[name] = list(index)
+        for name in STRING_COLUMNS:
+            columns[name] = np.concatenate([m[p.columns[name]] for m, p in zip(mappings[name], parts)]
+                                           or [np.zeros(0, dtype=np.int32)]).astype(np.int32)
+        tree_starts = np.cumsum([0] + [p.num_trees for p in parts])
+        node_starts = np.cumsum([0] + [len(p) for p in parts])
+        columns['tree'] = np.concatenate([p.columns['tree'] + s for p, s in zip(parts, tree_starts)]
+                                         or [np.zeros(0, dtype=np.int32)]).astype(np.int32)
+        for name in NODE_COLUMNS[1:]:
+            columns[name] = np.concatenate([p.columns[name] for p in parts]
+                                           or [np.zeros(0, dtype=np.int32)]).astype(np.int32)
+        for name in TREE_COLUMNS:
+            trees[name] = np.concatenate([p.trees[name] for p in parts]
+                                         or [np.zeros(0, dtype=np.int32)]).astype(np.int32)
+        feat_rows, feat_ids = [], []
+        for part, start, mapping in zip(parts, node_starts, mappings['feats']):
+            rows, ids = part.feat_pairs()
+            feat_rows.append(rows + start)
+            feat_ids.append(mapping[ids].astype(np.int64))
+        if feat_rows:
+            feat_rows, feat_ids = np.concatenate(feat_rows), np.concatenate(feat_ids)
+        feats = _feats_bitmap(int(node_starts[-1]), feat_rows, feat_ids, len(vocabs['feats']))
+        sent_ids = [sent_id for part in parts for sent_id in part.sent_ids]
+        return cls(columns, vocabs, feats, trees, sent_ids)
+
+    def save(self, filename):
+        """Save the arrays into a compressed .npz file."""
+        data = {'format': np.array(_FORMAT_VERSION), 'feats': self.feats,
+                'sent_ids': np.array(self.sent_ids, dtype=str)}
+        for name, values in self.columns.items():
+            data['column_' + name] = values
+        for name, values in self.trees.items():
+            data['tree_' + name] = values
+        for name, vocab in self.vocabs.items():
+            data['vocab_' + name] = np.array(vocab, dtype=str)
+        np.savez_compressed(filename, **data)
+
+    @classmethod
+    def load(cls, filename):
+        """Load arrays saved by `save()`."""
+        with np.load(filename, allow_pickle=False) as data:
+            if int(data['format']) != _FORMAT_VERSION:
+                raise ValueError(f"{filename}: unsupported format version {int(data['format'])}")
+            columns = {name: data['column_' + name] for name in NODE_COLUMNS + STRING_COLUMNS}
+            vocabs = {name: data['vocab_' + name].tolist() for name in STRING_COLUMNS + ('feats',)}
+            trees = {name: data['tree_' + name] for name in TREE_COLUMNS}
+            # tolist() returns Python strings (not np.str_); pylint misinfers the array type.
+            sent_ids = data['sent_ids'].tolist()  # pylint: disable=no-member
+            return cls(columns, vocabs, data['feats'], trees, sent_ids)
@@ -39,6 +39,9 @@ class BaseReader(Block):
         # it just returns a sequence of trees (which may be split into multiple documents if `bundles_per_doc` is set).
         # So `read.Conllu` cannot store the `global.Entity` in `document.meta['global.Entity']` where it belongs.
         self._global_entity = None
+        # A function called with each bundle once it is completely loaded (used by `udapy --stream`).
+        # The function may remove the bundle from the document.
+        self.bundle_callback = None
 
     @staticmethod
     def is_multizone_reader():
@@ -114,7 +117,8 @@ class BaseReader(Block):
 
     def try_fast_load(self, document):
         """Try to use self.read_trees() if possible and return True, otherwise False."""
-        if document.bundles or self.bundles_per_doc or self.sent_id_filter or self.split_docs:
+        if document.bundles or self.bundles_per_doc or self.sent_id_filter or self.split_docs \
+           or self.bundle_callback is not None:
             return False
         if self.filehandle is None:
             filehandle = self.next_filehandle()
@@ -185,6 +189,9 @@ class BaseReader(Block):
                 return
             orig_bundles = document.bundles[:]
             bundle, last_bundle_id = None, ''
+            # The number of bundles loaded into this document, i.e. `bundle.number`
+            # unless the previous bundles were removed by `bundle_callback`.
+            bundles_loaded = 0
 
             # There may be a tree left in the buffer when reading the last doc.
             if self._buffer:
@@ -196,6 +203,7 @@ class BaseReader(Block):
                     bundle = document.create_bundle()
                     if root._sent_id is not None:
                         bundle.bundle_id = root._sent_id.split('/', 1)[0]
+                bundles_loaded = 1
                 bundle.add_tree(root)
                 if root.newdoc:
                     self._docs_loaded += 1
@@ -270,12 +278,16 @@ class BaseReader(Block):
 
                 # assign new/next bundle to `bundle` if needed
                 if not bundle or not add_to_the_last_bundle:
-                    if self.bundles_per_doc and bundle and self.bundles_per_doc == bundle.number:
+                    if self.bundles_per_doc and bundle and self.bundles_per_doc == bundles_loaded:
                         self._buffer = root
                         if orig_bundles:
                             logging.warning("bundles_per_doc=%d but the doc had contained %d bundles",
                                             self.bundles_per_doc, len(orig_bundles))
                         return
+                    if bundle and self.bundle_callback is not None:
+                        # The callback is set by `udapy --stream` (it is None in __init__).
+                        self.bundle_callback(bundle)  # pylint: disable=not-callable
+                    bundles_loaded += 1
 
                     if orig_bundles:
                         bundle = orig_bundles.pop(0)
@@ -295,7 +307,7 @@ class BaseReader(Block):
                 # if the current bundle has ended or there will be another tree for this bundle.
                 # So in case of multizone readers we need to read one extra tree
                 # and store it in the buffer (and include it into the next document).
-                if self.bundles_per_doc and self.bundles_per_doc == bundle.number \
+                if self.bundles_per_doc and self.bundles_per_doc == bundles_loaded \
                    and not self.is_multizone_reader():
                     return
 
@@ -4,7 +4,6 @@ import logging
 import os
 from pathlib import Path
 
-import udapi.core.coref
 from udapi.core.block import Block
 from udapi.core.files import Files
 
@@ -51,7 +50,10 @@ class BaseWriter(Block):
         return self.files.next_filename()
 
     def before_process_document(self, document):
-        if document:
+        # Coreference objects exist only if some block has accessed them,
+        # so there is no need to import udapi.core.coref otherwise.
+        if document and document._eid_to_entity:
+            import udapi.core.coref
             udapi.core.coref.store_coref_to_misc(document)
         if self.orig_files == '<filehandle>':
             logging.info('Writing to filehandle.')
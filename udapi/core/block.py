@@ -1,6 +1,5 @@
 """Block class represents the basic Udapi processing unit."""
 import logging
-import inspect
 
 def not_overridden(method):
   method.is_not_overridden = True
@@ -19,6 +18,7 @@ class Block(object):
         self.zones = zones
         self.if_empty_tree = if_empty_tree
         if kwargs:
+            import inspect
             params = set()
             for cls in type(self).mro()[:-1]:
                 params.update(inspect.signature(cls.__init__).parameters.keys())
@@ -33,6 +33,40 @@ class Block(object):
             module = module[12:]
         return module + "." + self.__class__.__name__
 
+    @staticmethod
+    def is_cacheable():
+        """Can the output of a scenario with this block be reused from the result cache?
+
+        This implementation returns always True.
+        Blocks whose results depend on something else than their parameters
+        and input files (e.g. external models or web services),
+        or which create extra files, should override this method to return False.
+        See `udapi.core.cache` for details.
+        """
+        return True
+
+    @staticmethod
+    def is_tree_local():
+        """Can this block process each bundle independently of the other bundles?
+
+        This implementation returns always False.
+        Blocks which do all their work in `process_bundle`, `process_tree`, `process_node`
+        or `process_empty_node`, which do not access other bundles (e.g. via `root.next_tree`,
+        `bundle.number` or `document.bundles`) or coreference entities and which do not keep
+        references to the processed nodes, can override this method to return True.
+        If all blocks of a scenario (except for the reader) are tree-local,
+        `udapy --stream` processes each bundle by all the blocks as soon as it is read and then frees it,
+        so the whole document is never loaded in memory.
+        Otherwise, only the tree-local blocks preceding the first other block are streamed
+        and the bundles are kept in the document for the remaining blocks.
+        `before_process_document` of the streamed blocks is then called before the first bundle
+        is processed and `after_process_document` after the last bundle is processed.
+        Thus a streamed writer prints the document-level comments (e.g. `doc_json_*` or `global.*`)
+        as read before the first bundle was processed. Such comments appearing later in the input
+        file are not printed, so the output differs from the output without `--stream`.
+        """
+        return False
+
     def process_start(self):
         """A hook method that is executed before processing UD data"""
         pass
@@ -123,6 +157,29 @@ class Block(object):
                                     for empty_node in tree.empty_nodes:
                                         self.process_empty_node(empty_node)
 
+    def apply_on_bundle(self, bundle):
+        """Process one bundle the same way as `process_document` processes each bundle.
+
+        This is used for streaming the tree-local blocks, see `is_tree_local`.
+        """
+        if not hasattr(self.process_bundle, 'is_not_overridden'):
+            self.process_bundle(bundle)
+            return
+        p_tree = not hasattr(self.process_tree, 'is_not_overridden')
+        p_node = not hasattr(self.process_node, 'is_not_overridden')
+        p_empty_node = not hasattr(self.process_empty_node, 'is_not_overridden')
+        for tree in bundle:
+            if self._should_process_tree(tree):
+                if p_tree:
+                    self.process_tree(tree)
+                else:
+                    if p_node:
+                        for node in tree.descendants:
+                            self.process_node(node)
+                    if p_empty_node:
+                        for empty_node in tree.empty_nodes:
+                            self.process_empty_node(empty_node)
+
     @not_overridden
     def process_coref_entity(self, entity):
         """This method is called on each coreference entity in the document."""
@@ -134,6 +191,30 @@ class Block(object):
         """This method is called on each coreference mention in the document."""
         pass
 
+    @not_overridden
+    def export_state(self):
+        """Return the partial results (state) of this block as a JSON-serializable dict.
+
+        Blocks which collect statistics (e.g. `util.Wc`) and print them in `process_end`
+        can override this method together with `merge_state`.
+        Such blocks can be applied on several shards of the data
+        (possibly in different processes or on different machines)
+        and the partial results can be merged afterwards,
+        see `udapy --save_state` and `udapy --merge_states`.
+        The merged results are printed by `process_end` as usual.
+        This implementation returns None (the block is not mergeable, see `is_mergeable`).
+        """
+        return None
+
+    @not_overridden
+    def merge_state(self, state):
+        """Add partial results (exported by `export_state` of another instance) to this block."""
+        pass
+
+    def is_mergeable(self):
+        """Does this block implement `export_state` and `merge_state`?"""
+        return not hasattr(self.export_state, 'is_not_overridden')
+
     def before_process_document(self, document):
         """This method is called before each process_document."""
         pass
@@ -3,7 +3,6 @@
 import re
 
 from udapi.core.root import Root
-from udapi.block.write.textmodetrees import TextModeTrees
 
 VALID_ZONE_REGEX = re.compile("^[a-z-]*(_[A-Za-z0-9-]+)?$")
 
@@ -17,12 +16,14 @@ class Bundle(object):
     Trees in one bundle are distinguished by a zone label.
     """
 
-    __slots__ = ["trees", "number", "_bundle_id", "_document"]
+    __slots__ = ["trees", "_number", "_bundle_id", "_document", "_zones"]
 
     def __init__(self, bundle_id=None, document=None):
         self.trees = []
+        self._number = None
         self._bundle_id = bundle_id
         self._document = document
+        self._zones = {}  # zone -> tree, see _tree_by_zone()
 
     @property
     def bundle_id(self):
@@ -31,13 +32,32 @@ class Bundle(object):
 
     @bundle_id.setter
     def bundle_id(self, bundle_id):
-        self._bundle_id = bundle_id
+        old_bundle_id, self._bundle_id = self._bundle_id, bundle_id
+        document = self._document
+        if document is not None and document._bundle_ids is not None:
+            document._unindex_bundle(self, old_bundle_id)
+            if document._bundle_ids is not None:
+                document._index_bundle(self)
         if len(self.trees) == 1 and self.trees[0].zone == '':
             self.trees[0]._sent_id = bundle_id
         else:
             for tree in self.trees:
                 tree._sent_id = bundle_id + '/' + tree.zone  # pylint: disable=protected-access
 
+    @property
+    def number(self):
+        """Position of this bundle in its document (1-based)."""
+        if self._document is not None:
+            try:
+                return self._document.bundle_number(self)
+            except ValueError:  # the bundle has been removed from the document
+                pass
+        return self._number
+
+    @number.setter
+    def number(self, number):
+        self._number = number
+
     def __str__(self):
         if self._bundle_id is None:
             return 'bundle without id'
@@ -51,23 +71,34 @@ class Bundle(object):
         """Returns the document in which the bundle is contained."""
         return self._document
 
+    def _tree_by_zone(self, zone):
+        """Return the tree root whose zone is equal to zone or None if there is no such tree."""
+        trees = self.trees
+        tree = self._zones.get(zone)
+        # `self.trees` may have been modified directly, so check the cached tree is still there.
+        if tree is not None and tree._zone == zone and tree in trees:
+            return tree
+        found = [tree for tree in trees if tree._zone == zone]
+        if len(found) > 1:
+            raise Exception("More than one tree with zone=" + zone + " in the bundle")
+        if not found:
+            return None
+        self._zones[zone] = found[0]
+        return found[0]
+
     def get_tree(self, zone=''):
         """Returns the tree root whose zone is equal to zone."""
-        trees = [tree for tree in self.trees if tree.zone == zone]
-        if len(trees) == 1:
+        trees = self.trees
+        if len(trees) == 1 and trees[0]._zone == zone:
             return trees[0]
-        elif len(trees) == 0:
+        tree = self._tree_by_zone(zone)
+        if tree is None:
             raise Exception("No tree with zone=" + zone + " in the bundle")
-        else:
-            raise Exception("More than one tree with zone=" +
-                            zone + " in the bundle")
+        return tree
 
     def has_tree(self, zone=''):
         """Does this bundle contain a tree with a given zone?"""
-        for tree in self.trees:
-            if tree.zone == zone:
-                return True
-        return False
+        return self._tree_by_zone(zone) is not None
 
     def create_tree(self, zone=None):
         """Return the root of a newly added tree with a given zone."""
@@ -97,6 +128,7 @@ class Bundle(object):
                 root._sent_id += '/' + root.zone
         root.bundle = self
         self.trees.append(root)
+        self._zones[root._zone] = root
         doc_json = root.json.get('__doc__')
         if doc_json:
             self._document.json.update(doc_json)
@@ -105,9 +137,8 @@ class Bundle(object):
 
     def remove(self):
         """Remove a bundle from the document."""
-        self._document.bundles = [bundle for bundle in self._document.bundles if bundle != self]
-        for i, bundle in enumerate(self._document.bundles):
-            bundle.number = i
+        self._document._remove_bundle(self)
+        self._number = None
 
     def address(self):
         """Return bundle_id or '?' if missing."""
@@ -115,6 +146,7 @@ class Bundle(object):
 
     def draw(self, **kwargs):
         """Pretty print the trees using TextModeTrees."""
+        from udapi.block.write.textmodetrees import TextModeTrees
         TextModeTrees(**kwargs).process_bundle(self)
 
     @property
@@ -125,3 +157,20 @@ class Bundle(object):
             # but it seems safer, see the comment in udapi.core.block.Block.process_tree().
             for node in tree.descendants:
                 yield node
+
+    def release(self):
+        """Break all reference cycles within the trees of this bundle and remove the trees.
+
+        The bundle is not removed from its document (use `remove()` for that).
+        Coreference entities are not handled, see `Document.release()`.
+        """
+        for root in self.trees:
+            for node in root._descendants + root.empty_nodes:
+                node._parent, node._root, node._mwt = None, None, None
+                node._children, node._mentions, node._deps = [], [], None
+            for mwt in root._mwts:
+                mwt.words, mwt.root = [], None
+            root._children, root._descendants, root._mwts, root.empty_nodes = [], [], [], []
+            root._bundle, root._root, root._cache = None, None, None
+        self.trees = []
+        self._zones = {}
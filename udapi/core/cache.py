@@ -0,0 +1,229 @@
+"""Content-addressed cache of scenario results used by `udapy`.
+
+When the same scenario (e.g. `read.Conllu files=X ud.FixPunct write.Conllu`)
+is applied repeatedly on unchanged input files, we can reuse the stored output
+instead of recomputing it. The cache key is a hash of
+* the normalized scenario (block names and their parameters),
+* the content of all input files (including STDIN and files mentioned in other block parameters),
+* the source code of all Udapi modules used (core modules, blocks and their base classes).
+
+The STDOUT and STDERR output (including log messages, so the cache key includes also the logging level)
+is cached, it is replayed in this order. The replay is announced by an INFO log message
+with the time when the entry was stored, so the replayed log messages (with timestamps
+of the original run) can be told apart. Scenarios where some writer writes to files
+(`files=`, `docname_as_file=1`, `overwrite=1`, `path=`) or where some block reports
+`is_cacheable() == False` (e.g. UDPipe models, `write.CorefHtml` with its extra files)
+are never cached.
+
+The cache is a directory with one gzipped file per entry.
+The size of the directory is bounded, the least recently used entries are evicted first
+(the modification time of an entry is updated whenever it is used).
+"""
+import datetime
+import gzip
+import hashlib
+import io
+import json
+import logging
+import os
+import sys
+
+from udapi.core.files import Files
+
+CACHE_FORMAT = 'udapi-cache-3'
+DEFAULT_MAX_SIZE_MB = 1024
+_CORE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _file_digest(filename):
+    sha = hashlib.sha256()
+    with open(filename, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _module_files(block_classes):
+    """Return a sorted list of source files of all Udapi modules relevant for the given classes."""
+    filenames = {os.path.join(_CORE_DIR, f) for f in os.listdir(_CORE_DIR) if f.endswith('.py')}
+    modules = [m for name, m in sys.modules.items() if name.startswith('udapi.')]
+    for block_class in block_classes:
+        modules.extend(sys.modules.get(cls.__module__) for cls in block_class.__mro__)
+    for module in modules:
+        filename = getattr(module, '__file__', None)
+        if filename and filename.endswith('.py'):
+            filenames.add(os.path.abspath(filename))
+    return sorted(filenames)
+
+
+class ResultCache(object):
+    """Size-bounded LRU cache of scenario outputs stored in a directory."""
+
+    def __init__(self, cache_dir, max_size_mb=DEFAULT_MAX_SIZE_MB):
+        self.cache_dir = cache_dir
+        self.max_size = int(max_size_mb * 1024 * 1024)
+
+    def scenario_key(self, block_names, block_args, block_classes):
+        """Return the cache key for the given scenario or None if it cannot be cached.
+
+        If some reader reads STDIN, STDIN is read completely (to compute its hash)
+        and replaced with an in-memory copy, so the reader can read it afterwards.
+        """
+        # Imported here because of cyclic imports (basereader->block).
+        from udapi.core.basereader import BaseReader
+        from udapi.core.basewriter import BaseWriter
+        sha = hashlib.sha256(CACHE_FORMAT.encode())
+        sha.update(f'python{sys.version_info[0]}.{sys.version_info[1]}'.encode())
+        sha.update(f'logging{logging.root.getEffectiveLevel()}'.encode())
+        has_reader, stdin_used = False, False
+        for name, kwargs, block_class in zip(block_names, block_args, block_classes):
+            if not block_class.is_cacheable():
+                logging.info('Result cache not used because of block %s', name)
+                return None
+            if issubclass(block_class, BaseWriter) and (
+                    kwargs.get('files', '-') != '-' or kwargs.get('filehandle') is not None
+                    or any(kwargs.get(p) for p in ('docname_as_file', 'overwrite', 'path'))):
+                logging.info('Result cache not used because %s writes to files', name)
+                return None
+            sha.update(json.dumps([name, kwargs], sort_keys=True, default=str).encode())
+            for param, value in sorted(kwargs.items()):
+                if issubclass(block_class, BaseReader) and param == 'files':
+                    filenames = Files(filenames=str(value)).filenames
+                elif isinstance(value, str) and os.path.isfile(value):
+                    filenames = [value]
+                else:
+                    continue
+                for filename in filenames:
+                    if filename == '-':
+                        stdin_used = True
+                    else:
+                        sha.update(f'{filename}\t{_file_digest(filename)}'.encode())
+            if issubclass(block_class, BaseReader):
+                has_reader = True
+                if kwargs.get('filehandle') is not None:
+                    return None
+                if 'files' not in kwargs:
+                    stdin_used = True
+
+        # If there is no reader in the scenario, read.Conllu (from STDIN) will be added.
+        if stdin_used or not has_reader:
+            data = sys.stdin.buffer.read()
+            sys.stdin = io.TextIOWrapper(io.BytesIO(data), encoding=sys.stdin.encoding)
+            sha.update(b'STDIN\t' + hashlib.sha256(data).hexdigest().encode())
+
+        for filename in _module_files(block_classes):
+            sha.update(f'{filename}\t{_file_digest(filename)}'.encode())
+        return sha.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + '.gz')
+
+    def replay(self, key):
+        """If the entry `key` exists, print it to STDOUT and STDERR and return True, otherwise return False."""
+        path = self._path(key)
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8', errors='surrogateescape') as entry:
+                length, created = entry.readline().rstrip('\n').split(' ', 1)
+                errors = entry.read(int(length))
+                output = entry.read()
+        except (FileNotFoundError, EOFError, OSError, ValueError):
+            return False
+        logging.info('Replaying cached output from %s (%s), the following STDERR output comes from that run',
+                     created, path)
+        os.utime(path)
+        sys.stdout.write(output)
+        sys.stdout.flush()
+        if errors:
+            sys.stderr.write(errors)
+            sys.stderr.flush()
+        return True
+
+    def store(self, key, output, errors=''):
+        """Store a new entry and evict the least recently used entries if the cache is too big."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with gzip.open(tmp_path, 'wt', encoding='utf-8', errors='surrogateescape',
+                       compresslevel=1) as entry:
+            # The STDERR output is stored first, prefixed with its length (in characters)
+            # and the time of storing (used when replaying).
+            created = datetime.datetime.now().isoformat(sep=' ', timespec='seconds')
+            entry.write(f'{len(errors)} {created}\n')
+            entry.write(errors)
+            entry.write(output)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        """Delete the least recently used entries until the cache fits into max_size."""
+        entries, total = [], 0
+        for subdir in os.scandir(self.cache_dir):
+            if not subdir.is_dir():
+                continue
+            for entry in os.scandir(subdir.path):
+                if entry.name.endswith('.gz'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_size:
+                break
+            logging.debug('Evicting %s from the result cache', path)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+class TeeOutput(io.TextIOBase):
+    """Text stream which writes both to the original stream and to an in-memory buffer."""
+
+    def __init__(self, stream):
+        super().__init__()
+        self.stream = stream
+        self.captured = io.StringIO()
+
+    def write(self, text):
+        self.captured.write(text)
+        return self.stream.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+    def close(self):
+        # Writers close sys.stdout if it differs from the original one, but this is the original one.
+        self.flush()
+
+    @property
+    def encoding(self):
+        return self.stream.encoding
+
+    def getvalue(self):
+        """Return the captured output."""
+        return self.captured.getvalue()
+
+
+class OutputCapture(object):
+    """Capture everything written to STDOUT and STDERR (including log messages), while still printing it."""
+
+    def __init__(self):
+        self.stdout = TeeOutput(sys.stdout)
+        self.stderr = TeeOutput(sys.stderr)
+        self._handlers = []
+
+    def start(self):
+        """Redirect sys.stdout, sys.stderr and the logging handlers writing to STDERR."""
+        self._handlers = [handler for handler in logging.root.handlers
+                          if isinstance(handler, logging.StreamHandler)
+                          and handler.stream is self.stderr.stream]
+        for handler in self._handlers:
+            handler.setStream(self.stderr)
+        sys.stdout, sys.stderr = self.stdout, self.stderr
+
+    def stop(self):
+        """Restore the original streams."""
+        sys.stdout, sys.stderr = self.stdout.stream, self.stderr.stream
+        for handler in self._handlers:
+            handler.setStream(self.stderr.stream)
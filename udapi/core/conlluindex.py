@@ -0,0 +1,209 @@
+"""Sidecar index of byte offsets of sentences in CoNLL-U files.
+
+The index of `file.conllu` is stored in `file.conllu.idx`, it has one line per sentence with
+its byte offset and length, its sent_id, newdoc id and flags (`d` means newdoc,
+`m` means other document-level comments, e.g. `# global.Entity` or `# doc_json_*`).
+The index is built once (this needs just one pass over the file without parsing the trees)
+and it is rebuilt automatically whenever the size or modification time of the file changes.
+
+The sentences are read via `mmap`, so extracting a few trees from a huge file is fast:
+
+  >>> index = ConlluIndex.open('huge.conllu')
+  >>> tree = index.get_tree('s12345')
+  >>> print(index.get_string('s12346'))
+
+`read.Conllu sent_id_filter=...` uses the index automatically if it exists,
+with `index=1` it builds the index if needed.
+"""
+import logging
+import mmap
+import os
+import re
+
+INDEX_FORMAT = 'udapi-conllu-index-1'
+INDEX_SUFFIX = '.idx'
+RE_SEPARATOR = re.compile(rb'\n(?:[ \t\r]*\n)+')
+RE_HEADER = re.compile(r'^# ' + INDEX_FORMAT + r' size=(\d+) mtime_ns=(\d+)$')
+UTF8_BOM = b'\xef\xbb\xbf'
+
+
+def can_index(filename):
+    """Can the file be indexed, i.e. is it an existing uncompressed file (not STDIN)?"""
+    return (filename is not None and filename not in ('-', '<filehandle_input>')
+            and filename.split('.')[-1] not in ('gz', 'xz', 'bz2') and os.path.isfile(filename))
+
+
+class ConlluIndex:
+    """Byte offsets and sent_ids of all sentences in a CoNLL-U file.
+
+    `entries` is a list of tuples (offset, length, sent_id, newdoc, doc_meta), where
+    `sent_id` is None if the sentence has no sent_id comment,
+    `newdoc` is None, True (newdoc without id) or the newdoc id (as in `Root.newdoc`) and
+    `doc_meta` says whether there are other document-level comments.
+    """
+
+    def __init__(self, filename, entries, size, mtime_ns, encoding='utf-8-sig'):
+        self.filename = filename
+        self.entries = entries
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.encoding = encoding
+        self._positions = None
+        self._file = None
+        self._mmap = None
+        self._reader = None
+
+    @staticmethod
+    def index_filename(filename):
+        """Return the filename of the sidecar index of the given CoNLL-U file."""
+        return filename + INDEX_SUFFIX
+
+    @classmethod
+    def build(cls, filename, encoding='utf-8-sig'):
+        """Scan the CoNLL-U file and return its (not yet saved) index."""
+        # Use the same regexes as read.Conllu, so the sent_ids are the same as in loaded trees.
+        from udapi.block.read.conllu import RE_SENT_ID, RE_NEWPARDOC
+        stat = os.stat(filename)
+        entries = []
+        with open(filename, 'rb') as fh:
+            if stat.st_size == 0:
+                return cls(filename, entries, stat.st_size, stat.st_mtime_ns, encoding)
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                start = len(UTF8_BOM) if data[:len(UTF8_BOM)] == UTF8_BOM else 0
+                ends = [(m.start(), m.end()) for m in RE_SEPARATOR.finditer(data, start)]
+                ends.append((len(data), len(data)))
+                for end, next_start in ends:
+                    if end > start:
+                        sent_id, newdoc, doc_meta = None, None, False
+                        pos = start
+                        # Only the comment lines at the beginning of each sentence are decoded.
+                        while pos < end and data[pos] == 35:  # ord('#')
+                            line_end = data.find(b'\n', pos, end)
+                            if line_end == -1:
+                                line_end = end
+                            line = data[pos:line_end].decode(encoding).rstrip()
+                            pos = line_end + 1
+                            match = RE_SENT_ID.match(line)
+                            if match is not None:
+                                sent_id = match.group(1)
+                                continue
+                            match = RE_NEWPARDOC.match(line)
+                            if match is not None:
+                                if match.group(1) == 'newdoc':
+                                    newdoc = True if match.group(2) is None else match.group(2)
+                            elif line.startswith(('# global.', '# doc_json_')):
+                                doc_meta = True
+                        entries.append((start, end - start, sent_id, newdoc, doc_meta))
+                    start = next_start
+        return cls(filename, entries, stat.st_size, stat.st_mtime_ns, encoding)
+
+    @classmethod
+    def load(cls, filename, encoding='utf-8-sig'):
+        """Load the sidecar index of the CoNLL-U file or return None if it is missing or outdated."""
+        try:
+            stat = os.stat(filename)
+            with open(cls.index_filename(filename), encoding='utf-8') as fh:
+                match = RE_HEADER.match(fh.readline().rstrip('\n'))
+                if match is None or int(match.group(1)) != stat.st_size \
+                   or int(match.group(2)) != stat.st_mtime_ns:
+                    return None
+                entries = []
+                for line in fh:
+                    offset, length, flags, sent_id, newdoc = line.rstrip('\n').split('\t', 4)
+                    if 'd' in flags:
+                        newdoc = newdoc or True
+                    else:
+                        newdoc = None
+                    entries.append((int(offset), int(length), sent_id or None, newdoc, 'm' in flags))
+        except (OSError, ValueError):
+            return None
+        return cls(filename, entries, stat.st_size, stat.st_mtime_ns, encoding)
+
+    @classmethod
+    def open(cls, filename, save=True, encoding='utf-8-sig'):
+        """Load the up-to-date index of the file or build it (and save it if `save`)."""
+        index = cls.load(filename, encoding)
+        if index is None:
+            logging.info('Building the sent_id index of %s', filename)
+            index = cls.build(filename, encoding)
+            if save:
+                index.save()
+        return index
+
+    def save(self):
+        """Store the index next to the CoNLL-U file, return False if it cannot be written."""
+        index_filename = self.index_filename(self.filename)
+        tmp_filename = f'{index_filename}.{os.getpid()}.tmp'
+        try:
+            with open(tmp_filename, 'w', encoding='utf-8') as fh:
+                print(f'# {INDEX_FORMAT} size={self.size} mtime_ns={self.mtime_ns}', file=fh)
+                for offset, length, sent_id, newdoc, doc_meta in self.entries:
+                    flags = ('d' if newdoc else '') + ('m' if doc_meta else '')
+                    newdoc = newdoc if isinstance(newdoc, str) else ''
+                    fh.write(f'{offset}\t{length}\t{flags}\t{sent_id or ""}\t{newdoc}\n')
+            os.replace(tmp_filename, index_filename)
+        except OSError as exception:
+            logging.warning('Cannot save the index %s: %s', index_filename, exception)
+            try:
+                os.remove(tmp_filename)
+            except OSError:
+                pass
+            return False
+        return True
+
+    def __len__(self):
+        return len(self.entries)
+
+    def find(self, sent_id):
+        """Return the position (0-based) of the sentence with the given sent_id or None."""
+        if self._positions is None:
+            self._positions = {}
+            for position, entry in enumerate(self.entries):
+                self._positions.setdefault(entry[2], position)
+        return self._positions.get(sent_id)
+
+    def matching(self, sent_id_filter):
+        """Return the positions of sentences whose sent_id matches the regex (as in `sent_id_filter`)."""
+        regex = re.compile(sent_id_filter) if isinstance(sent_id_filter, str) else sent_id_filter
+        # Trees without sent_id are called "?" when matched by BaseReader.filtered_read_tree.
+        return [position for position, entry in enumerate(self.entries)
+                if regex.match(entry[2] or '?') is not None]
+
+    def _position(self, key):
+        if isinstance(key, int):
+            return key
+        position = self.find(key)
+        if position is None:
+            raise KeyError(key)
+        return position
+
+    def get_string(self, key):
+        """Return the CoNLL-U lines of the sentence (given by its sent_id or position) as a string."""
+        offset, length = self.entries[self._position(key)][:2]
+        if self._mmap is None:
+            stat = os.stat(self.filename)
+            if stat.st_size != self.size or stat.st_mtime_ns != self.mtime_ns:
+                raise RuntimeError(f'File {self.filename} has changed since it was indexed')
+            self._file = open(self.filename, 'rb')  # pylint: disable=consider-using-with
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        string = self._mmap[offset:offset + length].decode(self.encoding)
+        return string.replace('\r\n', '\n') if '\r' in string else string
+
+    def get_tree(self, key, reader=None):
+        """Return the sentence (given by its sent_id or position) as a new tree (`Root`).
+
+        `reader` is a read.Conllu instance used for parsing (by default a new one).
+        """
+        if reader is None:
+            if self._reader is None:
+                from udapi.block.read.conllu import Conllu
+                self._reader = Conllu()
+            reader = self._reader
+        return reader.read_tree_from_lines(self.get_string(key).split('\n'))
+
+    def close(self):
+        """Close the memory-mapped file (it is reopened if needed)."""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._file.close()
+            self._mmap, self._file = None, None
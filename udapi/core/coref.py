@@ -105,6 +105,9 @@ import copy
 import logging
 import bisect
 
+from udapi.core.node import EmptyOrd
+
+
 @functools.total_ordering
 class CorefMention(object):
     """Class for representing a mention (instance of an entity)."""
@@ -918,14 +921,18 @@ def store_coref_to_misc(doc):
                 strs = first_word.misc['SplitAnte'] + ',' + strs
             first_word.misc['SplitAnte'] = strs
 
+def _parse_ord(string):
+    return EmptyOrd(string) if '.' in string else int(string)
+
+
 def span_to_nodes(root, span):
     ranges = []
     for span_str in span.split(','):
         try:
             if '-' not in span_str:
-                lo = hi = float(span_str)
+                lo = hi = _parse_ord(span_str)
             else:
-                lo, hi = (float(x) for x in span_str.split('-'))
+                lo, hi = (_parse_ord(x) for x in span_str.split('-'))
         except ValueError as e:
             raise ValueError(f"Cannot parse '{span}': {e}")
         ranges.append((lo, hi))
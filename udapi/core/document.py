@@ -1,14 +1,42 @@
 """Document class is a container for UD trees."""
 
+import bisect
 import io
 import contextlib
 import logging
-import udapi.core.coref
 from udapi.core.bundle import Bundle
-from udapi.block.read.conllu import Conllu as ConlluReader
-from udapi.block.write.conllu import Conllu as ConlluWriter
-from udapi.block.read.sentences import Sentences as SentencesReader
-from udapi.block.write.textmodetrees import TextModeTrees
+
+# Readers, writers and the coreference module are imported lazily (inside the methods),
+# so that `import udapi` and starting `udapy` is fast.
+# Most udapy scenarios need just one reader and one writer.
+
+class BundleList(list):
+    """The list of bundles of a document, which counts its in-place modifications in `version`.
+
+    The document uses the counter to detect that its index of bundle IDs is outdated.
+    """
+
+    __slots__ = ('version',)
+
+    def __init__(self, bundles=()):
+        super().__init__(bundles)
+        self.version = 0
+
+
+def _counting(name):
+    method = getattr(list, name)
+
+    def modify(self, *args, **kwargs):
+        self.version += 1
+        return method(self, *args, **kwargs)
+    modify.__name__ = name
+    return modify
+
+
+for _name in ('__setitem__', '__delitem__', '__iadd__', '__imul__', 'append', 'extend',
+              'insert', 'pop', 'remove', 'clear', 'sort', 'reverse'):
+    setattr(BundleList, _name, _counting(_name))
+
 
 class Document(object):
     """Document is a container for Universal Dependency trees."""
@@ -25,8 +53,16 @@ class Document(object):
             You can pass additional parameters for `udapi.block.read.sentences`
             (`ignore_empty_lines`, `newdoc_if_empty_line` and `rstrip`).
         """
-        self.bundles = []
+        self._bundles = BundleList()
         self._highest_bundle_id = 0
+        # Bundle.number of bundles from this position on may be outdated (None = all are valid).
+        self._renumber_from = None
+        # Removed bundles and their (sorted) positions in self._bundles, which is compacted lazily.
+        self._removed, self._removed_bundles, self._removed_version = [], set(), 0
+        # bundle_id -> bundle, created lazily by the first `get_bundle()` call.
+        self._bundle_ids = None
+        self._bundle_ids_version = None
+        self._duplicate_ids = False
         self.meta = {}
         self.json = {}
         self._eid_to_entity = None
@@ -34,6 +70,7 @@ class Document(object):
             if filename.endswith(".conllu"):
                 self.load_conllu(filename, **kwargs)
             elif filename.endswith(".txt"):
+                from udapi.block.read.sentences import Sentences as SentencesReader
                 reader = SentencesReader(files=[filename], **kwargs)
                 reader.apply_on_document(self)
             else:
@@ -48,41 +85,229 @@ class Document(object):
     def __len__(self):
         return len(self.bundles)
 
+    @property
+    def bundles(self):
+        """The list of bundles in this document.
+
+        If you modify this list in place (instead of using `create_bundle()`, `bundle.remove()`
+        or assigning a new list, e.g. `doc.bundles = new_bundles`), the document index
+        (used by `get_bundle()`, `get_tree()`, `bundle.number` and `root.next_tree`)
+        is rebuilt lazily once the change is detected, which is slower.
+        """
+        if self._removed:
+            self._compact()
+        return self._bundles
+
+    @bundles.setter
+    def bundles(self, bundles):
+        self._bundles = BundleList(bundles)
+        self._renumber_from = 0
+        self._removed, self._removed_bundles = [], set()
+        self._bundle_ids = None
+
     def __str__(self):
         """Pretty print the whole document using write.TextModeTrees."""
+        from udapi.block.write.textmodetrees import TextModeTrees
         fh = io.StringIO()
         with contextlib.redirect_stdout(fh):
             TextModeTrees(color=True).run(self)
         return fh.getvalue()
 
-    def create_bundle(self):
-        """Create a new bundle and add it at the end of the document."""
+    def create_bundle(self, after=None):
+        """Create a new bundle and add it at the end of the document.
+
+        Args:
+        after: if specified, the new bundle is inserted right after this bundle
+            (instead of at the end of the document).
+        """
         self._highest_bundle_id += 1
         bundle = Bundle(document=self, bundle_id=str(self._highest_bundle_id))
-        self.bundles.append(bundle)
-        bundle.number = len(self.bundles)
+        if after is None:
+            # list.append does not increase the version, the index is updated below.
+            list.append(self._bundles, bundle)
+            bundle._number = len(self._bundles)
+        else:
+            position = self.bundle_number(after)
+            if self._removed:
+                self._compact()
+            list.insert(self._bundles, position, bundle)
+            if self._renumber_from is None or self._renumber_from > position:
+                self._renumber_from = position
+        if self._bundle_ids is not None:
+            self._index_bundle(bundle)
         return bundle
 
+    def _renumber(self):
+        """Update Bundle.number of all bundles whose number may be outdated."""
+        bundles = self._bundles
+        for number in range(self._renumber_from + 1, len(bundles) + 1):
+            bundles[number - 1]._number = number
+        for bundle in self._removed_bundles:
+            bundle._number = None
+        self._renumber_from = None
+
+    def _compact(self):
+        """Create a new list of bundles without the removed ones."""
+        bundles, removed = self._bundles, self._removed
+        if bundles.version == self._removed_version:
+            kept, start = BundleList(), 0
+            for position in removed:
+                list.extend(kept, bundles[start:position])
+                start = position + 1
+            list.extend(kept, bundles[start:])
+            renumber_from = removed[0]
+        else:
+            # The list has been modified in place since the removals, so the positions are invalid.
+            kept = BundleList(b for b in bundles if b not in self._removed_bundles)
+            renumber_from = 0
+        kept.version = bundles.version
+        self._bundles = kept
+        self._removed, self._removed_bundles = [], set()
+        if self._renumber_from is None or self._renumber_from > renumber_from:
+            self._renumber_from = renumber_from
+
+    def _list_position(self, bundle):
+        """Return the position of the bundle in self._bundles (including the removed bundles)."""
+        if self._removed and self._bundles.version != self._removed_version:
+            self._compact()
+        if self._renumber_from is not None:
+            self._renumber()
+        bundles, number = self._bundles, bundle._number
+        if number is None or number > len(bundles) or bundles[number - 1] is not bundle:
+            # The list of bundles has been modified in place, so renumber all bundles.
+            self._renumber_from = 0
+            self._renumber()
+            number = bundle._number
+            if number is None or number > len(bundles) or bundles[number - 1] is not bundle:
+                raise ValueError(f'{bundle} is not in the document')
+        return number - 1
+
+    def bundle_number(self, bundle):
+        """Return the position of the bundle in this document (1-based), i.e. `bundle.number`.
+
+        Raises ValueError if the bundle is not in this document.
+        """
+        if bundle in self._removed_bundles:
+            raise ValueError(f'{bundle} is not in the document')
+        position = self._list_position(bundle)
+        if not self._removed:
+            return position + 1
+        return position + 1 - bisect.bisect_left(self._removed, position)
+
+    def _remove_bundle(self, bundle):
+        """Remove the bundle from this document, see `Bundle.remove()`."""
+        if bundle in self._removed_bundles:
+            raise ValueError(f'{bundle} is not in the document')
+        position = self._list_position(bundle)
+        # The bundle is just marked as removed, the list of bundles is compacted
+        # (i.e. a new list is created) on the next access. So removing many bundles is fast
+        # and callers iterating over the original list of bundles are not affected.
+        bisect.insort(self._removed, position)
+        self._removed_bundles.add(bundle)
+        self._removed_version = self._bundles.version
+        if self._bundle_ids is not None:
+            self._unindex_bundle(bundle, bundle._bundle_id)
+
+    def _adjacent_bundle(self, bundle, step):
+        """Return the next (step=1) or previous (step=-1) bundle or None if there is none."""
+        if bundle in self._removed_bundles:
+            raise ValueError(f'{bundle} is not in the document')
+        position = self._list_position(bundle)
+        bundles, removed = self._bundles, self._removed_bundles
+        position += step
+        while 0 <= position < len(bundles):
+            if bundles[position] not in removed:
+                return bundles[position]
+            position += step
+        return None
+
+    def _index_bundle(self, bundle):
+        if self._bundle_ids.setdefault(bundle._bundle_id, bundle) is not bundle:
+            # Duplicate bundle IDs are rare, so just let the index be rebuilt in document order.
+            self._bundle_ids = None
+
+    def _unindex_bundle(self, bundle, bundle_id):
+        """Remove `bundle_id` of a removed or renamed bundle from the index."""
+        if self._bundle_ids is not None and self._bundle_ids.get(bundle_id) is bundle:
+            if self._duplicate_ids:
+                self._bundle_ids = None
+            else:
+                del self._bundle_ids[bundle_id]
+
+    def get_bundle(self, bundle_id):
+        """Return the bundle with a given `bundle_id` or None if there is no such bundle.
+
+        If more bundles have the same ID, the first one is returned.
+        The lookup uses an index, which is built by the first call
+        and then maintained when adding, removing and renaming bundles.
+        """
+        if self._bundle_ids is None or self._bundle_ids_version != self._bundles.version:
+            self._build_bundle_ids()
+        bundle = self._bundle_ids.get(bundle_id)
+        if bundle is not None and bundle._bundle_id == bundle_id and bundle._document is self:
+            try:
+                self.bundle_number(bundle)
+                return bundle
+            except ValueError:
+                pass
+        if bundle is not None:
+            # The index is outdated, e.g. the bundle has been moved to another document.
+            self._build_bundle_ids()
+            return self._bundle_ids.get(bundle_id)
+        return None
+
+    def _build_bundle_ids(self):
+        bundles = self.bundles
+        self._bundle_ids = {}
+        for bundle in bundles:
+            self._bundle_ids.setdefault(bundle._bundle_id, bundle)
+        self._bundle_ids_version = self._bundles.version
+        self._duplicate_ids = len(self._bundle_ids) < len(bundles)
+
+    def get_tree(self, sent_id):
+        """Return the tree (root) with a given `sent_id` or None if there is no such tree.
+
+        `sent_id` consists of the bundle ID and (if the tree's zone is not empty)
+        a slash and the zone, e.g. `s123/en`.
+        """
+        parts = sent_id.split('/', 1)
+        bundle = self.get_bundle(parts[0])
+        if bundle is None:
+            return None
+        return bundle._tree_by_zone(parts[1] if len(parts) == 2 else '')
+
     def load_conllu(self, filename=None, **kwargs):
         """Load a document from a conllu-formatted file."""
+        from udapi.block.read.conllu import Conllu as ConlluReader
         ConlluReader(files=[filename], **kwargs).process_document(self)
 
     def store_conllu(self, filename):
         """Store a document into a conllu-formatted file."""
+        from udapi.block.write.conllu import Conllu as ConlluWriter
         ConlluWriter(files=[filename]).apply_on_document(self)
 
     def from_conllu_string(self, string):
         """Load a document from a conllu-formatted string."""
+        from udapi.block.read.conllu import Conllu as ConlluReader
         reader = ConlluReader(filehandle=io.StringIO(string))
         reader.apply_on_document(self)
 
     def to_conllu_string(self):
         """Return the document as a conllu-formatted string."""
+        from udapi.block.write.conllu import Conllu as ConlluWriter
         fh = io.StringIO()
         with contextlib.redirect_stdout(fh):
             ConlluWriter().apply_on_document(self)
         return fh.getvalue()
 
+    def to_arrays(self):
+        """Return the node attributes as NumPy arrays, see `udapi.core.arrays.NodeArrays`.
+
+        This requires NumPy to be installed.
+        """
+        from udapi.core.arrays import NodeArrays
+        return NodeArrays.from_document(self)
+
     @property
     def trees(self):
         """An iterator over all trees in the document."""
@@ -108,8 +333,35 @@ class Document(object):
                 for node in tree.descendants_and_empty:
                     yield node
 
+    def release(self):
+        """Break all reference cycles within this document and remove all its bundles.
+
+        Nodes, trees, bundles and coreference objects reference each other
+        (e.g. `node.parent` and `parent.children`, `node.root` and `root.descendants`),
+        so a document which is not needed anymore cannot be freed
+        by the reference counting and it must wait for the (slow) garbage collector,
+        which is disabled in `udapy` by default.
+        After calling `doc.release()`, the memory is freed immediately
+        once there are no other references to the document objects.
+        The document is empty after this call (and so are its trees and nodes),
+        so it must not be used anymore (except for `doc.meta` and `doc.json`).
+        """
+        if self._eid_to_entity:
+            for entity in self._eid_to_entity.values():
+                for mention in entity._mentions:
+                    mention._head, mention._entity, mention._words = None, None, []
+                    mention._bridging = None
+                entity._mentions = []
+                entity.split_ante = []
+        self._eid_to_entity = None
+        for bundle in self.bundles:
+            bundle.release()
+            bundle._document = None
+        self.bundles = []
+
     def draw(self, **kwargs):
         """Pretty print the trees using TextModeTrees."""
+        from udapi.block.write.textmodetrees import TextModeTrees
         TextModeTrees(**kwargs).run(self)
 
     def _load_coref(self):
@@ -120,6 +372,7 @@ class Document(object):
         (stored in attributes Entity, SplitAnte, Bridge).
         """
         if self._eid_to_entity is None:
+            import udapi.core.coref
             udapi.core.coref.load_coref_from_misc(self)
 
     @property
@@ -164,6 +417,7 @@ class Document(object):
             eid = f'e{counter}'
         elif self._eid_to_entity.get(eid):
             raise ValueError("Entity with eid=%s already exists", eid)
+        import udapi.core.coref
         entity = udapi.core.coref.CorefEntity(eid, etype)
         self._eid_to_entity[eid] = entity
         return entity
@@ -3,6 +3,23 @@ import collections.abc
 import copy
 
 
+def _lookup(string, key):
+    """Return the value of `key` in the serialized `string` (or None if it is missing).
+
+    This gives the same result as deserializing the string and looking up the key in the dict
+    (including the case of repeated keys, where the last one wins),
+    but it is faster when just one or a few keys are needed (e.g. `misc['SpaceAfter']`).
+    """
+    padded = '|' + string + '|'
+    start = padded.rfind('|' + key + '=')
+    if padded.rfind('|' + key + '|') > start:
+        return True
+    if start == -1:
+        return None
+    start += len(key) + 2
+    return padded[start:padded.index('|', start)]
+
+
 class DualDict(collections.abc.MutableMapping):
     """DualDict class serves as dict with lazily synchronized string representation.
 
@@ -21,6 +38,9 @@ class DualDict(collections.abc.MutableMapping):
     both of the representations which are always kept synchronized.
     Moreover, the synchronization is lazy, so the serialization and deserialization
     is done only when needed. This speeds up scenarios where access to dict is not needed.
+    Looking up a single key (e.g. `ddict['Case']` or `'Case' in ddict`) does not deserialize
+    the string either, the key is searched directly in the string until the first modification
+    (or iteration) of the mapping.
 
     A value can be deleted with any of the following three ways:
     >>> del ddict['Case']
@@ -60,6 +80,12 @@ class DualDict(collections.abc.MutableMapping):
                 self._dict[name] = value
 
     def __getitem__(self, key):
+        string = self._string
+        if string is not None and not self._dict and '|' not in key and '=' not in key:
+            if key not in string or string == '_':
+                return ''
+            value = _lookup(string, key)
+            return value if value is not None else ''
         self._deserialize_if_empty()
         return self._dict.get(key, '')
 
@@ -88,6 +114,9 @@ class DualDict(collections.abc.MutableMapping):
         return len(self._dict)
 
     def __contains__(self, key):
+        string = self._string
+        if string is not None and not self._dict and '|' not in key and '=' not in key:
+            return key in string and string != '_' and _lookup(string, key) is not None
         self._deserialize_if_empty()
         return self._dict.__contains__(key)
 
@@ -0,0 +1,168 @@
+"""Accounting of the memory footprint of Udapi documents and of the whole process.
+
+`document_memory(doc)` samples trees of a document, measures the size of all objects
+reachable from their nodes (using `sys.getsizeof`) and attributes each object
+to one component, e.g. the `Node` objects themselves, their string attributes,
+`Feats` and `DualDict` (MISC) objects, lists of children, lists of coreference mentions,
+coreference objects, comments etc. Each object is counted only once (in the first component
+where it was reached), so e.g. interned strings like "NOUN" shared by many nodes are counted once.
+The sizes are extrapolated from the sampled trees to the whole document.
+
+`peak_rss()` and `current_rss()` return the resident set size of the current process.
+See also block `util.MemStats` and `udapy --memory_report`.
+"""
+import os
+import sys
+
+from udapi.core.bundle import Bundle
+from udapi.core.coref import CorefEntity, CorefMention
+from udapi.core.document import Document
+from udapi.core.mwt import MWT
+from udapi.core.node import Node
+
+# The components in the order in which they are reported.
+COMPONENTS = ('node', 'strings', 'feats', 'misc', 'deps', 'children', 'mentions', 'mwt',
+              'coref', 'root', 'comments', 'cache')
+
+# Objects of these classes are accounted separately, so _deep_size() does not follow them.
+_SEPARATE = (Node, MWT, CorefMention, CorefEntity, Bundle, Document)
+
+_MIB = 1024 * 1024
+
+
+def peak_rss():
+    """Return the peak resident set size of this process in bytes (or None if unknown)."""
+    try:
+        import resource
+    except ImportError:  # e.g. on Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, but in KiB on Linux and other systems.
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def current_rss():
+    """Return the current resident set size of this process in bytes (or None if unknown)."""
+    try:
+        with open('/proc/self/statm', encoding='ascii') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def format_mib(size):
+    """Return the given size in bytes as a string in MiB (or "?" for None)."""
+    return '?' if size is None else f'{size / _MIB:.1f} MiB'
+
+
+def _deep_size(obj, seen):
+    """Return the size of `obj` and all objects reachable from it, which are not in `seen`.
+
+    Containers (list, tuple, dict, set) and objects with __slots__ or __dict__ are followed,
+    except for nodes, multi-word tokens and coreference objects (see _SEPARATE).
+    """
+    size = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if obj is None or id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, (str, int, float, bool)):
+            continue
+        if isinstance(obj, dict):
+            stack.extend(x for x in obj.keys() if not isinstance(x, _SEPARATE))
+            stack.extend(x for x in obj.values() if not isinstance(x, _SEPARATE))
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(x for x in obj if not isinstance(x, _SEPARATE))
+        else:
+            for cls in type(obj).__mro__:
+                for slot in getattr(cls, '__slots__', ()):
+                    value = getattr(obj, slot, None)
+                    if not isinstance(value, _SEPARATE):
+                        stack.append(value)
+            if hasattr(obj, '__dict__'):
+                stack.append(obj.__dict__)
+    return size
+
+
+def _sampled_trees(document, max_trees):
+    trees = list(document.trees)
+    if max_trees and len(trees) > max_trees:
+        step = len(trees) / max_trees
+        trees = [trees[int(i * step)] for i in range(max_trees)]
+    return trees
+
+
+def document_memory(document, max_trees=1000):
+    """Return a dict with an estimated memory footprint of the document (in bytes) per component.
+
+    Args:
+    document: the document to be measured
+    max_trees: the maximum number of (evenly spaced) trees to be measured.
+        The sizes are extrapolated to the whole document.
+        If 0 or None, all trees are measured.
+
+    The returned dict contains the COMPONENTS as keys and also
+    `nodes` (the number of nodes including empty nodes in the whole document),
+    `trees` (the number of trees in the whole document) and
+    `sampled_trees` and `sampled_nodes`.
+    """
+    # pylint: disable=protected-access
+    result = dict.fromkeys(COMPONENTS, 0)
+    seen = set()
+    all_trees, all_nodes = 0, 0
+    for tree in document.trees:
+        all_trees += 1
+        all_nodes += len(tree._descendants) + len(tree.empty_nodes)
+    trees = _sampled_trees(document, max_trees)
+    sampled_nodes = 0
+    for root in trees:
+        nodes = root._descendants + root.empty_nodes
+        sampled_nodes += len(nodes)
+        for node in nodes:
+            seen.add(id(node))
+            result['node'] += sys.getsizeof(node)
+            if not isinstance(node._ord, int):
+                result['node'] += _deep_size(node._ord, seen)
+            for string in (node.form, node.lemma, node.upos, node.xpos, node.deprel, node._raw_deps):
+                result['strings'] += _deep_size(string, seen)
+            result['feats'] += _deep_size(node._feats, seen)
+            result['misc'] += _deep_size(node._misc, seen)
+            result['deps'] += _deep_size(node._deps, seen)
+            result['children'] += _deep_size(node._children, seen)
+            result['mentions'] += _deep_size(node._mentions, seen)
+            for mention in node._mentions:
+                if id(mention) not in seen:
+                    result['coref'] += _deep_size(mention, seen)
+                    if mention._entity is not None:
+                        result['coref'] += _deep_size(mention._entity, seen)
+        for mwt in root._mwts:
+            result['mwt'] += _deep_size(mwt, seen)
+        result['cache'] += _deep_size(root._cache, seen)
+        result['comments'] += sum(_deep_size(x, seen) for x in (root.comment, root.text, root._sent_id))
+        result['root'] += _deep_size(root, seen) + _deep_size(root._bundle, seen)
+
+    if sampled_nodes and all_nodes != sampled_nodes:
+        for component in COMPONENTS:
+            result[component] = int(result[component] * all_nodes / sampled_nodes)
+    result.update(nodes=all_nodes, trees=all_trees, sampled_trees=len(trees), sampled_nodes=sampled_nodes)
+    return result
+
+
+def format_report(stats):
+    """Return a (multi-line) string with a table of the given memory statistics.
+
+    `stats` is a dict returned by `document_memory` (or a sum of such dicts).
+    """
+    nodes = stats['nodes'] or 1
+    total = sum(stats[c] for c in COMPONENTS) or 1
+    lines = [f'{"component":<10} {"bytes/node":>10} {"total":>12} {"share":>6}']
+    for component in COMPONENTS:
+        size = stats[component]
+        lines.append(f'{component:<10} {size / nodes:10.1f} {format_mib(size):>12} {100 * size / total:5.1f}%')
+    lines.append(f'{"TOTAL":<10} {total / nodes:10.1f} {format_mib(total):>12} '
+                 f'({stats["nodes"]} nodes in {stats["trees"]} trees, '
+                 f'{stats["sampled_trees"]} trees sampled)')
+    return '\n'.join(lines)
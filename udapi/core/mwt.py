@@ -61,6 +61,7 @@ class MWT(object):
         for word in self.words:
             word._mwt = None  # pylint: disable=W0212
         self.root.multiword_tokens.remove(self)
+        self.root._version += 1  # pylint: disable=W0212
 
     def address(self):
         """Full (document-wide) id of the multi-word token."""
@@ -78,7 +79,7 @@ class MWT(object):
     @property
     def no_space_after(self):
         """Boolean property as a shortcut for `mwt.misc["SpaceAfter"] == "No"`."""
-        return self.misc["SpaceAfter"] == "No"
+        return self._misc is not None and self._misc["SpaceAfter"] == "No"
 
     @staticmethod
     def is_empty():
@@ -1,14 +1,15 @@
 """Node class and related classes and functions.
 
 In addition to class `Node`, this module contains also helper classes
-`CycleError`, `EmptyNode`, `OrdTuple` and `ListOfNodes`
+`CycleError`, `EmptyNode`, `EmptyOrd` and `ListOfNodes`
 and function `find_minimal_common_treelet`.
 """
+import bisect
 import logging
 import functools
+import re
+from operator import attrgetter
 
-import udapi.core.coref
-from udapi.block.write.textmodetrees import TextModeTrees
 from udapi.core.dualdict import DualDict
 from udapi.core.feats import Feats
 
@@ -23,6 +24,9 @@ from udapi.core.feats import Feats
 # The set of public attributes/properties and methods of Node was well-thought.
 # pylint: disable=too-many-instance-attributes,too-many-public-methods
 
+_ORD = attrgetter('_ord')
+
+
 @functools.total_ordering
 class Node(object):
     """Class for representing nodes in Universal Dependency trees.
@@ -125,6 +129,8 @@ class Node(object):
     @ord.setter
     def ord(self, new_ord):
         self._ord = new_ord
+        if self._root is not None:
+            self._root._version += 1
 
     def __lt__(self, other):
         """Calling `nodeA < nodeB` is equivalent to `nodeA.ord < nodeB.ord`.
@@ -288,8 +294,8 @@ class Node(object):
                 # Empty nodes have to be located differently than normal nodes.
                 if '.' in head:
                     try:
-                        parent = next(x for x in self._root.empty_nodes if str(x._ord) == head)
-                    except StopIteration:
+                        parent = self._root._empty_nodes_by_ord()[head]
+                    except KeyError:
                         raise ValueError(f'Empty node with ord={head} not found')
                 else:
                     parent = nodes[int(head)]
@@ -340,6 +346,7 @@ class Node(object):
                                  'use new_root.steal_nodes(nodes_to_be_moved) instead')
         # Set the new parent.
         self._parent = new_parent
+        self._root._version += 1
 
         # Append the current node to the new parent children.
         if not new_parent._children or self > new_parent._children[-1]:
@@ -407,17 +414,27 @@ class Node(object):
          nodes4 = [n for n in node.descendants if n.ord < node.ord] + [node]
         See the documentation of ListOfNodes for details.
         """
-        # The following code is equivalent to
-        # ListOfNodes(sorted(self.unordered_descendants()), origin=self)
-        # but it is faster because there is no extra copying of lists of nodes.
-        stack = list(self._children)
-        descendants = ListOfNodes(stack, origin=self)
-        while(stack):
-            n = stack.pop()
-            if n._children:
-                stack.extend(n._children)
-                descendants.extend(n._children)
-        descendants.sort()
+        return ListOfNodes(self._sorted_descendants(), origin=self)
+
+    def _sorted_descendants(self):
+        """Return a tuple of all descendants sorted by ord (cached until the tree changes)."""
+        if not self._children:
+            return ()
+        cache = self._root._get_cache() if self._root is not None else {}
+        descendants = cache.get(self)
+        if descendants is None:
+            # The following code is equivalent to
+            # sorted(self.unordered_descendants())
+            # but it is faster because there is no extra copying of lists of nodes.
+            stack = list(self._children)
+            descendants = list(stack)
+            while stack:
+                n = stack.pop()
+                if n._children:
+                    stack.extend(n._children)
+                    descendants.extend(n._children)
+            descendants.sort(key=_ORD)
+            descendants = cache[self] = tuple(descendants)
         return descendants
 
     def is_descendant_of(self, node):
@@ -437,6 +454,7 @@ class Node(object):
         self._root._descendants.append(new_node)
         self._children.append(new_node)
         new_node._parent = self
+        self._root._version += 1
         return new_node
 
     def create_empty_child(self, deprel, after=True, **kwargs):
@@ -455,24 +473,17 @@ class Node(object):
         new_node.deps = [{'parent': self, 'deprel': deprel}]
         # self.enh_children.append(new_node) TODO
         # new_node.enh_parents.append(self) TODO
-        base_ord = self._ord if after else self._ord - 1
-        new_ord = base_ord + 0.1
-        for empty in self._root.empty_nodes:
-            if empty._ord > new_ord:
-                break
-            if empty._ord == new_ord:
-                if isinstance(new_ord, OrdTuple):
-                    new_ord.increase()
-                elif new_ord == base_ord + 0.9:
-                    new_ord = OrdTuple(base_ord, 10)
-                else:
-                    new_ord = round(new_ord+0.1, 1)
-        new_node._ord = new_ord
-        if not self._root.empty_nodes or new_node > self._root.empty_nodes[-1]:
-            self._root.empty_nodes.append(new_node)
-        else:
-            self._root.empty_nodes.append(new_node)
-            self._root.empty_nodes.sort()
+        major = self._ord if after else self._ord - 1
+        empty_nodes = self._root.empty_nodes
+        # Find the first empty node following the node `major` (empty_nodes are sorted by ord)
+        # and skip the empty nodes major.1, major.2,... which are already there.
+        index = _bisect_ord(empty_nodes, major)
+        minor = 1
+        while index < len(empty_nodes) and empty_nodes[index]._ord == EmptyOrd(major, minor):
+            index, minor = index + 1, minor + 1
+        new_node._ord = EmptyOrd(major, minor)
+        empty_nodes.insert(index, new_node)
+        self._root._version += 1
         return new_node
 
     # TODO: make private: _unordered_descendants
@@ -514,162 +525,65 @@ class Node(object):
             `rehang` means to re-attach those children to the parent of the removed node.
             `warn` means to issue a warning if any children are present and delete them.
             `rehang_warn` means to rehang and warn:-).
+
+        The removed nodes are also deleted from multi-word tokens and coreference mentions.
+        When removing many nodes from one tree, `root.remove_nodes(nodes)` is much faster.
         """
-        self._parent._children.remove(self)
-
-        # If there are any children, do the action specified in the "children" parameter.
-        if children is not None and self._children:
-            if children.startswith('rehang'):
-                for child in self._children:
-                    child._parent = self._parent
-                self._parent._children.extend(self._children)
-                self._parent._children.sort()
-                self._children.clear()
-            if children.endswith('warn'):
-                logging.warning('%s is being removed by remove(children=%s), '
-                                ' but it has (unexpected) children', self, children)
-
-        # When self is the only node being removed, it is faster to root._descendants.remove(self)
-        # and update the ords only where necessary (from self._ord further).
-        # When removing also its children+descendants, it is faster to recompute root._descendants
-        # and update all ords (computing leftmost descendant of self would be too slow).
-        if not self._children:
-            try:
-                self._root._descendants.remove(self)
-            except ValueError:
-                pass # self may be an already deleted node e.g. if n.remove() called twice
-            else:
-                for (new_ord, node) in enumerate(self._root._descendants[self._ord - 1:], self._ord):
-                    node.ord = new_ord
-                last_ord = 0
-                for empty in self._root.empty_nodes:
-                    if empty._ord > self._ord:
-                        new_ord = round(empty._ord - 1, 1)
-                        if new_ord <= last_ord:
-                            new_ord = round(last_ord + 0.1, 1)
-                        empty.ord = new_ord
-                    last_ord = empty._ord
-        else:
-            # Remember the position of empty nodes, so we can reorder them as well.
-            empty_follows = None
-            if self._root.empty_nodes:
-                will_be_removed = self if children and children.startswith('rehang') else self.descendants(add_self=1)
-                prev_nonempty = self._root
-                empty_follows = {}
-                for node in self._root.descendants_and_empty:
-                    if node.is_empty():
-                        empty_follows[node] = prev_nonempty
-                    elif node not in will_be_removed:
-                        prev_nonempty = node
-
-            # TODO nodes_to_remove = self.unordered_descendants()
-            # and mark all nodes as deleted, remove them from MWT and coref mentions
-            self._root._descendants = sorted(self._root.unordered_descendants())
-            for (new_ord, node) in enumerate(self._root._descendants, 1):
-                node.ord = new_ord
-            # Decrease ord of empty nodes (keep their fractional part)
-            # Make sure that e.g. after deleting node with ord=2
-            # ords "1 1.1 1.2 2 2.1" will become "1 1.1 1.2 1.3".
-            if empty_follows:
-                last_ord = 0
-                for empty in self._root.empty_nodes:
-                    prev_nonempty = empty_follows[empty]
-                    new_ord = round(prev_nonempty._ord + (empty._ord % 1), 1)
-                    while new_ord <= last_ord:
-                        new_ord = round(new_ord + 0.1, 1)
-                    last_ord, empty.ord = new_ord, new_ord
+        self._root.remove_nodes((self,), children)
 
     def _shift_before_ord(self, reference_ord, without_children=False):
-        """Internal method for changing word order."""
-        all_nodes = self._root._descendants
-        empty_nodes = self._root.empty_nodes
+        """Internal method for changing word order.
 
-        # Moving a single node can be faster than nodes_to_move = [self]
+        The moved nodes (this node or its whole subtree) are placed right before the first
+        non-moved node with ord >= `reference_ord` (or at the end of the sentence).
+        Empty nodes keep their position relative to the non-moved nodes,
+        so e.g. empty nodes just before the reference node will precede the moved nodes.
+        """
+        root = self._root
+        all_nodes = root._descendants
+
+        # Moving a single node can be done in place, which is faster.
         if without_children or not self._children:
             my_ord = self._ord
             if reference_ord > my_ord + 1:
-                for i_ord in range(my_ord, reference_ord - 1):
-                    all_nodes[i_ord - 1] = all_nodes[i_ord]
-                    all_nodes[i_ord - 1]._ord = i_ord
-                all_nodes[reference_ord - 2] = self
-                self._ord = reference_ord - 1
-                for en in empty_nodes:
-                    if en._ord > my_ord and en._ord < reference_ord:
-                        en._ord -= 1
+                lo, hi, new_ord = my_ord - 1, reference_ord - 1, reference_ord - 1
             elif reference_ord < my_ord:
-                for i_ord in range(my_ord, reference_ord, -1):
-                    all_nodes[i_ord - 1] = all_nodes[i_ord - 2]
-                    all_nodes[i_ord - 1]._ord = i_ord
-                all_nodes[reference_ord - 1] = self
-                self._ord = reference_ord
-                for en in empty_nodes:
-                    # Empty nodes before the first overt token (ID=0.X) will be never moved this way.
-                    # We cannot know whether the caller wanted to place the shifted node before or after them.
-                    if en._ord < my_ord and en._ord > reference_ord:
-                        en._ord += 1
-            self._parent._children.sort()
-            return
-
-        #TODO: Updating ords of empty nodes is implemented only for the simple case above,
-        # but it has to be implemented also for the complex case below!
-        nodes_to_move = self.descendants(add_self=True)
-        first_ord, last_ord = nodes_to_move[0]._ord, nodes_to_move[-1]._ord
-
-        # If there are no "gaps" in nodes_to_move (e.g. when it is projective),
-        # we can make the shifting a bit faster and simpler.
-        if last_ord - first_ord + 1 == len(nodes_to_move):
-            # First, move a node from position src_ord to position trg_ord RIGHT-ward.
-            trg_ord, src_ord = last_ord, first_ord - 1
-            while src_ord >= reference_ord:
-                all_nodes[trg_ord - 1] = all_nodes[src_ord - 1]
-                all_nodes[trg_ord-1]._ord = trg_ord
-                trg_ord, src_ord = trg_ord - 1, src_ord - 1
-            # Second, move a node from position src_ord to position trg_ord LEFT-ward.
-            trg_ord, src_ord = first_ord, last_ord + 1
-            while src_ord < reference_ord:
-                all_nodes[trg_ord - 1] = all_nodes[src_ord - 1]
-                all_nodes[trg_ord - 1]._ord = trg_ord
-                trg_ord, src_ord = trg_ord + 1, src_ord + 1
-            # Third, move nodes_to_move to trg_ord RIGHT-ward.
-            trg_ord = reference_ord if reference_ord < first_ord else trg_ord
-            for node in nodes_to_move:
-                all_nodes[trg_ord - 1], node._ord = node, trg_ord
-                trg_ord += 1
+                lo, hi, new_ord = reference_ord - 1, my_ord, reference_ord
+            else:
+                return
+            del all_nodes[my_ord - 1]
+            all_nodes.insert(new_ord - 1, self)
+            for i in range(lo, hi):
+                all_nodes[i]._ord = i + 1
             self._parent._children.sort()
+            root._version += 1
+            if root.empty_nodes:
+                root._shift_empty_nodes(lo, hi, [my_ord], reference_ord)
             return
 
-        # First, move a node from position src_ord to position trg_ord RIGHT-ward.
-        # src_ord iterates decreasingly over nodes which are not moving.
-        trg_ord, src_ord, mov_ord = last_ord, last_ord - 1, len(nodes_to_move) - 2
-        while src_ord >= reference_ord:
-            while all_nodes[src_ord - 1] is nodes_to_move[mov_ord]:
-                mov_ord, src_ord = mov_ord - 1, src_ord - 1
-                if src_ord < reference_ord:
-                    break
-            else:
-                all_nodes[trg_ord - 1] = all_nodes[src_ord - 1]
-                all_nodes[trg_ord - 1]._ord = trg_ord
-                trg_ord, src_ord = trg_ord - 1, src_ord - 1
-
-        # Second, move a node from position src_ord to position trg_ord LEFT-ward.
-        # src_ord iterates increasingly over nodes which are not moving.
-        trg_ord, src_ord, mov_ord = first_ord, first_ord + 1, 1
-        while src_ord < reference_ord:
-            while mov_ord < len(nodes_to_move) and all_nodes[src_ord - 1] is nodes_to_move[mov_ord]:
-                mov_ord, src_ord = mov_ord + 1, src_ord + 1
-                if src_ord >= reference_ord:
-                    break
-            else:
-                all_nodes[trg_ord - 1] = all_nodes[src_ord - 1]
-                all_nodes[trg_ord - 1]._ord = trg_ord
-                trg_ord, src_ord = trg_ord + 1, src_ord + 1
-
-        # Third, move nodes_to_move to trg_ord RIGHT-ward.
-        trg_ord = reference_ord if reference_ord < first_ord else trg_ord
-        for node in nodes_to_move:
-            all_nodes[trg_ord - 1], node._ord = node, trg_ord
-            trg_ord += 1
-        self._parent._children.sort()
+        moving = self.descendants(add_self=True)
+        moving_ords = [node._ord for node in moving]
+        first_ord, last_ord = moving_ords[0], moving_ords[-1]
+        lo = min(first_ord, reference_ord) - 1
+        hi = max(last_ord, reference_ord - 1)
+        # window = the non-moved nodes with ords lo+1..hi, the moved nodes will be inserted at insert_at
+        if last_ord - first_ord + 1 == len(moving):
+            window = all_nodes[lo:first_ord - 1] + all_nodes[last_ord:hi]
+        else:
+            moving_set = set(moving)
+            window = [node for node in all_nodes[lo:hi] if node not in moving_set]
+        insert_at = reference_ord - 1 - lo - bisect.bisect_left(moving_ords, reference_ord)
+        if window[insert_at:] == all_nodes[insert_at + lo + len(moving):hi] \
+                and all_nodes[insert_at + lo:insert_at + lo + len(moving)] == moving:
+            return  # the nodes are already there
+        after_ord = window[insert_at]._ord if insert_at < len(window) else hi + 1
+        window[insert_at:insert_at] = moving
+
+        # The relative order of the non-moved nodes and of the moved nodes is kept,
+        # so only the children of the parent of this node need to be re-sorted.
+        root._reorder(lo, window, (self._parent,))
+        if root.empty_nodes:
+            root._shift_empty_nodes(lo, hi, moving_ords, after_ord)
 
     def shift_after_node(self, reference_node, without_children=False, skip_if_descendant=False):
         """Shift this node after the reference_node."""
@@ -790,6 +704,8 @@ class Node(object):
             return self.feats[name[6:-1]]
         if name.startswith('misc['):
             return self.misc[name[5:-1]]
+        if name.startswith('column['):
+            return self.get_column(name[7:-1])
         return getattr(self, name)
 
     def get_attrs(self, attrs, undefs=None, stringify=True):
@@ -808,6 +724,7 @@ class Node(object):
         siblings: number of siblings nodes.
         depth: depth in the dependency tree (technical root has depth=0, highest word has depth=1).
         feats_split: list of name=value formatted strings of the FEATS.
+        column[NAME]: value of the extra (CoNLL-U Plus) column NAME, see `get_column`.
 
         Args:
         attrs: A list of attribute names, e.g. ``['form', 'lemma', 'p_upos']``.
@@ -855,25 +772,29 @@ class Node(object):
         Args:
         use_mwt: consider multi-word tokens? (default=True)
         """
-        string = ''
+        # Accessing `_misc` directly (instead of `misc`) saves creating empty DualDicts
+        # and the lookup of SpaceAfter does not deserialize the MISC strings.
+        # pylint: disable=protected-access
+        strings = []
         last_mwt_id = 0
         for node in self.descendants(add_self=not self.is_root()):
-            mwt = node.multiword_token
+            mwt = node._mwt
             if use_mwt and mwt:
                 if node._ord > last_mwt_id:
                     last_mwt_id = mwt.words[-1]._ord
-                    string += mwt.form
-                    if mwt.misc['SpaceAfter'] != 'No':
-                        string += ' '
+                    strings.append(mwt.form)
+                    if mwt._misc is None or mwt._misc['SpaceAfter'] != 'No':
+                        strings.append(' ')
             else:
-                string += node.form
-                if node.misc['SpaceAfter'] != 'No':
-                    string += ' '
-        return string.rstrip()
+                strings.append(node.form)
+                if node._misc is None or node._misc['SpaceAfter'] != 'No':
+                    strings.append(' ')
+        return ''.join(strings).rstrip()
 
     def print_subtree(self, **kwargs):
         """deprecated name for draw()"""
         logging.warning("node.print_subtree() is deprecated, use node.draw() instead.")
+        from udapi.block.write.textmodetrees import TextModeTrees
         TextModeTrees(**kwargs).process_tree(self)
 
     def draw(self, **kwargs):
@@ -888,6 +809,8 @@ class Node(object):
         attributes: to override the default list 'form,upos,deprel'
         See TextModeTrees for details and other parameters.
         """
+        # The visualizer is imported lazily, so that importing udapi.core.node stays cheap.
+        from udapi.block.write.textmodetrees import TextModeTrees
         TextModeTrees(**kwargs).process_tree(self)
 
     def address(self):
@@ -946,7 +869,7 @@ class Node(object):
             return False
 
         # Get all the descendants of parent that are in the span of the edge.
-        span = [n for n in parent.unordered_descendants() if n._ord > ord1 and n._ord < ord2]
+        span = [n for n in parent._sorted_descendants() if ord1 < n._ord < ord2]
 
         # For projective edges, span must include all the nodes between parent and self.
         return len(span) != distance - 1
@@ -976,7 +899,7 @@ class Node(object):
     @property
     def no_space_after(self):
         """Boolean property as a shortcut for `node.misc["SpaceAfter"] == "No"`."""
-        return self.misc["SpaceAfter"] == "No"
+        return self._misc is not None and self._misc["SpaceAfter"] == "No"
 
     @property
     def gloss(self):
@@ -987,6 +910,34 @@ class Node(object):
     def gloss(self, new_gloss):
         self.misc["Gloss"] = new_gloss
 
+    def get_column(self, name):
+        """Return the value of an extra (CoNLL-U Plus) column, e.g. `node.get_column('PARSEME:MWE')`.
+
+        The extra columns are loaded e.g. by read.Conllup (with `extra_columns=table`)
+        and stored in a side table of the tree (see `root.extra_columns`),
+        not in MISC, so they are not parsed again by each MISC access.
+        The value is returned as stored in the file, "_" if it is missing.
+        """
+        root = self._root
+        if root.extra_columns is None or name not in root.extra_columns:
+            return '_'
+        values = root._extra_values.get(self, ())
+        index = root.extra_columns.index(name)
+        return values[index] if index < len(values) else '_'
+
+    def set_column(self, name, value):
+        """Set the value of an extra (CoNLL-U Plus) column, see `get_column`."""
+        root = self._root
+        if root.extra_columns is None:
+            root.extra_columns, root._extra_values = (), {}
+        if name not in root.extra_columns:
+            root.extra_columns += (name,)
+        index = root.extra_columns.index(name)
+        values = list(root._extra_values.get(self, ()))
+        values.extend(['_'] * (index + 1 - len(values)))
+        values[index] = '_' if value is None or value == '' else value
+        root._extra_values[self] = tuple(values)
+
     @property
     def coref_mentions(self):
         self._root.bundle.document._load_coref()
@@ -1050,14 +1001,15 @@ class EmptyNode(Node):
 
     @ord.setter
     def ord(self, new_ord):
-        """Empty node's ord setter accepts float and str."""
-        if isinstance(new_ord, str):
-            self._ord = float(new_ord)
-        elif isinstance(new_ord, float):
+        """Empty node's ord setter accepts EmptyOrd, str (e.g. "3.1") and float."""
+        if isinstance(new_ord, EmptyOrd):
             self._ord = new_ord
+        elif isinstance(new_ord, (str, float)):
+            self._ord = EmptyOrd(new_ord)
         else:
-            raise ValueError('Only str and float are allowed for EmptyNode ord setter,'
+            raise ValueError('Only EmptyOrd, str and float are allowed for EmptyNode ord setter,'
                              f' but {type(new_ord)} was given.')
+        self._root._version += 1
 
     def shift(self, reference_node, after=0, move_subtree=0, reference_subtree=0):
         """Attempts at changing the word order of EmptyNode result in NotImplemented exception."""
@@ -1065,64 +1017,125 @@ class EmptyNode(Node):
 
     def remove(self):
         """Delete this empty node."""
-        to_reorder = [e for e in self._root.empty_nodes if e._ord > self._ord and e._ord < self.ord+1]
-        for empty in to_reorder:
-            empty._ord = round(empty._ord - 0.1, 1)
+        empty_nodes = self._root.empty_nodes
         try:
-            self._root.empty_nodes.remove(self)
+            index = empty_nodes.index(self)
         except ValueError:
             return # self may be an already deleted node e.g. if n.remove() called twice
-        for n in self._root.empty_nodes + self._root._descendants:
+        del empty_nodes[index]
+        # The following empty nodes with the same major ord are shifted, e.g. 3.3 becomes 3.2.
+        major, minor = self._ord.major, self._ord.minor
+        for empty in empty_nodes[index:]:
+            if empty._ord.major != major:
+                break
+            if empty._ord.minor > minor:
+                empty._ord = EmptyOrd(major, empty._ord.minor - 1)
+        self._root._version += 1
+        for n in empty_nodes + self._root._descendants:
             if n._deps:
-                n._deps = {(deprel, parent) for deprel, parent in n._deps if parent != self}
+                n._deps = [dep for dep in n._deps if dep['parent'] is not self]
+
+class EmptyOrd(object):
+    """Ord of an empty node, i.e. a pair of integers `major.minor`, e.g. 3.1 or 3.10.
+
+    Empty node 3.1 follows the (non-empty) node 3 in the word order (or it is the first node
+    if major is 0) and precedes the empty node 3.2 and the node 4.
+    EmptyOrd instances can be compared with other EmptyOrds, ints (ords of non-empty nodes)
+    and floats (for backward compatibility, e.g. `empty.ord == 3.1`), but no float arithmetic
+    is used internally, so there is no problem with e.g. 3.10 (which is not equal to 3.1).
+    `str(ord)` returns the CoNLL-U ID, `int(ord)` returns the major part.
+    EmptyOrd instances are immutable, when an empty node changes its position, a new one is created.
+    """
+    __slots__ = ('major', 'minor')
 
-@functools.total_ordering
-class OrdTuple:
-    """Class for the rare case of 9+ consecutive empty nodes, i.e. ords x.10, x.11 etc.
+    def __init__(self, major, minor=None):
+        """Create a new EmptyOrd either from two ints or from a string such as "3.1".
 
-    Ord 1.10 cannot be stored as float, which would result in 1.1.
-    We thus store it as a tuple (1,10) wrapped in OrdTuple, so that comparisons work,
-    e.g.: 1.9 < OrdTuple('1.10') < 2
-    """
-    __slots__ = ('_key')
-
-    def __init__(self, string):
-        m = re.match(r'(\d+)\.(\d+)$', string)
-        if not m:
-            raise ValueError(f"Ord {string} does not match \\d+.\\d+")
-        major, minor = int(m.group(1)), int(m.group(2))
-        if minor == 0:
-            raise ValueError(f"Ord {string} should be stored as int")
-        if minor < 10:
-            raise ValueError(f"Ord {string} should be stored as float")
-        self._key = (major, minor)
+        For backward compatibility, also floats (e.g. 3.1) are accepted.
+        """
+        if minor is None:
+            string = major if isinstance(major, str) else repr(major)
+            match = _EMPTY_ORD_RE.match(string)
+            if not match:
+                raise ValueError(f"Ord {string} does not match \\d+.\\d+")
+            major, minor = int(match.group(1)), int(match.group(2))
+        if minor <= 0:
+            raise ValueError(f"Ord {major}.{minor} of an empty node must have a positive decimal part")
+        self.major = major
+        self.minor = minor
 
     def __repr__(self):
-        return f"{self._key[0]}.{self._key[1]}"
+        return f"{self.major}.{self.minor}"
+
+    def __int__(self):
+        return self.major
+
+    def __float__(self):
+        return float(repr(self))
+
+    def __hash__(self):
+        # Must be consistent with __eq__, e.g. EmptyOrd(3, 1) == 3.1, but EmptyOrd(3, 10) != 3.1.
+        return hash(float(self)) if self.minor % 10 else hash((self.major, self.minor))
 
     def __eq__(self, other):
+        if isinstance(other, EmptyOrd):
+            return self.major == other.major and self.minor == other.minor
+        if isinstance(other, float):
+            return (self.major, self.minor) == _float_key(other)
         if isinstance(other, int):
             return False
-        elif isinstance(other, float):
-            return self._key == (int(other), int(10*other - 10*int(other)))
-        elif isinstance(other, OrdTuple):
-            return self._key == other._key
-        else:
-            raise ValueError(f"OrdTuple cannot be compared with {type(other)}")
+        return NotImplemented
 
+    # Comparisons with ints (the most common case) are simplified using the fact that minor > 0.
     def __lt__(self, other):
         if isinstance(other, int):
-            return self._key < (other, 0)
-        elif isinstance(other, float):
-            return self._key < (int(other), int(10*other - 10*int(other)))
-        elif isinstance(other, OrdTuple):
-            return self._key < other._key
+            return self.major < other
+        if isinstance(other, EmptyOrd):
+            return (self.major, self.minor) < (other.major, other.minor)
+        if isinstance(other, float):
+            return (self.major, self.minor) < _float_key(other)
+        return NotImplemented
+
+    def __le__(self, other):
+        result = self.__lt__(other)
+        return result if result is NotImplemented else result or self == other
+
+    def __gt__(self, other):
+        if isinstance(other, int):
+            return self.major >= other
+        if isinstance(other, EmptyOrd):
+            return (self.major, self.minor) > (other.major, other.minor)
+        if isinstance(other, float):
+            return (self.major, self.minor) > _float_key(other)
+        return NotImplemented
+
+    def __ge__(self, other):
+        result = self.__gt__(other)
+        return result if result is NotImplemented else result or self == other
+
+
+# OrdTuple was used for ords x.10 and higher before EmptyOrd was used for all empty nodes.
+OrdTuple = EmptyOrd
+
+_EMPTY_ORD_RE = re.compile(r'(\d+)\.(\d+)$')
+
+
+def _bisect_ord(nodes, ord_):
+    """Return the index of the first node with `_ord > ord_` in a list of nodes sorted by ord."""
+    low, high = 0, len(nodes)
+    while low < high:
+        mid = (low + high) // 2
+        if ord_ < nodes[mid]._ord:
+            high = mid
         else:
-            raise ValueError(f"OrdTuple cannot be compared with {type(other)}")
+            low = mid + 1
+    return low
+
 
-    def increase(self):
-        """Increment the decimal part of this ord."""
-        self._key = (self.key[0], self._key[1]+1)
+def _float_key(value):
+    """Return (major, minor) for a float ord, e.g. (3, 1) for 3.1 and (3, 0) for 3.0."""
+    major, _, minor = repr(value).partition('.')
+    return int(major), int(minor or 0)
 
 
 # Implementation note on ListOfNodes
@@ -1168,8 +1181,15 @@ class ListOfNodes(list):
     def __call__(self, add_self=False, following_only=False, preceding_only=False, add_mwt=False):
         """Returns a subset of nodes contained in this list as specified by the args."""
         if add_self:
-            self.append(self.origin)
-            self.sort()
+            # The list is sorted, so we can find the position of origin with bisection.
+            origin_ord, low, high = self.origin._ord, 0, len(self)
+            while low < high:
+                mid = (low + high) // 2
+                if self[mid]._ord < origin_ord:
+                    low = mid + 1
+                else:
+                    high = mid
+            self.insert(low, self.origin)
         result = self
         if preceding_only:
             result = [x for x in result if x._ord <= self.origin._ord]
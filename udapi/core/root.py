@@ -1,7 +1,8 @@
 """Root class represents the technical root node in each tree."""
+import bisect
 import logging
 
-from udapi.core.node import Node, EmptyNode, ListOfNodes
+from udapi.core.node import Node, EmptyNode, EmptyOrd, ListOfNodes, _ORD
 from udapi.core.mwt import MWT
 
 # 7 instance attributes is too low (CoNLL-U has 10 columns)
@@ -9,10 +10,23 @@ from udapi.core.mwt import MWT
 # pylint: disable=too-many-instance-attributes
 
 
+def _next_empty_ord(major, minor, last):
+    """Return EmptyOrd(major, minor) unless it would collide with (or precede) `last`.
+
+    `last` is the EmptyOrd of the previous empty node (or None).
+    Make sure that e.g. after moving node 2 to the end, ords "1 1.1 2 2.1 3"
+    become "1 1.1 1.2 2 3" (not "1 1.1 1.1 2 3").
+    """
+    if last is not None and (major, minor) <= (last.major, last.minor):
+        return EmptyOrd(last.major, last.minor + 1)
+    return EmptyOrd(major, minor)
+
+
 class Root(Node):
     """Class for representing root nodes (technical roots) in UD trees."""
     __slots__ = ['_sent_id', '_zone', '_bundle', '_descendants', '_mwts',
-                 'empty_nodes', 'text', 'comment', 'newpar', 'newdoc', 'json']
+                 'empty_nodes', 'text', 'comment', 'newpar', 'newdoc', 'json',
+                 '_version', '_cache', '_cache_version', 'extra_columns', '_extra_values']
 
     # pylint: disable=too-many-arguments
     def __init__(self, zone=None, comment='', text=None, newpar=None, newdoc=None):
@@ -20,6 +34,11 @@ class Root(Node):
         # Call constructor of the parent object.
         super().__init__(root=self)
 
+        # The structure version is increased by every change of the tree topology or word order
+        # (including empty nodes and multi-word tokens), see `structure_version`.
+        self._version = 0
+        self._cache = None
+        self._cache_version = -1
         self.ord = 0
         self.form = '<ROOT>'
         self.lemma = '<ROOT>'
@@ -39,6 +58,11 @@ class Root(Node):
         self._mwts = []
         self.empty_nodes = []  # TODO: private
 
+        # Names of extra (non-CoNLL-U) columns, e.g. ('PARSEME:MWE',) loaded by read.Conllup,
+        # and a side table mapping nodes to tuples of their values, see `Node.get_column`.
+        self.extra_columns = None
+        self._extra_values = None
+
     @property
     def sent_id(self):
         """ID of this tree, stored in the sent_id comment in CoNLL-U."""
@@ -125,6 +149,25 @@ class Root(Node):
         """
         return ListOfNodes(self._descendants, origin=self)
 
+    @property
+    def structure_version(self):
+        """Return a number which changes whenever the topology or word order of this tree changes.
+
+        This includes changes of (empty) nodes, their ords and parents and multi-word tokens,
+        but not changes of node attributes (form, lemma, deprel,...).
+        It can be used for caching results computed from the tree structure, e.g.
+        `node.descendants` is cached this way.
+        Code which modifies the private attributes (e.g. `node._children`) directly
+        must increase `root._version` (this is not needed when building a new tree).
+        """
+        return self._version
+
+    def _get_cache(self):
+        """Return a dict for caching results valid until the tree structure changes."""
+        if self._cache is None or self._cache_version != self._version:
+            self._cache, self._cache_version = {}, self._version
+        return self._cache
+
     def is_descendant_of(self, node):
         """Is the current node a descendant of the node given as argument?
 
@@ -149,6 +192,211 @@ class Root(Node):
                             ' but it has (unexpected) children', self, children)
         self.bundle.trees = [root for root in self.bundle.trees if root != self]
 
+    # pylint: disable=too-many-branches,too-many-locals,protected-access
+    def remove_nodes(self, nodes, children=None):
+        """Delete the given nodes (and all their descendants unless specified otherwise) from this tree.
+
+        This is equivalent to calling `node.remove(children)` for each of the nodes,
+        but all the work is done in one pass over the tree (instead of one pass per node),
+        so it is much faster when removing many nodes.
+        All ords are renumbered, ords of empty nodes are updated (keeping their fractional part),
+        the removed nodes are deleted from their multi-word tokens (MWTs with less than
+        two remaining words are removed) and from their coreference mentions
+        (mentions with no remaining words are removed and so are entities with no mentions).
+        Nodes which are not (anymore) in this tree are ignored.
+
+        Args:
+        nodes: an iterable of (non-empty) nodes of this tree to be removed
+        children: a string specifying what to do if a removed node has any (non-removed) children.
+            The default (None) is to delete them (and all their descendants).
+            `rehang` means to re-attach those children to the nearest non-removed ancestor.
+            `warn` means to issue a warning if any children are present and delete them.
+            `rehang_warn` means to rehang and warn:-).
+        """
+        descendants = self._descendants
+        removed = {node for node in nodes if node._root is self and 0 < node._ord <= len(descendants)
+                   and descendants[node._ord - 1] is node}
+        if not removed:
+            return
+        self._version += 1
+        rehang = children is not None and children.startswith('rehang')
+        if children is not None and children.endswith('warn'):
+            for node in sorted(removed):
+                if any(child not in removed for child in node._children):
+                    logging.warning('%s is being removed by remove(children=%s), '
+                                    ' but it has (unexpected) children', node, children)
+
+        # Detach the removed subtrees from their (non-removed) parents.
+        # With `rehang`, attach the non-removed children to the nearest non-removed ancestor.
+        changed_parents, rehung_parents = set(), set()
+        for node in removed:
+            parent = node._parent
+            if parent in removed:
+                continue
+            changed_parents.add(parent)
+            if rehang and node._children:
+                rehung_parents.add(parent)
+                stack = [node]
+                while stack:
+                    current = stack.pop()
+                    removed_children = []
+                    for child in current._children:
+                        if child in removed:
+                            removed_children.append(child)
+                        else:
+                            child._parent = parent
+                            parent._children.append(child)
+                    current._children = removed_children
+                    stack.extend(removed_children)
+        for parent in changed_parents:
+            parent._children = [child for child in parent._children if child not in removed]
+            if parent in rehung_parents:
+                parent._children.sort()
+        if not rehang:
+            stack = [child for node in removed for child in node._children if child not in removed]
+            while stack:
+                node = stack.pop()
+                removed.add(node)
+                stack.extend(node._children)
+
+        # Renumber the remaining nodes. Only the nodes following the first removed one need that.
+        first = min(node._ord for node in removed) if len(removed) > 1 else next(iter(removed))._ord
+        tail = descendants[first - 1:]
+        new_ords = None
+        if self.empty_nodes:
+            # new_ords[old_ord] = new ord of the last remaining node with ord <= old_ord
+            new_ords = list(range(first))
+            new_ord = first - 1
+            for node in tail:
+                if node not in removed:
+                    new_ord += 1
+                new_ords.append(new_ord)
+        kept = tail[1:] if len(removed) == 1 else [node for node in tail if node not in removed]
+        for new_ord, node in enumerate(kept, first):
+            node._ord = new_ord
+        del descendants[first - 1:]
+        descendants += kept
+
+        # Decrease ord of empty nodes (keep their fractional part)
+        # Make sure that e.g. after deleting node with ord=2
+        # ords "1 1.1 1.2 2 2.1" will become "1 1.1 1.2 1.3".
+        if new_ords is not None:
+            last_ord = None
+            for empty in self.empty_nodes:
+                major = empty._ord.major
+                if major >= first:
+                    empty._ord = _next_empty_ord(new_ords[major], empty._ord.minor, last_ord)
+                last_ord = empty._ord
+
+        # Remove the nodes from multi-word tokens and coreference mentions.
+        changed_mwts, changed_mentions = set(), set()
+        for node in removed:
+            if node._mwt is not None:
+                changed_mwts.add(node._mwt)
+                node._mwt = None
+            if node._mentions:
+                changed_mentions.update(node._mentions)
+                node._mentions = []
+        removed_mwts = set()
+        for mwt in changed_mwts:
+            mwt.words = [word for word in mwt.words if word not in removed]
+            if len(mwt.words) < 2:
+                for word in mwt.words:
+                    word._mwt = None
+                removed_mwts.add(mwt)
+        if removed_mwts:
+            self._mwts = [mwt for mwt in self._mwts if mwt not in removed_mwts]
+        for mention in changed_mentions:
+            mention._words = [word for word in mention._words if word not in removed]
+            if not mention._words:
+                mention.remove()
+                entity = mention._entity
+                if entity is not None and not entity._mentions and self._bundle is not None:
+                    eid_to_entity = self._bundle._document._eid_to_entity
+                    if eid_to_entity and eid_to_entity.get(entity._eid) is entity:
+                        del eid_to_entity[entity._eid]
+            elif mention._head in removed:
+                words = mention._words
+                mention._head = next((w for w in words if w._parent not in words), words[0])
+    # pylint: enable=too-many-branches,too-many-locals,protected-access
+
+    def reorder(self, nodes):
+        """Change the word order of the whole tree at once.
+
+        This is much faster than calling `node.shift_*()` methods for many nodes,
+        which need a pass over (a part of) the tree for each call.
+        All ords are updated, lists of children are sorted by the new order
+        and each empty node is kept right after the same (overt) node as before
+        (empty nodes with ords 0.x stay at the beginning of the sentence).
+
+        Args:
+        nodes: a list of all nodes of this tree (i.e. `root.descendants`) in the new order.
+
+        Raises ValueError if `nodes` is not a permutation of `root.descendants`
+        or if words of a multi-word token would not be adjacent in the new order
+        (in which case the tree is left unchanged).
+        """
+        nodes = list(nodes)
+        descendants = self._descendants
+        if len(nodes) != len(descendants) or len({id(node) for node in nodes}) != len(nodes) \
+                or any(node._root is not self or descendants[node._ord - 1] is not node for node in nodes):
+            raise ValueError(f'The new order of nodes is not a permutation of {self.address()} nodes')
+        old_to_new = [0] * (len(nodes) + 1)
+        for new_ord, node in enumerate(nodes, 1):
+            old_to_new[node._ord] = new_ord
+        for mwt in self._mwts:
+            new_ords = sorted(old_to_new[word._ord] for word in mwt.words)
+            if new_ords[-1] - new_ords[0] + 1 != len(new_ords):
+                raise ValueError(f'Words of multi-word token {mwt.form} would not be adjacent in {self.address()}')
+
+        for empty in self.empty_nodes:
+            empty._ord = EmptyOrd(old_to_new[empty._ord.major], empty._ord.minor)
+        self.empty_nodes.sort(key=_ORD)
+        self._reorder(0, nodes)
+        for mwt in self._mwts:
+            mwt.words.sort()
+
+    def _reorder(self, start, nodes, parents=None):
+        """Replace `root._descendants[start:start+len(nodes)]` with `nodes` (a permutation of it).
+
+        This is the common part of `reorder()` and `node.shift_*()`, empty nodes are not updated.
+        `parents` are the nodes whose children may need re-sorting (if known by the caller).
+        """
+        if parents is None:
+            parents = set()
+            for new_ord, node in enumerate(nodes, start + 1):
+                if node._ord != new_ord:
+                    node._ord = new_ord
+                    parents.add(node._parent)
+        else:
+            for new_ord, node in enumerate(nodes, start + 1):
+                node._ord = new_ord
+        self._descendants[start:start + len(nodes)] = nodes
+        self._version += 1
+        for parent in parents:
+            parent._children.sort(key=_ORD)
+
+    def _shift_empty_nodes(self, lo, hi, moving_ords, after_ord):
+        """Update ords of empty nodes after `node.shift_*()`.
+
+        The nodes with (old) `moving_ords` were moved before the node with (old) `after_ord`,
+        only nodes with ords lo+1..hi changed their position.
+        Empty nodes keep their position relative to the non-moved nodes and the moved nodes
+        are placed after the empty nodes preceding the `after_ord` node.
+        """
+        last_ord = None
+        for empty in self.empty_nodes:
+            major = empty._ord.major
+            if major >= hi + 1:
+                break
+            if major >= lo + 1:
+                # the non-moved nodes preceding the empty node (plus the moved nodes if inserted before it)
+                new_major = major - bisect.bisect_right(moving_ords, major)
+                if major >= after_ord:
+                    new_major += len(moving_ords)
+                empty._ord = _next_empty_ord(new_major, empty._ord.minor, last_ord)
+            last_ord = empty._ord
+
     def shift(self, reference_node, after=0, move_subtree=0, reference_subtree=0):
         """Attempts at changing the word order of root result in Exception."""
         raise Exception('Technical root cannot be shifted as it is always the first node')
@@ -164,6 +412,7 @@ class Root(Node):
         """
         new_node = EmptyNode(root=self, **kwargs)
         self.empty_nodes.append(new_node)
+        self._version += 1
         return new_node
 
     # TODO document whether misc is a string or dict or it can be both
@@ -185,6 +434,7 @@ class Root(Node):
         # Now, create the new MWT.
         mwt = MWT(words, form, feats, misc, root=self)
         self._mwts.append(mwt)
+        self._version += 1
         if words[-1].misc["SpaceAfter"] == "No":
             mwt.misc["SpaceAfter"] = "No"
         for word in words:
@@ -201,6 +451,7 @@ class Root(Node):
     def multiword_tokens(self, mwts):
         """Set the list of all multi-word tokens in this tree."""
         self._mwts = mwts
+        self._version += 1
 
     def get_sentence(self, if_missing='detokenize'):
         """Return either the stored `root.text` or (if None) `root.compute_text()`.
@@ -248,21 +499,104 @@ class Root(Node):
 
         `[n.form for n in root.token_descendants]` will return `['vámonos', 'al', 'mar']`.
         """
-        result = []
-        last_mwt_id = 0
-        for node in self._descendants:
-            mwt = node.multiword_token
-            if mwt:
-                if node.ord > last_mwt_id:
-                    last_mwt_id = mwt.words[-1].ord
-                    result.append(mwt)
-            else:
-                result.append(node)
+        return list(self._tokens())
+
+    def _tokens(self):
+        """Return a sequence of all tokens (cached until the tree structure changes)."""
+        if not self._mwts:
+            return self._descendants
+        cache = self._get_cache()
+        result = cache.get('token_descendants')
+        if result is None:
+            result = []
+            last_mwt_id = 0
+            for node in self._descendants:
+                mwt = node._mwt
+                if mwt:
+                    if node._ord > last_mwt_id:
+                        last_mwt_id = mwt.words[-1]._ord
+                        result.append(mwt)
+                else:
+                    result.append(node)
+            result = cache['token_descendants'] = tuple(result)
         return result
 
+    def compute_text(self, use_mwt=True):
+        """Return a string representing the sentence (detokenized).
+
+        See `Node.compute_text` for details. This root-specific implementation is faster
+        because it uses the list of tokens cached until the tree structure changes.
+        The forms and SpaceAfter=No are always read from the nodes (and MWTs),
+        so changes of these attributes are reflected without any explicit invalidation.
+        """
+        # pylint: disable=protected-access
+        strings = []
+        for token in self._tokens() if use_mwt else self._descendants:
+            strings.append(token.form)
+            if token._misc is None or token._misc['SpaceAfter'] != 'No':
+                strings.append(' ')
+        return ''.join(strings).rstrip()
+
+    def char_spans(self, use_mwt=True):
+        """Return the computed text and a dict mapping tokens to their character spans.
+
+        The text is the same as `compute_text(use_mwt)` returns.
+        The dict maps each token (i.e. a node or a multi-word token, see `token_descendants`)
+        to a tuple (start, end), so that `text[start:end] == token.form`.
+        With use_mwt=True, also the words of multi-word tokens are mapped to the span of their MWT.
+        This index can be used e.g. for aligning the nodes with `root.text`::
+
+            text, spans = root.char_spans()
+            start, end = spans[node]
+        """
+        # pylint: disable=protected-access
+        strings, spans, offset = [], {}, 0
+        for token in self._tokens() if use_mwt else self._descendants:
+            form = token.form
+            spans[token] = (offset, offset + len(form))
+            strings.append(form)
+            offset += len(form)
+            if token._misc is None or token._misc['SpaceAfter'] != 'No':
+                strings.append(' ')
+                offset += 1
+        if use_mwt:
+            for mwt in self._mwts:
+                span = spans.get(mwt)
+                if span is not None:
+                    for word in mwt.words:
+                        spans[word] = span
+        return ''.join(strings).rstrip(), spans
+
     @property
     def descendants_and_empty(self):
-        return sorted(self._descendants + self.empty_nodes)
+        """Return a list of all nodes (including empty nodes, excluding the root) sorted by ord."""
+        if not self.empty_nodes:
+            return list(self._descendants)
+        cache = self._get_cache()
+        # empty_nodes is a public attribute, so let's check also its identity and length.
+        key = ('descendants_and_empty', id(self.empty_nodes), len(self.empty_nodes))
+        result = cache.get(key)
+        if result is None:
+            # Merge the empty nodes into the (sorted) list of nodes, each after its major ord.
+            result, done, descendants = [], 0, self._descendants
+            for empty in sorted(self.empty_nodes, key=_ORD):
+                major = empty._ord.major
+                if major > done:
+                    result += descendants[done:major]
+                    done = major
+                result.append(empty)
+            result += descendants[done:]
+            result = cache[key] = tuple(result)
+        return list(result)
+
+    def _empty_nodes_by_ord(self):
+        """Return a dict mapping CoNLL-U IDs of empty nodes (e.g. "3.1") to the empty nodes."""
+        cache = self._get_cache()
+        key = ('empty_nodes_by_ord', id(self.empty_nodes), len(self.empty_nodes))
+        result = cache.get(key)
+        if result is None:
+            result = cache[key] = {str(empty._ord): empty for empty in self.empty_nodes}
+        return result
 
     def steal_nodes(self, nodes):
         """Move nodes from another tree to this tree (append)."""
@@ -300,6 +634,8 @@ class Root(Node):
                     mwt.remove()
                     self.create_multiword_token(words=words, form=mwt.form, misc=mwt.misc)
         self._descendants += nodes
+        self._version += 1
+        old_root._version += 1
         # pylint: enable=protected-access
 
     def flatten(self, deprel='root'):
@@ -315,25 +651,16 @@ class Root(Node):
         for node in self._children:
             node._parent = self
             node._children.clear()
+        self._version += 1
 
     @property
     def prev_tree(self):
         """Return the previous tree (root) in the document (from the same zone)."""
-        doc = self._bundle._document
-        num = self._bundle.number
-        if len(doc.bundles) <= num - 1 or doc.bundles[num - 1] is not self._bundle:
-            num = doc.bundles.index(self._bundle) + 1
-        if num == 1:
-            return None
-        return doc.bundles[num - 2].get_tree(zone=self._zone)
+        bundle = self._bundle._document._adjacent_bundle(self._bundle, -1)
+        return None if bundle is None else bundle.get_tree(zone=self._zone)
 
     @property
     def next_tree(self):
         """Return the next tree (root) in the document (from the same zone)."""
-        doc = self._bundle._document
-        num = self._bundle.number
-        if len(doc.bundles) <= num - 1 or doc.bundles[num - 1] is not self._bundle:
-            num = doc.bundles.index(self._bundle) + 1
-        if len(doc.bundles) <= num:
-            return None
-        return doc.bundles[num].get_tree(zone=self._zone)
+        bundle = self._bundle._document._adjacent_bundle(self._bundle, 1)
+        return None if bundle is None else bundle.get_tree(zone=self._zone)
@@ -0,0 +1,117 @@
+"""RuleBlock is a base class for blocks applying memoized per-node rules."""
+import operator
+
+from udapi.core.block import Block
+
+
+def _getter(spec):
+    """Return a function returning the (hashable) value of the attribute `spec` of a node."""
+    if spec.endswith(']'):
+        path, name = spec[:-1].split('[', 1)
+        get_dict = operator.attrgetter(path)
+        return lambda node: get_dict(node)[name]
+    get_value = operator.attrgetter(spec)
+    if spec.split('.')[-1] in ('feats', 'misc'):
+        return lambda node: str(get_value(node))
+    return get_value
+
+
+class RuleBlock(Block):
+    """A block whose decision for each node depends only on a few node attributes.
+
+    Derived blocks must list these attributes in the class attribute `depends_on`
+    and implement `decide(node)` and `apply(node, decision)` instead of `process_node`.
+    The decision is computed only once for each combination of the attribute values
+    (i.e. a signature) and then just applied to the other nodes with the same signature.
+
+    The items of `depends_on` are node attribute names, possibly dotted,
+    e.g. `upos`, `udeprel` or `parent.upos`.
+    `feats` and `misc` mean their whole string representation,
+    `feats[Case]` means just the value of one feature (and similarly for `misc[...]`).
+    Note that `decide` must not use any other attributes, otherwise the cached
+    decisions would be applied to nodes they were not meant for.
+
+    Example::
+
+        class FixPunctDeprel(RuleBlock):
+            depends_on = ('upos', 'udeprel')
+
+            def decide(self, node):
+                return 'punct' if node.upos == 'PUNCT' and node.udeprel != 'punct' else None
+
+            def apply(self, node, decision):
+                node.deprel = decision
+    """
+
+    # Node attributes the decision depends on, e.g. ('upos', 'feats', 'parent.upos').
+    depends_on = ()
+
+    # Maximum number of cached decisions (the cache is cleared when it gets bigger).
+    memo_size = 100_000
+
+    def __init__(self, memoize=True, **kwargs):
+        """Create the RuleBlock.
+
+        Args:
+        memoize: reuse the decision for nodes with the same values of `depends_on` attributes
+            (default=True). With memoize=0, `decide` is called for each node.
+        """
+        super().__init__(**kwargs)
+        self.memoize = memoize
+        self._decisions = {}
+        specs = self.depends_on
+        if specs and all('[' not in spec and spec.split('.')[-1] not in ('feats', 'misc') for spec in specs):
+            # attrgetter with more attributes returns a tuple of their values (and it is fast).
+            self.signature = operator.attrgetter(*specs)
+        elif len(specs) == 1:
+            self.signature = _getter(specs[0])
+        else:
+            getters = [_getter(spec) for spec in specs]
+            self.signature = lambda node: tuple([getter(node) for getter in getters])
+
+    def decide(self, node):
+        """Return the decision for the node or None if nothing should be done.
+
+        The decision must depend only on the attributes listed in `depends_on`.
+        """
+        raise NotImplementedError('Block %s does not implement decide()' % self.block_name())
+
+    def apply(self, node, decision):
+        """Apply the (not None) decision returned by `decide` to the node."""
+        raise NotImplementedError('Block %s does not implement apply()' % self.block_name())
+
+    @staticmethod
+    def is_tree_local():
+        """The decisions depend only on attributes of the node (and its parent)."""
+        return True
+
+    def process_tree(self, tree):
+        if not self.memoize or type(self).process_node is not RuleBlock.process_node:
+            super().process_tree(tree)
+            return
+        # The same as calling process_node for each node, just without the method calls.
+        decisions, signature = self._decisions, self.signature
+        for node in tree.descendants:
+            key = signature(node)
+            try:
+                decision = decisions[key]
+            except KeyError:
+                if len(decisions) >= self.memo_size:
+                    decisions.clear()
+                decision = decisions[key] = self.decide(node)
+            if decision is not None:
+                self.apply(node, decision)
+
+    def process_node(self, node):
+        if not self.memoize:
+            decision = self.decide(node)
+        else:
+            key = self.signature(node)
+            try:
+                decision = self._decisions[key]
+            except KeyError:
+                if len(self._decisions) >= self.memo_size:
+                    self._decisions.clear()
+                decision = self._decisions[key] = self.decide(node)
+        if decision is not None:
+            self.apply(node, decision)
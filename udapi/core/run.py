@@ -1,8 +1,10 @@
 """Class Run parses a scenario and executes it."""
+import gc
+import importlib
+import json
 import logging
-
-from udapi.core.document import Document
-from udapi.block.read.conllu import Conllu
+import os
+import sys
 
 
 def _parse_block_name(block_name):
@@ -91,6 +93,54 @@ def _blocks_in_a_package(package_name):
     except:
             return []
 
+# Cache of already imported block classes: block name (as used in scenarios) -> class.
+# Resolving a block name (e.g. `ud.FixPunct`) to a class requires importing its module,
+# which is cheap after the first time, but the lookup via importlib is not free either.
+_BLOCK_REGISTRY = {}
+
+
+def _block_module_name(block_name):
+    """Return a tuple (module name, class name) for the given block name.
+
+    Private modules are recognized by a dot at the beginning,
+    e.g. `.my.Block` is searched in module `my.block`.
+    Otherwise, the module is searched in `udapi.block`,
+    e.g. `ud.FixPunct` is searched in module `udapi.block.ud.fixpunct`.
+    """
+    sub_path, class_name = _parse_block_name(block_name)
+    if block_name.startswith('.'):
+        return block_name.lower()[1:], class_name
+    return "udapi.block." + sub_path + "." + class_name.lower(), class_name
+
+
+def find_block_class(block_name):
+    """Return the class implementing the given block (e.g. `read.Conllu`), importing it if needed."""
+    block_class = _BLOCK_REGISTRY.get(block_name)
+    if block_class is not None:
+        return block_class
+
+    module, class_name = _block_module_name(block_name)
+    logging.debug("Importing %s from %s", class_name, module)
+    try:
+        block_class = getattr(importlib.import_module(module), class_name, None)
+        if block_class is None:
+            raise ImportError(f"cannot import name '{class_name}' from '{module}'")
+    except ModuleNotFoundError as err:
+        package_name = ".".join(module.split(".")[:-1])
+        package_blocks = _blocks_in_a_package(package_name)
+        if not package_blocks:
+            raise
+        raise ModuleNotFoundError(
+            f"Cannot find block {block_name} (i.e. class {module}.{class_name})\n"
+            f"Available block in {package_name} are:\n"
+            + "\n".join(package_blocks)) from err
+    except Exception:
+        logging.warning(f"Cannot import block {block_name} (i.e. class {module}.{class_name})")
+        raise
+    _BLOCK_REGISTRY[block_name] = block_class
+    return block_class
+
+
 def _import_blocks(block_names, block_args):
     """
     Parse block names, import particular packages and call the constructor for each object.
@@ -101,46 +151,48 @@ def _import_blocks(block_names, block_args):
     :rtype: list
     """
     blocks = []
-    namespace = {}  # Create a namespace dictionary to store imported classes
-
-    for (block_id, block_name) in enumerate(block_names):
-        # Importing module dynamically.
-        sub_path, class_name = _parse_block_name(block_name)
-
-        if block_name.startswith('.'):
-            # Private modules are recognized by a dot at the beginning
-            module = block_name.lower()[1:]
-        else:
-            module = "udapi.block." + sub_path + "." + class_name.lower()
-        try:
-            command = "from " + module + " import " + class_name + " as b" + str(block_id)
-            logging.debug("Trying to run command: %s", command)
-            exec(command, namespace)  # Pass namespace as globals
-        except ModuleNotFoundError as err:
-            package_name = ".".join(module.split(".")[:-1])
-            package_blocks = _blocks_in_a_package(package_name)
-            if not package_blocks:
-                raise
-            raise ModuleNotFoundError(
-                f"Cannot find block {block_name} (i.e. class {module}.{class_name})\n"
-                f"Available block in {package_name} are:\n"
-                + "\n".join(package_blocks)) from err
-        except Exception as ex:
-            logging.warning(f"Cannot import block {block_name} (i.e. class {module}.{class_name})")
-            raise
-
-        # Run the imported module.
-        kwargs = block_args[block_id]
-        namespace['kwargs'] = kwargs  # Add kwargs to the namespace
-        command = "b%s(**kwargs)" % block_id
-        logging.debug("Trying to evaluate this: %s", command)
-        new_block_instance = eval(command, namespace)  # Pass namespace as globals
+    for block_name, kwargs in zip(block_names, block_args):
+        block_class = find_block_class(block_name)
+        new_block_instance = block_class(**kwargs)
         args = ' '.join(f"{k}={v}" for k,v in kwargs.items())
         blocks.append((block_name, new_block_instance, args))
 
     return blocks
 
 
+class MemoryReport(object):
+    """Memory statistics printed to STDERR by `udapy --memory_report` after each round."""
+
+    def __init__(self, max_trees=200):
+        # Imported here, so that udapi.core.coref etc. are not imported without --memory_report.
+        from udapi.core import memory
+        self.memory = memory
+        self.max_trees = max_trees
+        self.rounds = 0
+        self.stats = None
+
+    def add_round(self, document):
+        """Measure the document (after all blocks were applied) and print RSS of this process."""
+        self.rounds += 1
+        stats = self.memory.document_memory(document, self.max_trees)
+        if self.stats is None:
+            self.stats = stats
+        else:
+            for key in self.stats:
+                self.stats[key] += stats[key]
+        total = sum(stats[c] for c in self.memory.COMPONENTS)
+        print(f"round {self.rounds}: {stats['trees']} trees, {stats['nodes']} nodes, "
+              f"{total / (stats['nodes'] or 1):.0f} bytes/node, "
+              f"RSS {self.memory.format_mib(self.memory.current_rss())}, "
+              f"peak RSS {self.memory.format_mib(self.memory.peak_rss())}", file=sys.stderr)
+
+    def print_summary(self):
+        """Print the memory footprint per component summed over all rounds."""
+        if self.stats is not None:
+            print(self.memory.format_report(self.stats), file=sys.stderr)
+        print(f"peak RSS: {self.memory.format_mib(self.memory.peak_rss())}", file=sys.stderr)
+
+
 class Run(object):
     """Processing unit that processes UD data; typically a sequence of blocks."""
 
@@ -155,21 +207,68 @@ class Run(object):
             raise TypeError(
                 'Expected scenario as list, obtained a %r', args.scenario)
 
-        if len(args.scenario) < 1:
+        if getattr(args, 'merge_states', None):
+            if args.scenario:
+                raise ValueError('With merge_states, the scenario is loaded from the state files, '
+                                 'so no other scenario should be specified: %r' % args.scenario)
+        elif len(args.scenario) < 1:
             raise ValueError('Empty scenario')
 
     def execute(self):
         """Parse given scenario and execute it."""
+        if getattr(self.args, 'merge_states', None):
+            return self.merge_states(self.args.merge_states)
 
         # Parse the given scenario from the command line.
         block_names, block_args = _parse_command_line_arguments(self.args.scenario)
 
+        # Reuse the output from the result cache if possible.
+        cache, cache_key, capture = self._result_cache(), None, None
+        if cache is not None:
+            from udapi.core.cache import OutputCapture
+            block_classes = [find_block_class(name) for name in block_names]
+            cache_key = cache.scenario_key(block_names, block_args, block_classes)
+            if cache_key is not None:
+                if cache.replay(cache_key):
+                    return []
+                # Writers remember sys.stdout when they are constructed, so we must redirect it now.
+                capture = OutputCapture()
+                capture.start()
+
         # Import blocks (classes) and construct block instances.
-        blocks = _import_blocks(block_names, block_args)
+        try:
+            blocks = _import_blocks(block_names, block_args)
+            blocks = self.run_blocks(blocks)
+        finally:
+            if capture is not None:
+                capture.stop()
+        if capture is not None:
+            cache.store(cache_key, capture.stdout.getvalue(), capture.stderr.getvalue())
+        return blocks
 
-        return self.run_blocks(blocks)
+    def _result_cache(self):
+        """Return a ResultCache instance if the cache is enabled, otherwise None.
+
+        The cache is enabled if `args.cache_dir` (or the environment variable UDAPI_CACHE_DIR)
+        is set, unless `args.no_cache` is True or `args.save_state` is used.
+        """
+        if getattr(self.args, 'no_cache', False) or getattr(self.args, 'save_state', None):
+            return None
+        cache_dir = getattr(self.args, 'cache_dir', None) or os.environ.get('UDAPI_CACHE_DIR')
+        if not cache_dir:
+            return None
+        from udapi.core.cache import ResultCache, DEFAULT_MAX_SIZE_MB
+        return ResultCache(cache_dir, getattr(self.args, 'cache_size', None) or DEFAULT_MAX_SIZE_MB)
 
     def run_blocks(self, blocks):
+        # Imported here (not at the beginning of this module), so that `udapy --help` is fast.
+        from udapi.core.document import Document
+        save_state = getattr(self.args, 'save_state', None)
+        release_docs = getattr(self.args, 'release_docs', False)
+        gc_mode = getattr(self.args, 'gc_mode', None)
+        memory_report = MemoryReport() if getattr(self.args, 'memory_report', False) else None
+        scenario_blocks = blocks
+
         # Initialize blocks (process_start).
         for _, block, _ in blocks:
             block.process_start()
@@ -183,31 +282,181 @@ class Run(object):
                 pass
         if not readers:
             logging.info('No reader specified, using read.Conllu')
-            conllu_reader = Conllu()
+            conllu_reader = find_block_class('read.Conllu')()
             readers = [conllu_reader]
             blocks = [('read.Conllu', conllu_reader, {})] + blocks
 
+        streamed = None
+        if getattr(self.args, 'stream', False):
+            streamed = self._streamed_blocks(blocks, readers)
+
         # Apply blocks on the data.
         finished = False
         while not finished:
             document = Document()
             logging.info(" ---- ROUND ----")
-            for bname, block, args in blocks:
-                logging.info(f"Executing block {bname} {args}")
-                block.apply_on_document(document)
+            if streamed is not None:
+                self._stream_document(document, readers[0], *streamed)
+            else:
+                for bname, block, args in blocks:
+                    logging.info(f"Executing block {bname} {args}")
+                    block.apply_on_document(document)
 
             finished = True
 
             for reader in readers:
                 finished = finished and reader.finished
 
+            if memory_report is not None:
+                memory_report.add_round(document)
+
+            # Free the memory occupied by the document before loading the next one.
+            # Documents contain many reference cycles, so without release() only the garbage
+            # collector could free them (and it is disabled in udapy by default).
+            if release_docs:
+                document.release()
+            if gc_mode == 'tuned':
+                document = None
+                gc.collect()
+
         # 6. close blocks (process_end)
+        # With save_state, the mergeable blocks do not print their results, they are saved instead.
+        if save_state:
+            self.save_states(scenario_blocks, save_state)
         for _, block, _ in blocks:
-            block.process_end()
+            if not save_state or not block.is_mergeable():
+                block.process_end()
+        if memory_report is not None:
+            memory_report.print_summary()
 
         # Some users may use the block instances (e.g. to retrieve some variables).
         return blocks
 
+    @staticmethod
+    def _streamed_blocks(blocks, readers):
+        """Return a pair of lists (streamed blocks, buffered blocks) or None if streaming is not possible.
+
+        Streaming is possible only if there is just one reader at the beginning of the scenario.
+        The tree-local blocks (see `Block.is_tree_local`) following the reader are streamed.
+        The remaining blocks (starting with the first block which is not tree-local)
+        are buffered, i.e. applied on the whole document once it is read.
+        """
+        reader = readers[0]
+        if len(readers) > 1 or blocks[0][1] is not reader or not hasattr(reader, 'bundle_callback'):
+            logging.info('Cannot stream: the scenario must start with one reader (based on BaseReader).')
+            return None
+        local = 1
+        while local < len(blocks) and blocks[local][1].is_tree_local():
+            local += 1
+        if local == 1 and len(blocks) > 1:
+            logging.info('Cannot stream: block %s is not tree-local.', blocks[1][0])
+            return None
+        if local < len(blocks):
+            logging.info('Streaming blocks %s. Block %s is not tree-local, so the bundles are kept '
+                         'for it and the following blocks.',
+                         ', '.join(name for name, _, _ in blocks[1:local]), blocks[local][0])
+        else:
+            logging.info('Streaming: each bundle is processed by all blocks as soon as it is read.')
+        return [block for _, block, _ in blocks[1:local]], blocks[local:]
+
+    @staticmethod
+    def _stream_document(document, reader, blocks, buffered=()):
+        """Read one document, but process each bundle by `blocks` as soon as it is read.
+
+        If there are no `buffered` blocks, each bundle is freed after it is processed.
+        Otherwise, the `buffered` blocks are applied on the whole document afterwards.
+        """
+        started = False
+        processed = set()
+
+        def process_bundle(bundle):
+            nonlocal started
+            if not started:
+                started = True
+                for block in blocks:
+                    block.before_process_document(document)
+            for block in blocks:
+                block.apply_on_bundle(bundle)
+            if buffered:
+                processed.add(id(bundle))
+                return
+            try:
+                bundle.remove()
+            except ValueError:
+                pass  # the bundle has been already removed by some block
+            bundle.release()
+
+        reader.bundle_callback = process_bundle
+        try:
+            reader.apply_on_document(document)
+        finally:
+            reader.bundle_callback = None
+        # The last bundle of the document is not complete until the reader returns.
+        for bundle in document.bundles:
+            if id(bundle) not in processed:
+                process_bundle(bundle)
+        if not started:
+            for block in blocks:
+                block.before_process_document(document)
+        for block in blocks:
+            block.after_process_document(document)
+        for bname, block, args in buffered:
+            logging.info(f"Executing block {bname} {args}")
+            block.apply_on_document(document)
+
+    def save_states(self, blocks, filename):
+        """Save the partial results of all mergeable blocks into a JSON file.
+
+        Mergeable blocks are those implementing `export_state` and `merge_state`, e.g. `util.Wc`.
+        Together with each state, the block name and its parameters are saved,
+        so the partial results from several runs (e.g. on different shards of a corpus)
+        can be merged with `merge_states`.
+        """
+        block_names, block_args = _parse_command_line_arguments(self.args.scenario)
+        if block_names != [name for name, _, _ in blocks]:
+            raise ValueError('save_state is supported only for blocks created from args.scenario')
+        states = []
+        for name, kwargs, (_, block, _) in zip(block_names, block_args, blocks):
+            if block.is_mergeable():
+                states.append({'block': name, 'args': kwargs, 'state': block.export_state()})
+        if not states:
+            logging.warning('No block in the scenario supports export_state, saving an empty state.')
+        logging.info('Saving the state of %d block(s) to %s', len(states), filename)
+        with open(filename, 'w', encoding='utf-8') as state_file:
+            json.dump({'udapi_state': 1, 'blocks': states}, state_file, ensure_ascii=False)
+
+    def merge_states(self, filenames):
+        """Merge partial results saved by `save_states` and print the final results.
+
+        :param filenames: a list of filenames or a string as accepted by `udapi.core.files.Files`,
+            e.g. 'part1.json,part2.json' or '!parts/*.json' or '@list_of_state_files.txt'.
+        """
+        from udapi.core.files import Files
+        if isinstance(filenames, str):
+            filenames = Files(filenames=filenames).filenames
+        blocks, first_signature = None, None
+        for filename in filenames:
+            logging.info('Merging the state from %s', filename)
+            with open(filename, encoding='utf-8') as state_file:
+                states = json.load(state_file)['blocks']
+            signature = [(s['block'], s['args']) for s in states]
+            if blocks is None:
+                first_signature = signature
+                blocks = _import_blocks([name for name, _ in signature], [a for _, a in signature])
+                for _, block, _ in blocks:
+                    block.process_start()
+            elif signature != first_signature:
+                raise ValueError(f'The state in {filename} was saved by blocks {signature}, '
+                                 f'but {filenames[0]} by {first_signature}')
+            for (_, block, _), state in zip(blocks, states):
+                block.merge_state(state['state'])
+
+        if blocks is None:
+            raise ValueError('No state files to be merged')
+        for _, block, _ in blocks:
+            block.process_end()
+        return blocks
+
     # TODO: better implementation, included Scen
     def scenario_string(self):
         """Return the scenario string."""
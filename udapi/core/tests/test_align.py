@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+import difflib
+import random
+import unicodedata
+import unittest
+
+from udapi.core.align import diff_opcodes, strip_spaces
+
+
+def lcs_length(a, b):
+    row = [0] * (len(b) + 1)
+    for char in a:
+        diagonal = 0
+        for j in range(1, len(b) + 1):
+            diagonal, row[j] = row[j], diagonal + 1 if char == b[j - 1] else max(row[j], row[j - 1])
+    return row[-1]
+
+
+class TestAlign(unittest.TestCase):
+
+    def check_opcodes(self, a, b, opcodes):
+        """Check that the opcodes are contiguous and return the number of matched characters."""
+        i = j = matched = 0
+        for tag, i1, i2, j1, j2 in opcodes:
+            self.assertEqual((i, j), (i1, j1))
+            if tag == 'equal':
+                self.assertEqual(a[i1:i2], b[j1:j2])
+                matched += i2 - i1
+            self.assertEqual(tag == 'delete', j1 == j2 and i1 < i2)
+            self.assertEqual(tag == 'insert', i1 == i2 and j1 < j2)
+            i, j = i2, j2
+        self.assertEqual((i, j), (len(a), len(b)))
+        return matched
+
+    def test_diff_opcodes(self):
+        self.assertEqual(diff_opcodes('', ''), [])
+        self.assertEqual(diff_opcodes('abc', 'abc'), [('equal', 0, 3, 0, 3)])
+        self.assertEqual(diff_opcodes('abc', 'axc'), difflib.SequenceMatcher(
+            None, 'abc', 'axc', autojunk=False).get_opcodes())
+        rng = random.Random(42)
+        for _ in range(300):
+            a = ''.join(rng.choice('ab ') for _ in range(rng.randint(0, 30)))
+            b = ''.join(rng.choice('ab ') for _ in range(rng.randint(0, 30)))
+            self.assertEqual(self.check_opcodes(a, b, diff_opcodes(a, b)), lcs_length(a, b))
+            # With max_d=2, the banded LCS is used, which need not be optimal, but must be valid.
+            self.check_opcodes(a, b, diff_opcodes(a, b, max_d=2, band=3))
+
+    def test_strip_spaces(self):
+        spaces = ''.join(c for c in map(chr, range(0x3001)) if unicodedata.category(c) == 'Zs')
+        self.assertEqual(strip_spaces('a' + spaces + 'b\tc'), 'ab\tc')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from udapi.benchmark.synthetic import generate_conllu
+from udapi.benchmark import suite
+from udapi.core.document import Document
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_synthetic_roundtrip(self):
+        conllu = generate_conllu(sentences=50, seed=7)
+        self.assertEqual(conllu, generate_conllu(sentences=50, seed=7))
+        doc = Document()
+        doc.from_conllu_string(conllu)
+        self.assertEqual(len(doc), 50)
+        self.assertTrue(doc.coref_entities)
+        self.assertTrue(any(root.multiword_tokens for root in doc.trees))
+        self.assertTrue(any(root.empty_nodes for root in doc.trees))
+        doc = Document()
+        doc.from_conllu_string(conllu)
+        self.assertEqual(doc.to_conllu_string(), conllu)
+        # Extra MISC attributes do not change the rest of the data.
+        heavy = Document()
+        heavy.from_conllu_string(generate_conllu(sentences=50, seed=7, extra_misc=3))
+        self.assertEqual([root.compute_text() for root in heavy.trees], [root.text for root in doc.trees])
+        node = heavy.bundles[0].get_tree().descendants[0]
+        self.assertEqual(node.misc['Gloss'], node.form + '1')
+        self.assertEqual(node.misc['LTranslit'], node.form + '1')
+        self.assertEqual(node.misc['MSeg'], '')
+
+    def test_suite_output(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output = os.path.join(tmp_dir, 'results.json')
+            with contextlib.redirect_stdout(io.StringIO()):
+                status = suite.main(['--sentences', '10', '--repeat', '1', '--blocks', 'ud.FixPunct',
+                                     '--output', output])
+                self.assertEqual(status, 0)
+                status = suite.main(['--sentences', '10', '--repeat', '1', '--only', 'remove',
+                                     '--compare', output, '--threshold', '1000'])
+            self.assertEqual(status, 0)
+            with open(output, encoding='utf-8') as results_file:
+                results = json.load(results_file)
+        self.assertEqual(set(results['results']), set(suite.BENCHMARKS) | {'ud.FixPunct'})
+        self.assertEqual(results['params']['sentences'], 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,12 @@
 #!/usr/bin/env python3
 
+import contextlib
+import gzip
+import io
+import json
 import os
+import re
+import tempfile
 import unittest
 import udapi
 from udapi.block.read.conllu import Conllu as ConlluReader
@@ -55,6 +61,50 @@ class TestCoref(unittest.TestCase):
         m2.entity = entity2
         self.assertEqual(m2.entity.eid, entity2.eid)
 
+    def test_corefhtml_workers(self):
+        """write.CorefHtml should write the same files with and without parallel workers."""
+        from udapi.block.write.corefhtml import CorefHtml
+        with open(os.path.join(os.path.dirname(__file__), 'data', 'fr-democrat-dev-sample.conllu'),
+                  encoding='utf-8') as sample:
+            conllu = sample.read()
+        # Four documents, so there are enough secondary documents for two workers.
+        conllu += re.sub(r'\be(\d{5})', r'f\1', conllu.replace('ungroupped', 'copy'))
+        outputs = []
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            data_filename = os.path.join(tmp_dir, 'sample.conllu')
+            with open(data_filename, 'w', encoding='utf-8') as data_file:
+                data_file.write(conllu)
+            for workers in (1, 2):
+                docs_dir = os.path.join(tmp_dir, f'docs{workers}')
+                doc = udapi.Document(data_filename)
+                html = io.StringIO()
+                pools = []
+                with contextlib.redirect_stdout(html):
+                    writer = CorefHtml(docs_dir=docs_dir, workers=workers)
+                    start_writing_docs = writer._start_writing_docs
+
+                    def recording_start(ud_docs, start_writing_docs=start_writing_docs, pools=pools):
+                        pool, result = start_writing_docs(ud_docs)
+                        pools.append(pool)
+                        return pool, result
+                    writer._start_writing_docs = recording_start
+                    writer.apply_on_document(doc)
+                self.assertEqual(pools[0] is not None, workers > 1)
+                files = {}
+                for name in sorted(os.listdir(docs_dir)):
+                    with gzip.open(os.path.join(docs_dir, name), 'rt', encoding='utf-8') as gz_file:
+                        files[name] = gz_file.read()
+                outputs.append((html.getvalue().replace(docs_dir, ''), files))
+        self.assertEqual(outputs[0], outputs[1])
+        files = outputs[0][1]
+        self.assertEqual(sorted(files), ['doc2.html.gz', 'doc2.json.gz', 'doc3.html.gz', 'doc3.json.gz',
+                                         'doc4.html.gz', 'doc4.json.gz', 'index.json.gz'])
+        self.assertIn('id="doc2"', files['doc2.html.gz'])
+        self.assertIn('id="doc4"', files['doc4.html.gz'])
+        index = json.loads(files['index.json.gz'])
+        self.assertEqual(index['docs'], 4)
+        self.assertEqual(index['entities']['e36781'], [[2, 1]])
+        self.assertEqual(index['entities']['f36781'], [[4, 1]])
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,7 +1,14 @@
 #!/usr/bin/env python3
 
+import gc
+import importlib.util
+import os
+import tempfile
+import subprocess
+import sys
 import unittest
 from udapi.core.document import Document
+from udapi.core.node import Node
 
 
 class TestDocument(unittest.TestCase):
@@ -19,5 +26,209 @@ class TestDocument(unittest.TestCase):
         tree1 = bundle1.create_tree()
         self.assertEqual(tree1.address(), "1")
 
+    def test_index(self):
+        doc = Document()
+        for _ in range(5):
+            doc.create_bundle().create_tree()
+        bundles = list(doc)
+        self.assertIs(doc.get_bundle('3'), bundles[2])
+        self.assertIsNone(doc.get_bundle('x'))
+        bundles[2].bundle_id = 'x'
+        self.assertIs(doc.get_tree('x'), bundles[2].get_tree())
+        self.assertIsNone(doc.get_bundle('3'))
+        new = doc.create_bundle(after=bundles[0])
+        new.create_tree()
+        new.create_tree(zone='en')
+        self.assertIs(doc.get_tree('6/en'), new.get_tree('en'))
+        self.assertEqual([b.number for b in doc], [1, 2, 3, 4, 5, 6])
+        self.assertIs(bundles[1].get_tree().prev_tree, new.get_tree())
+        bundles[1].remove()
+        self.assertIsNone(doc.get_bundle('2'))
+        self.assertEqual([b.bundle_id for b in doc], ['1', '6', 'x', '4', '5'])
+        self.assertEqual(bundles[3].number, 4)
+        self.assertIs(bundles[4].get_tree().next_tree, None)
+        # Direct modifications of the list are detected.
+        doc.bundles.pop(0)
+        self.assertEqual(new.number, 1)
+        self.assertIsNone(doc.get_bundle('1'))
+        doc.bundles = doc.bundles[::-1]
+        self.assertIs(doc.get_bundle('4').get_tree().next_tree, doc.get_tree('x'))
+        # Replacing a bundle in place (without changing the number of bundles) is detected as well.
+        other = Document().create_bundle()
+        other.bundle_id = 'y'
+        replaced = doc.bundles[0]
+        doc.bundles[0] = other
+        self.assertIs(doc.get_bundle('y'), other)
+        self.assertIsNone(doc.get_bundle(replaced.bundle_id))
+
+    def test_remove_bundles(self):
+        """Removing bundles while iterating over them should not skip any bundle."""
+        doc = Document()
+        for _ in range(10):
+            doc.create_bundle().create_tree()
+        self.assertEqual(doc.get_bundle('5').number, 5)
+        for bundle in doc.bundles:
+            if int(bundle.bundle_id) % 3 == 0:
+                bundle.remove()
+                self.assertIsNone(bundle.number)
+                self.assertIsNone(doc.get_bundle(bundle.bundle_id))
+            else:
+                self.assertEqual(bundle.number, int(bundle.bundle_id) - int(bundle.bundle_id) // 3)
+        self.assertEqual(doc.get_tree('5').next_tree, doc.get_tree('7'))
+        self.assertEqual(doc.get_tree('10').prev_tree, doc.get_tree('8'))
+        self.assertIsNone(doc.get_tree('10').next_tree)
+        new = doc.create_bundle()
+        self.assertEqual(new.number, 8)
+        doc.get_bundle('1').remove()
+        self.assertEqual([b.bundle_id for b in doc], ['2', '4', '5', '7', '8', '10', '11'])
+        self.assertEqual([b.number for b in doc], list(range(1, 8)))
+        self.assertIs(doc.get_bundle('11'), new)
+        with self.assertRaises(ValueError):
+            doc.bundle_number(Document().create_bundle())
+
+    def test_lazy_imports(self):
+        """Visualizers, readers, writers and coreference should not be imported with Document."""
+        code = ("import sys, udapi.core.document; "
+                "print(' '.join(m for m in ('udapi.core.coref', 'udapi.block.write.textmodetrees', "
+                "'udapi.block.read.conllu') if m in sys.modules))")
+        output = subprocess.run([sys.executable, '-c', code], stdout=subprocess.PIPE,
+                                text=True, check=True).stdout
+        self.assertEqual(output.strip(), '')
+
+    def test_release(self):
+        """After doc.release(), no nodes should be left in reference cycles."""
+        data_filename = os.path.join(os.path.dirname(__file__), 'data', 'fr-democrat-dev-sample.conllu')
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        gc.collect()
+        try:
+            doc = Document(data_filename)
+            self.assertTrue(doc.coref_entities)
+            doc.release()
+            self.assertEqual(len(doc), 0)
+            del doc
+            gc.set_debug(gc.DEBUG_SAVEALL)
+            gc.collect()
+            self.assertFalse([o for o in gc.garbage if isinstance(o, Node)])
+        finally:
+            gc.set_debug(0)
+            gc.garbage.clear()
+            if gc_was_enabled:
+                gc.enable()
+
+    @unittest.skipUnless(importlib.util.find_spec('numpy'), 'NumPy is not installed')
+    def test_to_arrays(self):
+        """Test doc.to_arrays() and saving and loading the arrays."""
+        from udapi.core.arrays import NodeArrays
+        doc = Document(os.path.join(os.path.dirname(__file__), 'data', 'UD_Czech_sample.conllu'))
+        arrays = doc.to_arrays()
+        nodes = list(doc.nodes)
+        self.assertEqual(len(arrays), len(nodes))
+        self.assertEqual(arrays.num_trees, len(list(doc.trees)))
+        self.assertEqual(list(arrays['head']), [n.parent.ord for n in nodes])
+        self.assertEqual(list(arrays['depth']), [n.get_attrs(['depth'], stringify=False)[0] for n in nodes])
+        self.assertEqual(list(arrays['children']), [len(n.children) for n in nodes])
+        self.assertEqual(list(arrays.strings('lemma')), [n.lemma or '' for n in nodes])
+        self.assertEqual(list(arrays.feat_values('Case')), [n.feats['Case'] for n in nodes])
+        self.assertEqual(list(arrays.has_feat('Number=Plur')), [n.feats['Number'] == 'Plur' for n in nodes])
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, 'doc.npz')
+            NodeArrays.concatenate([arrays, arrays]).save(filename)
+            loaded = NodeArrays.load(filename)
+        self.assertEqual(len(loaded), 2 * len(nodes))
+        self.assertEqual(loaded.sent_ids, arrays.sent_ids * 2)
+        self.assertEqual(list(loaded.strings('upos')), [n.upos for n in nodes] * 2)
+        rows, ids = loaded.feat_pairs()
+        self.assertEqual(['|'.join(loaded.vocabs['feats'][i] for i in ids[rows == row]) or '_'
+                          for row in range(len(nodes))], [str(n.feats) for n in nodes])
+
+    def test_conllup(self):
+        """Test reading CoNLL-U Plus extra columns into the side table and writing them back."""
+        from udapi.block.read.conllup import Conllup as ConllupReader
+        from udapi.block.write.conllup import Conllup as ConllupWriter
+        cupt = ('# global.columns = ID FORM LEMMA UPOS XPOS FEATS HEAD DEPREL DEPS MISC PARSEME:MWE\n'
+                '# sent_id = s1\n'
+                '# text = He took off.\n'
+                '1\tHe\the\tPRON\t_\t_\t2\tnsubj\t_\t_\t*\n'
+                '2\ttook\ttake\tVERB\t_\t_\t0\troot\t_\t_\t1:VPC.full\n'
+                '3\toff\toff\tADP\t_\t_\t2\tcompound:prt\t_\tSpaceAfter=No\t1\n'
+                '4\t.\t.\tPUNCT\t_\t_\t2\tpunct\t_\t_\t*\n\n')
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, 'in.cupt')
+            with open(filename, 'w', encoding='utf-8') as infile:
+                infile.write(cupt)
+            doc = Document()
+            ConllupReader(files=filename, extra_columns='table').apply_on_document(doc)
+            root = doc.bundles[0].get_tree()
+            self.assertEqual(root.extra_columns, ('PARSEME:MWE',))
+            self.assertEqual([n.get_column('PARSEME:MWE') for n in root.descendants], ['*', '1:VPC.full', '1', '*'])
+            self.assertEqual(root.descendants[2].misc['SpaceAfter'], 'No')
+            root.descendants[3].set_column('PARSEME:MWE', None)
+            self.assertEqual(root.descendants[3].get_column('PARSEME:MWE'), '_')
+            root.descendants[3].set_column('PARSEME:MWE', '*')
+
+            outname = os.path.join(tmp_dir, 'out.cupt')
+            ConllupWriter(files=outname).apply_on_document(doc)
+            with open(outname, encoding='utf-8') as outfile:
+                self.assertEqual(outfile.read(), cupt)
+
+            doc = Document()
+            ConllupReader(files=filename).apply_on_document(doc)
+            node = doc.bundles[0].get_tree().descendants[1]
+            self.assertEqual(node.misc['Parseme:mwe'], '1:VPC.full')
+
+            # read.Conll stores the extra columns via store_extra_columns if not in the compiled parser.
+            from udapi.block.read.conll import Conll as ConllReader
+            reader = ConllReader(files=filename, attributes='ord,form,lemma,upos,xpos,feats,head,'
+                                                            'deprel,deps,misc,PARSEME:MWE')
+            reader.extra_columns_in_table = lambda: False
+            doc = Document()
+            reader.apply_on_document(doc)
+            root = doc.bundles[0].get_tree()
+            self.assertEqual(root.extra_columns, ('PARSEME:MWE',))
+            self.assertEqual([n.get_column('PARSEME:MWE') for n in root.descendants], ['*', '1:VPC.full', '1', '*'])
+
+    def test_conllu_index(self):
+        """Test the sidecar index of sentence offsets and reading with sent_id_filter via the index."""
+        import shutil
+        from udapi.block.read.conllu import Conllu as ConlluReader
+        from udapi.core.conlluindex import ConlluIndex
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, 'sample.conllu')
+            shutil.copy(os.path.join(os.path.dirname(__file__), 'data', 'fr-democrat-dev-sample.conllu'), filename)
+            self.assertIsNone(ConlluIndex.load(filename))
+            index = ConlluIndex.open(filename)
+            self.assertTrue(os.path.exists(ConlluIndex.index_filename(filename)))
+            loaded = ConlluIndex.load(filename)
+            self.assertEqual(loaded.entries, index.entries)
+            self.assertEqual([e[2:4] for e in index.entries], [
+                ('ungroupped-estrepublicain-2-066-p0-s1', 'ungroupped-estrepublicain-2-066'),
+                ('ungroupped-estrepublicain-2-066-p1-s1', None),
+                ('ungroupped-estrepublicain-2-005-p0-s1', 'ungroupped-estrepublicain-2-005')])
+            doc = Document(filename)
+            for tree in doc.trees:
+                self.assertEqual(index.get_tree(tree.sent_id).compute_text(), tree.compute_text())
+            self.assertTrue(index.get_string(1).startswith('# newpar id = ungroupped-estrepublicain-2-066-p1\n# sent_id'))
+            index.close()
+
+            for sent_id_filter in ('.*p1', '.*-005', 'nothing'):
+                docs = [Document(), Document()]
+                for doc, use_index in zip(docs, (0, 'auto')):
+                    ConlluReader(files=filename, sent_id_filter=sent_id_filter, index=use_index).apply_on_document(doc)
+                self.assertEqual(docs[0].to_conllu_string(), docs[1].to_conllu_string())
+                self.assertEqual(docs[0].meta.get('global.Entity'), docs[1].meta.get('global.Entity'))
+            self.assertEqual(len(docs[1].bundles), 0)
+
+            # The outdated index is not used (with index=auto) or it is rebuilt.
+            with open(filename, 'a', encoding='utf-8') as outfile:
+                outfile.write('# sent_id = new\n1\tx\t_\t_\t_\t_\t0\troot\t_\t_\n\n')
+            self.assertIsNone(ConlluIndex.load(filename))
+            doc = Document()
+            ConlluReader(files=filename, sent_id_filter='new', index=1).apply_on_document(doc)
+            self.assertEqual([tree.sent_id for tree in doc.trees], ['new'])
+            self.assertEqual(len(ConlluIndex.load(filename)), 4)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Unit tests for the declarative rules of ud.MarkFeatsBugs."""
+import unittest
+
+from udapi.core.document import Document
+from udapi.block.ud.markfeatsbugs import FeatureRules
+from udapi.block.ud.ml.markfeatsbugs import MarkFeatsBugs as MlMarkFeatsBugs
+
+
+def _tree(*nodes):
+    """Return a new tree with the given nodes, each specified as (upos, lemma, feats)."""
+    root = Document().create_bundle().create_tree()
+    for upos, lemma, feats in nodes:
+        root.create_child(form=lemma, lemma=lemma, upos=upos, feats=feats)
+    return root
+
+
+class TestMarkFeatsBugs(unittest.TestCase):
+
+    def test_feature_rules(self):
+        """The first matching rule should be applied, '' means a missing feature."""
+        rules = FeatureRules([
+            {'upos': 'NOUN', 'lemma': ['a', 'b'], 'required': ['Case']},
+            {'upos': 'NOUN', 'feats': {'Number': ''}, 'required': ['Number']},
+            {'upos': 'NOUN|PROPN', 'feats': {'Number': ['Sing', 'Plur']}, 'allowed': {'Number': ['Sing']}},
+            {'feats': {'Foreign': 'Yes'}},
+            {'allowed': {}},
+        ])
+        self.assertTrue(rules.uses_lemma('NOUN'))
+        self.assertFalse(rules.uses_lemma('PROPN'))
+        self.assertFalse(rules.uses_lemma('VERB'))
+
+        nodes = _tree(('NOUN', 'a', 'Number=Dual'), ('NOUN', 'c', 'Case=Nom'),
+                      ('NOUN', 'c', 'Number=Plur'), ('NOUN', 'c', 'Number=Dual'),
+                      ('PROPN', 'a', 'Number=Sing'), ('VERB', 'a', 'Foreign=Yes'),
+                      ('VERB', 'a', 'Number=Sing|Foreign=No')).descendants
+        self.assertEqual(rules.signature(nodes[4]), ('PROPN', None, ('Sing', '')))
+        self.assertEqual(rules.signature(nodes[1]), ('NOUN', 'c', ('', '')))
+        sing_only = {'Number': frozenset(['Sing'])}
+        expected = [(('Case',), None), (('Number',), None), ((), sing_only), ((), {}),
+                    ((), sing_only), ((), None), ((), {})]
+        self.assertEqual([rules.checks(node) for node in nodes], expected)
+        # The checks are found just once for each signature.
+        self.assertIs(rules.checks(nodes[2]), rules.checks(nodes[2]))
+
+        self.assertIsNone(FeatureRules([{'upos': 'NOUN'}]).checks(nodes[5]))
+
+    def test_ml_rules(self):
+        """Test the bugs marked by ud.ml.MarkFeatsBugs (with and without the cache)."""
+        nodes = [
+            ('NOUN', 'മരം', 'Case=Nom|Number=Sing'),
+            ('NOUN', 'മരം', 'Animacy=Inan|Case=Nom|Number=Sing'),
+            # Any features are allowed for foreign words.
+            ('VERB', 'പ്ലാന്റ്', 'Foreign=Yes|Mood=Xyz'),
+            # താൻ is matched by the lemma, before the rule for other 3rd person singular pronouns.
+            ('PRON', 'താൻ', 'Case=Nom|Number=Sing|Person=3|PronType=Prs'),
+            ('PRON', 'അവൻ', 'Case=Nom|Number=Sing|Person=3|PronType=Prs'),
+            ('ADV', 'ഇവിടെ', 'Degree=Pos'),
+            ('ADV', 'ഇവിടെ', 'PronType=Dem'),
+            ('NUM', '5', 'Case=Nom|NumForm=Digit|NumType=Card'),
+            ('VERB', 'തുറക്കുക', 'Mood=Imp|VerbForm=Fin'),
+            ('X', 'x', 'Case=Nom'),
+        ]
+        expected = ['FeatAnimacyMissing', '', '', '', 'FeatDeixisMissing+FeatGenderMissing',
+                    'FeatDegreeNotAllowed', '', 'FeatCaseNotAllowed', 'FeatPoliteMissing',
+                    'FeatCaseNotAllowed']
+        for cache in (False, True):
+            block = MlMarkFeatsBugs(cache=cache)
+            for _ in range(2):
+                tree = _tree(*nodes)
+                block.process_tree(tree)
+                self.assertEqual([node.misc['Bug'] for node in tree.descendants], expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,7 +7,7 @@ import sys
 import unittest
 
 from udapi.core.root import Root
-from udapi.core.node import Node, find_minimal_common_treelet
+from udapi.core.node import Node, EmptyOrd, find_minimal_common_treelet
 from udapi.core.document import Document
 from udapi.block.read.conllu import Conllu
 
@@ -121,6 +121,22 @@ class TestDocument(unittest.TestCase):
         finally:
             sys.stdout = sys.__stdout__  # pylint: disable=redefined-variable-type
 
+    def test_draw_deep_tree(self):
+        """Test that draw() works for trees deeper than the recursion limit."""
+        root = Root()
+        node = root
+        depth = sys.getrecursionlimit() + 100
+        for i in range(depth):
+            node = node.create_child(form=str(i))
+        try:
+            sys.stdout = capture = io.StringIO()
+            root.draw(color=False, attributes='form', print_sent_id=0, print_text=0)
+        finally:
+            sys.stdout = sys.__stdout__  # pylint: disable=redefined-variable-type
+        lines = capture.getvalue().split('\n')
+        self.assertEqual(len(lines), depth + 3)
+        self.assertEqual(lines[-3], ' ' * (2 * depth - 1) + '╰─╼ ' + str(depth - 1))
+
     def test_feats(self):
         """Test the morphological features."""
         node = Node(root=None)
@@ -148,6 +164,23 @@ class TestDocument(unittest.TestCase):
         self.assertEqual(str(node.feats), '_')
         self.assertEqual(node.feats, {})
 
+    def test_misc_lookup(self):
+        """Single-key lookups should give the same results without deserializing MISC."""
+        node = Node(root=None, misc='SpaceAfter=No|Gloss=a=b|Entity=(e1|NoValue|Gloss=c')
+        self.assertEqual(node.misc['SpaceAfter'], 'No')
+        self.assertEqual(node.misc['Gloss'], 'c')
+        self.assertEqual(node.misc['Entity'], '(e1')
+        self.assertIs(node.misc['NoValue'], True)
+        self.assertEqual(node.misc['Space'], '')
+        self.assertEqual(node.misc['No'], '')
+        self.assertTrue(node.no_space_after)
+        self.assertIn('Entity', node.misc)
+        self.assertNotIn('After', node.misc)
+        self.assertFalse(node.misc._dict)  # pylint: disable=protected-access
+        node.misc['Gloss'] = 'd'
+        self.assertEqual(str(node.misc), 'Entity=(e1|Gloss=d|NoValue|SpaceAfter=No')
+        self.assertFalse(Node(root=None).no_space_after)
+
     def test_deprel(self):
         """Test getting setting the dependency relation."""
         node = Node(root=None, deprel='acl:relcl')
@@ -245,6 +278,131 @@ class TestDocument(unittest.TestCase):
         self.assertEqual(root.descendants_and_empty, [e1, e2, e3, e4, e6, e7])
         self.assertEqual([n.ord for n in root.descendants_and_empty], [0.1, 0.2, 0.3, 0.4, 0.5, 0.6])
 
+    def test_empty_ord(self):
+        """Test EmptyOrd comparisons and more than nine empty nodes after one node."""
+        self.assertTrue(1 < EmptyOrd('1.2') < EmptyOrd(1, 10) < 2)
+        self.assertTrue(EmptyOrd(1, 9) <= 1.9 < EmptyOrd(1, 10))
+        self.assertEqual(EmptyOrd(3, 1), 3.1)
+        self.assertNotEqual(EmptyOrd(3, 10), 3.1)
+        self.assertEqual(str(EmptyOrd(3.1)), '3.1')
+        self.assertEqual(int(EmptyOrd(3, 10)), 3)
+        with self.assertRaises(ValueError):
+            EmptyOrd('3.0')
+
+        root = Root()
+        n1, n2 = root.create_child(form='n1'), root.create_child(form='n2')
+        empties = [n1.create_empty_child('dep', form=f'e{i}') for i in range(1, 12)]
+        self.assertEqual([str(e.ord) for e in empties[8:]], ['1.9', '1.10', '1.11'])
+        self.assertEqual(root.descendants_and_empty, [n1] + empties + [n2])
+        n2.raw_deps = '1.10:dep|1.9:dep'
+        self.assertEqual([d['parent'] for d in n2.deps], [empties[9], empties[8]])
+        empties[0].remove()
+        self.assertEqual(str(empties[-1].ord), '1.10')
+        self.assertEqual(n2.raw_deps, '1.8:dep|1.9:dep')
+
+    def test_remove_nodes(self):
+        """Test bulk removal of nodes including multi-word tokens and coreference."""
+        doc = Document()
+        root = doc.create_bundle().create_tree()
+        nodes = [root.create_child(form=f'n{i}') for i in range(1, 7)]
+        n1, n2, n3, n4, n5, n6 = nodes
+        n2.parent, n3.parent, n4.parent = n1, n2, n2
+        e1 = n3.create_empty_child('dep', after=True, form='e1')
+        mwt = root.create_multiword_token([n4, n5], form='n4n5')
+        entity = doc.create_coref_entity()
+        entity.create_mention(head=n5, words=[n4, n5])
+        entity.create_mention(head=n2, words=[n2])
+        self.assertIs(n5.multiword_token, mwt)
+
+        root.remove_nodes([n2, n5, n6], children='rehang')
+        self.assertEqual(root.descendants, [n1, n3, n4])
+        self.assertEqual([n.ord for n in root.descendants_and_empty], [1, 2, 2.1, 3])
+        self.assertEqual(n1.children, [n3, n4])
+        self.assertEqual(root.multiword_tokens, [])
+        self.assertIsNone(n4.multiword_token)
+        self.assertEqual(len(entity.mentions), 1)
+        self.assertEqual(entity.mentions[0].words, [n4])
+        self.assertIs(entity.mentions[0].head, n4)
+        self.assertIs(e1, root.empty_nodes[0])
+
+        root.remove_nodes([n1])
+        self.assertEqual(root.descendants, [])
+        self.assertEqual(root.children, [])
+        self.assertEqual(e1.ord, 0.1)
+        self.assertEqual(doc.coref_entities, [])
+
+    def test_reorder(self):
+        """Test root.reorder() and updating empty nodes when shifting subtrees."""
+        root = Root()
+        n1, n2, n3, n4 = [root.create_child(form=f'n{i}') for i in range(1, 5)]
+        n3.parent = n2
+        e1 = n2.create_empty_child('dep', after=True, form='e1')
+        e2 = n3.create_empty_child('dep', after=True, form='e2')
+        root.reorder([n4, n2, n1, n3])
+        self.assertEqual([n.ord for n in root.descendants_and_empty], [1, 2, 2.1, 3, 4, 4.1])
+        self.assertEqual(root.descendants_and_empty, [n4, n2, e1, n1, n3, e2])
+        self.assertEqual(root.children, [n4, n2, n1])
+        n2.shift_after_node(n1, without_children=True)
+        self.assertEqual(root.descendants_and_empty, [n4, e1, n1, n2, n3, e2])
+        self.assertEqual([n.ord for n in root.descendants_and_empty], [1, 1.1, 2, 3, 4, 4.1])
+        n2.shift_before_node(n4)
+        self.assertEqual(root.descendants_and_empty, [n2, n3, n4, e1, n1, e2])
+        self.assertEqual([n.ord for n in root.descendants_and_empty], [1, 2, 3, 3.1, 4, 4.1])
+
+        root.create_multiword_token([n2, n3], form='n2n3')
+        with self.assertRaises(ValueError):
+            root.reorder([n2, n4, n3, n1])
+        self.assertEqual(root.descendants, [n2, n3, n4, n1])
+        with self.assertRaises(ValueError):
+            root.reorder([n2, n3, n4])
+
+    def test_cached_descendants(self):
+        """Test that cached descendants are updated after each change of the tree."""
+        root = Root()
+        n1, n2, n3, n4 = [root.create_child(form=f'n{i}') for i in range(1, 5)]
+        n2.parent = n1
+        self.assertEqual(n1.descendants, [n2])
+        version = root.structure_version
+        n1.descendants.append(n3)
+        self.assertEqual(n1.descendants(add_self=True), [n1, n2])
+        self.assertEqual(root.structure_version, version)
+        n4.parent = n2
+        self.assertEqual(n1.descendants, [n2, n4])
+        n4.shift_before_node(n2)
+        self.assertEqual(n1.descendants, [n4, n2])
+        self.assertEqual(n1.descendants(add_self=True, preceding_only=True), [n1])
+        n4.remove()
+        self.assertEqual(n1.descendants, [n2])
+        self.assertEqual(root.token_descendants, [n1, n2, n3])
+        mwt = root.create_multiword_token([n2, n3], form='n2n3')
+        self.assertEqual(root.token_descendants, [n1, mwt])
+        mwt.remove()
+        self.assertEqual(root.token_descendants, [n1, n2, n3])
+        empty = n1.create_empty_child('dep')
+        self.assertEqual(root.descendants_and_empty, [n1, empty, n2, n3])
+        empty.ord = '3.1'
+        self.assertEqual(root.descendants_and_empty, [n1, n2, n3, empty])
+        self.assertGreater(root.structure_version, version)
+
+    def test_compute_text(self):
+        """Test compute_text and char_spans, which use the cached list of tokens."""
+        root = Root()
+        n1, n2, n3, n4 = [root.create_child(form=form) for form in ('Vámonos', 'a', 'el', 'mar')]
+        n1.misc['SpaceAfter'] = 'No'
+        mwt = root.create_multiword_token([n2, n3], form='al')
+        self.assertEqual(root.compute_text(), 'Vámonosal mar')
+        self.assertEqual(root.compute_text(use_mwt=False), 'Vámonosa el mar')
+        n1.form, n1.misc = 'Vamos', None
+        mwt.misc['SpaceAfter'] = 'No'
+        text, spans = root.char_spans()
+        self.assertEqual(text, 'Vamos almar')
+        self.assertEqual(text, root.compute_text())
+        self.assertEqual([spans[n] for n in (n1, mwt, n2, n3, n4)], [(0, 5), (6, 8), (6, 8), (6, 8), (8, 11)])
+        n4.shift_before_node(n1)
+        text, spans = root.char_spans(use_mwt=False)
+        self.assertEqual(text, 'mar Vamos a el')
+        self.assertEqual(text[slice(*spans[n3])], 'el')
+
     def test_enh_deps_and_reordering(self):
         """Test reordering of node ord in enhanced deps when reorderin/removing nodes."""
         root = Root()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Unit tests for udapi.core.ruleblock."""
+import unittest
+
+from udapi.core.document import Document
+from udapi.core.ruleblock import RuleBlock
+
+
+class CaseToMisc(RuleBlock):
+    """Toy block: store the case of nominals whose parent is a verb in MISC."""
+    depends_on = ('upos', 'feats[Case]', 'parent.upos')
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.decided = 0
+
+    def decide(self, node):
+        self.decided += 1
+        if node.upos in ('NOUN', 'PRON') and node.feats['Case'] and node.parent.upos == 'VERB':
+            return node.feats['Case']
+        return None
+
+    def apply(self, node, decision):
+        node.misc['VerbArgCase'] = decision
+
+
+def _tree():
+    root = Document().create_bundle().create_tree()
+    verb = root.create_child(form='sees', upos='VERB')
+    verb.create_child(form='John', upos='NOUN', feats='Case=Nom|Number=Sing')
+    verb.create_child(form='her', upos='PRON', feats='Case=Acc|PronType=Prs')
+    verb.create_child(form='Mary', upos='NOUN', feats='Case=Nom|Number=Plur')
+    noun = verb.create_child(form='dogs', upos='NOUN', feats='Case=Acc|Number=Plur')
+    noun.create_child(form='John', upos='NOUN', feats='Case=Nom')
+    return root
+
+
+class TestRuleBlock(unittest.TestCase):
+
+    def test_memoize(self):
+        """The decision should be computed once per signature and applied to all nodes."""
+        expected = ['', 'Nom', 'Acc', 'Nom', 'Acc', '']
+        for memoize in (False, True):
+            block = CaseToMisc(memoize=memoize)
+            for _ in range(2):
+                tree = _tree()
+                block.process_tree(tree)
+                self.assertEqual([node.misc['VerbArgCase'] for node in tree.descendants], expected)
+            # The signatures differ only in the first 6 nodes, the Number feature is not relevant.
+            self.assertEqual(block.decided, 5 if memoize else 12)
+
+    def test_signature(self):
+        """The signature should contain exactly the values of `depends_on` attributes."""
+        block = CaseToMisc()
+        nodes = _tree().descendants
+        self.assertEqual([block.signature(node) for node in nodes[:2]],
+                         [('VERB', '', '<ROOT>'), ('NOUN', 'Nom', 'VERB')])
+
+        class WholeFeats(CaseToMisc):
+            depends_on = ('feats',)
+        self.assertEqual(WholeFeats().signature(nodes[1]), 'Case=Nom|Number=Sing')
+
+        class Plain(CaseToMisc):
+            depends_on = ('upos', 'form')
+        self.assertEqual(Plain().signature(nodes[1]), ('NOUN', 'John'))
+
+    def test_memo_size(self):
+        """The memo should be cleared when it exceeds `memo_size`."""
+        block = CaseToMisc()
+        block.memo_size = 2
+        block.process_tree(_tree())
+        self.assertLessEqual(len(block._decisions), 2)  # pylint: disable=protected-access
+        self.assertEqual(block.decided, 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
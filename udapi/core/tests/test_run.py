@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""Unit tests for udapi.core.run."""
+import argparse
+import contextlib
+import importlib.util
+import io
+import logging
+import os
+import sys
+import tempfile
+import unittest
+
+from udapi.core.run import Run
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+
+
+def _run(scenario, **kwargs):
+    args = argparse.Namespace(scenario=scenario, **kwargs)
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        Run(args).execute()
+    return output.getvalue()
+
+
+class TestRun(unittest.TestCase):
+
+    def test_save_and_merge_states(self):
+        """Statistics computed on shards and merged should equal those computed at once."""
+        files = [os.path.join(DATA_DIR, name) for name in ('UD_Czech_sample.conllu', 'babinsky.conllu')]
+        stats = ['util.Wc', 'util.See', 'node=node.upos=="NOUN"', 'stats=deprel,upos']
+        expected = _run(['read.Conllu', 'files=' + ','.join(files)] + stats)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            state_files = []
+            for i, filename in enumerate(files):
+                state_files.append(os.path.join(tmp_dir, f'part{i}.json'))
+                output = _run(['read.Conllu', 'files=' + filename] + stats, save_state=state_files[-1])
+                self.assertEqual(output, '')
+            merged = _run([], merge_states=','.join(state_files))
+        self.assertEqual(merged, expected)
+
+    def test_result_cache(self):
+        """The second run of the same scenario on the same file should reuse the cached output."""
+        filename = os.path.join(DATA_DIR, 'babinsky.conllu')
+        scenario = ['read.Conllu', 'files=' + filename, 'util.Wc', 'write.Conllu']
+        with tempfile.TemporaryDirectory() as cache_dir:
+            expected = _run(scenario)
+            self.assertEqual(_run(scenario, cache_dir=cache_dir), expected)
+            entries = [f for _, _, files in os.walk(cache_dir) for f in files]
+            self.assertEqual(len(entries), 1)
+            self.assertEqual(_run(scenario, cache_dir=cache_dir), expected)
+            self.assertEqual(_run(scenario, cache_dir=cache_dir, no_cache=True), expected)
+
+            # STDERR output (including log messages) is replayed as well.
+            scenario = ['read.Conllu', 'files=' + filename, 'ud.MarkBugs', 'write.Conllu']
+            results = []
+            for use_cache in (False, True, True):
+                errors = io.StringIO()
+                handler = logging.StreamHandler(errors)
+                logging.root.addHandler(handler)
+                try:
+                    with contextlib.redirect_stderr(errors):
+                        output = _run(scenario, cache_dir=cache_dir, no_cache=not use_cache)
+                        print('done', file=sys.stderr)
+                finally:
+                    logging.root.removeHandler(handler)
+                results.append((output, errors.getvalue()))
+            self.assertIn('ud.MarkBugs Error Overview', results[0][1])
+            self.assertEqual(results[1], results[0])
+            self.assertEqual(results[2], results[0])
+
+            # The replay is announced in the log (the logging level is a part of the cache key).
+            with self.assertLogs(level='INFO') as logs:
+                _run(scenario, cache_dir=cache_dir)
+                _run(scenario, cache_dir=cache_dir)
+            replayed = [line for line in logs.output if 'Replaying cached output from' in line]
+            self.assertEqual(len(replayed), 1)
+
+            # Scenarios writing to files are not cached.
+            out_file = os.path.join(cache_dir, 'out.conllu')
+            _run(scenario[:-1] + ['write.Conllu', 'files=' + out_file], cache_dir=cache_dir)
+            entries = [f for _, _, files in os.walk(cache_dir) for f in files if f.endswith('.gz')]
+            self.assertEqual(len(entries), 3)
+
+    def test_memory_report(self):
+        """Test udapy --memory_report and util.MemStats."""
+        filename = os.path.join(DATA_DIR, 'fr-democrat-dev-sample.conllu')
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            output = _run(['read.Conllu', 'files=' + filename, 'corefud.Load', 'util.MemStats'],
+                          memory_report=True)
+        self.assertIn('round 1: 3 trees, 41 nodes', stderr.getvalue())
+        self.assertIn('peak RSS', stderr.getvalue())
+        lines = output.splitlines()
+        self.assertTrue(lines[-2].startswith('TOTAL'))
+        coref_bytes = float(next(line for line in lines if line.startswith('coref')).split()[1])
+        self.assertGreater(coref_bytes, 0)
+
+    @unittest.skipUnless(importlib.util.find_spec('numpy'), 'NumPy is not installed')
+    def test_arrays(self):
+        """util.SeeArrays and util.WcArrays should print the same results as util.See and util.Wc."""
+        filename = os.path.join(DATA_DIR, 'UD_Czech_sample.conllu')
+        stats = 'stats=dir,edge,depth,children,siblings,p_upos,c_upos,l_form,r_lemma,deprel,feats_split'
+        reader = ['read.Conllu', 'files=' + filename, 'bundles_per_doc=3']
+        expected = _run(reader + ['util.Wc', 'util.See',
+                                  'node=node.upos == "NOUN" and node.feats["Number"] == "Plur"', stats])
+        expected = expected.replace('node.upos == "NOUN" and node.feats["Number"] == "Plur"',
+                                    '(upos == "NOUN") & (feats["Number"] == "Plur")')
+        see_arrays = ['util.SeeArrays', 'node=(upos == "NOUN") & (feats["Number"] == "Plur")', stats]
+        self.assertEqual(_run(reader + ['util.WcArrays'] + see_arrays), expected)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            npz = os.path.join(tmp_dir, 'sample.npz')
+            _run(reader + ['write.Npz', 'files=' + npz])
+            self.assertEqual(_run(['util.WcArrays', 'npz=' + npz] + see_arrays + ['npz=' + npz]), expected)
+
+    def test_mark_feats_bugs(self):
+        """The cached results of ud.*.MarkFeatsBugs should be the same as without the cache."""
+        reader = ['read.Conllu', 'files=' + os.path.join(DATA_DIR, 'UD_Czech_sample.conllu')]
+        for block in ('ud.cs.MarkFeatsBugs', 'ud.la.MarkFeatsBugs', 'ud.ml.MarkFeatsBugs'):
+            expected = _run(reader + [block, 'cache=0', 'write.Conllu'])
+            self.assertIn('Bug=Feat', expected)
+            self.assertEqual(_run(reader + [block, 'write.Conllu']), expected)
+
+    def test_rule_blocks(self):
+        """The memoized decisions of RuleBlock-based blocks should be the same as without memoization."""
+        reader = ['read.Conllu', 'files=' + os.path.join(DATA_DIR, 'UD_Czech_sample.conllu'),
+                  'util.Eval', 'node=if node.ord % 2: node.lemma = "_"']
+        for block in ('ud.Lemmatize', 'ud.FixAdvmodByUpos', 'ud.AddPunctType'):
+            expected = _run(reader + [block, 'memoize=0', 'write.Conllu'])
+            self.assertEqual(_run(reader + [block, 'memoize=1', 'write.Conllu']), expected)
+
+    def test_stream(self):
+        """Streaming of tree-local blocks should produce the same output as processing whole documents."""
+        files = 'files=' + ','.join(os.path.join(DATA_DIR, name)
+                                    for name in ('UD_Czech_sample.conllu', 'fr-democrat-dev-sample.conllu'))
+        for reader in (['read.Conllu', files], ['read.Conllu', files, 'bundles_per_doc=3']):
+            scenario = reader + ['ud.FixPunct', 'ud.Lemmatize', 'write.Conllu']
+            expected = _run(scenario)
+            self.assertEqual(_run(scenario, stream=True), expected)
+            # Mixed scenarios: the tree-local prefix is streamed, the rest gets the whole document.
+            scenario = reader + ['ud.FixPunct', 'util.Eval', 'doc=print(len(doc.bundles))',
+                                 'ud.Lemmatize', 'write.Conllu']
+            expected = _run(scenario)
+            self.assertEqual(_run(scenario, stream=True), expected)
+        # Document-level comments appearing after the first sentence are not used with --stream.
+        babinsky = os.path.join(DATA_DIR, 'babinsky.conllu')
+        scenario = ['read.Conllu', 'files=' + babinsky, 'write.Conllu']
+        expected, streamed = _run(scenario).split('\n'), _run(scenario, stream=True).split('\n')
+        with open(babinsky, encoding='utf-8') as conllu:
+            first_header = conllu.readline().rstrip('\n')
+        self.assertNotEqual(expected[0], first_header)
+        self.assertEqual(streamed[0], first_header)
+        self.assertEqual(streamed[1:], expected[1:])
+        # pylint: disable=protected-access
+        blocks = Run(argparse.Namespace(scenario=reader + ['ud.FixPunct', 'util.Eval', 'doc=pass',
+                                                           'ud.Lemmatize', 'write.Conllu'])).execute()
+        streamed, buffered = Run._streamed_blocks(blocks, [blocks[0][1]])
+        self.assertEqual([type(block).__name__ for block in streamed], ['FixPunct'])
+        self.assertEqual([name for name, _, _ in buffered], ['util.Eval', 'ud.Lemmatize', 'write.Conllu'])
+        blocks = Run(argparse.Namespace(scenario=reader + ['util.Eval', 'node=pass'])).execute()
+        self.assertIsNone(Run._streamed_blocks(blocks, [blocks[0][1]]))
+
+    def test_find_bug(self):
+        """util.FindBug minimize=1 should write a minimal bundle causing the same exception."""
+        crash = 'node=if node.upos == "NOUN" and node.parent.upos == "ADP": 1/0'
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for workers in (1, 2):
+                bug_file = os.path.join(tmp_dir, f'bug{workers}.conllu')
+                with self.assertRaises(ZeroDivisionError):
+                    _run(['read.Conllu', 'files=' + os.path.join(DATA_DIR, 'UD_Czech_sample.conllu'),
+                          'util.FindBug', 'block=util.Eval', 'minimize=1', f'workers={workers}',
+                          'files=' + bug_file, crash])
+                with open(bug_file, encoding='utf-8') as bug:
+                    nodes = [line.split('\t') for line in bug if line[0].isdigit()]
+                self.assertEqual([(n[0], n[3], n[6]) for n in nodes], [('1', 'ADP', '0'), ('2', 'NOUN', '1')])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""Unit tests for udapi.tool.udpipeonline using a local stand-in of the UDPipe REST API."""
+import http.server
+import json
+import re
+import threading
+import time
+import unittest
+import urllib.parse
+
+from udapi.block.udpipe.base import Base
+from udapi.core.document import Document
+from udapi.tool.udpipeonline import UDPipeOnline
+
+
+def _fake_udpipe(params):
+    """Return the result of a fake UDPipe: lemma=lowercased form, each word depends on the previous one."""
+    data = params['data']
+    if params.get('input') == 'conllu':
+        sentences = [[line.split('\t')[1] for line in block.split('\n') if line and line[0].isdigit()]
+                     for block in data.split('\n\n') if block.strip()]
+    elif 'input' in params:
+        sentences = [line.split(' ') for line in data.split('\n') if line]
+    elif params['tokenizer'] == 'presegmented':
+        sentences = [re.findall(r'\w+|[^\w\s]', line) for line in data.split('\n') if line]
+    else:
+        sentences = [re.findall(r'\w+|[^\w\s]', s) for s in re.split(r'(?<=\.)\s+', data.strip())]
+    if params.get('output', '').startswith('plaintext'):
+        return '\n'.join(' '.join(sentence) for sentence in sentences) + '\n'
+    lines = ['# newdoc', '# newpar'] if 'tokenizer' in params else []
+    for sentence in sentences:
+        if 'tokenizer' in params:
+            lines.append('# text = ' + ' '.join(sentence))
+        for i, form in enumerate(sentence, 1):
+            upos = 'PUNCT' if form == '.' else 'X'
+            lines.append(f'{i}\t{form}\t{form.lower()}\t{upos}\t_\t_\t{i - 1}\t{"dep" if i > 1 else "root"}\t_\t_')
+        lines.append('')
+    return '\n'.join(lines) + '\n'
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        length = int(self.headers['Content-Length'])
+        params = dict(urllib.parse.parse_qsl(self.rfile.read(length).decode('utf-8'), keep_blank_values=True))
+        with self.server.lock:
+            self.server.requests.append(params)
+            fail = self.server.failures > 0
+            self.server.failures -= fail
+        if fail:
+            status, body = 503, b'Service temporarily unavailable'
+        else:
+            status = 200
+            body = json.dumps({'model': params['model'], 'result': _fake_udpipe(params)}).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        # Simulate a server closing idle keep-alive connections (without "Connection: close").
+        self.close_connection = self.server.close_idle
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+class TestUDPipeOnline(unittest.TestCase):
+
+    def setUp(self):
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self.server.lock = threading.Lock()
+        self.server.connections, self.server.requests, self.server.failures = 0, [], 0
+        self.server.close_idle = False
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_tag_parse_trees(self):
+        """Batches of trees are sent in parallel requests over persistent connections, with retries."""
+        doc = Document()
+        for i in range(40):
+            doc.create_bundle().create_tree().create_child(form=f'Word{i}').create_child(form='.')
+        roots = list(doc.trees)
+        for root in roots:
+            root.flatten()
+        self.server.failures = 2
+        tool = UDPipeOnline('test', server=self.url, workers=3, batch_chars=50, backoff=0.01)
+        tool.tag_parse_trees(roots)
+        tool.tag_parse_tree(roots[0])
+        tool.close()
+        for i, root in enumerate(roots):
+            word, punct = root.descendants
+            self.assertEqual((word.lemma, word.upos, word.parent, word.deprel), (f'word{i}', 'X', root, 'root'))
+            self.assertEqual((punct.upos, punct.parent, punct.deprel), ('PUNCT', word, 'dep'))
+        batches = self.server.requests[2:]
+        self.assertEqual(sum(len(r['data'].split('\n')) for r in batches), len(roots) + 1)
+        self.assertTrue(all(len(r['data']) <= 50 for r in batches))
+        # One persistent connection for each worker thread and one for the main thread.
+        self.assertLessEqual(self.server.connections, 4)
+
+    def test_stale_connection(self):
+        """A keep-alive connection closed by the server is reopened without any backoff delay."""
+        self.server.close_idle = True
+        tool = UDPipeOnline('test', server=self.url, workers=1, backoff=10)
+        start = time.time()
+        for i in range(3):
+            root = Document().create_bundle().create_tree()
+            root.create_child(form=f'Word{i}')
+            tool.tag_parse_tree(root)
+            self.assertEqual(root.descendants[0].lemma, f'word{i}')
+        tool.close()
+        self.assertLess(time.time() - start, 5)
+        self.assertEqual(len(self.server.requests), 3)
+
+        # Server errors are still retried with the backoff.
+        self.server.failures = 1
+        tool = UDPipeOnline('test', server=self.url, workers=1, backoff=0.2)
+        start = time.time()
+        tool.tag_parse_tree(root)
+        tool.close()
+        self.assertGreaterEqual(time.time() - start, 0.2)
+
+    def test_block(self):
+        """Test udpipe.Base online=1 with tokenization and resegmentation."""
+        texts = ['Hello world.', 'Second sentence. Third one.', 'Last.']
+        doc = Document()
+        for text in texts:
+            doc.create_bundle().create_tree().text = text
+        Base(model='test', online=True, server=self.url, batch_chars=40, zones='').apply_on_document(doc)
+        self.assertEqual([' '.join(n.form for n in t.descendants) for t in doc.trees],
+                         ['Hello world .', 'Second sentence . Third one .', 'Last .'])
+        self.assertEqual(len(self.server.requests), 2)
+
+        Base(model='test', online=True, server=self.url, resegment=True, delete_nodes=True,
+             zones='').apply_on_document(doc)
+        self.assertEqual([b.bundle_id for b in doc.bundles], ['1', '2-1', '2-2', '3'])
+        self.assertEqual(doc.bundles[2].get_tree().text, 'Third one .')
+
+        # With zones=all (default), the whole document is processed by UDPipeOnline.process_document.
+        forms = [[n.form for n in t.descendants] for t in doc.trees]
+        requests = len(self.server.requests)
+        Base(model='test', online=True, server=self.url, tokenize=False, batch_chars=200).apply_on_document(doc)
+        self.assertEqual([[n.form for n in t.descendants] for t in doc.trees], forms)
+        self.assertGreater(len(self.server.requests) - requests, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
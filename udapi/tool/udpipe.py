@@ -53,6 +53,15 @@ class UDPipe:
         # pylint: disable=protected-access
         #root._children, root._descendants = parsed_root._children, parsed_root._descendants
 
+    def tag_parse_trees(self, roots, tag=True, parse=True):
+        """Tag (+lemmatize, fill FEATS) and parse trees (already tokenized)."""
+        for root in roots:
+            self.tag_parse_tree(root, tag=tag, parse=parse)
+
+    def tokenize_tag_parse_trees(self, roots, resegment=False, tag=True, parse=True, ranges=False):
+        """Return a list with the result of `tokenize_tag_parse_tree` for each of the roots."""
+        return [self.tokenize_tag_parse_tree(root, resegment, tag, parse, ranges) for root in roots]
+
     def tokenize_tag_parse_tree(self, root, resegment=False, tag=True, parse=True, ranges=False):
         """Tokenize, tag (+lemmatize, fill FEATS) and parse the text stored in `root.text`.
 
@@ -132,3 +141,7 @@ class UDPipe:
             if is_another:
                 sentences.append(u_sentence.getText())
         return sentences
+
+    def segment_texts(self, texts):
+        """Segment each of the provided texts into sentences."""
+        return [self.segment_text(text) for text in texts]
@@ -1,32 +1,126 @@
-"""Wrapper for UDPipe online web service."""
+"""Wrapper for UDPipe online web service.
+
+The trees are sent to the UDPipe REST API (`/process`) in batches:
+each request contains as many sentences as fit into `batch_chars` characters.
+At most `workers` requests are processed in parallel (using a thread pool),
+each worker thread keeps its own persistent (keep-alive) HTTP connection
+and failed requests (connection errors and HTTP statuses 429, 502, 503, 504)
+are retried `max_retries` times with an exponential backoff.
+If the server has closed an idle keep-alive connection, the request is repeated immediately.
+The results are always applied to the trees in the original order.
+"""
+import concurrent.futures
+import http.client
 import io
-import sys
-import email.mime.multipart
-import email.mime.nonmultipart
-import email.policy
 import json
-import os
 import sys
+import threading
+import time
 import urllib.error
 import urllib.parse
 import urllib.request
 
 from udapi.block.read.conllu import Conllu as ConlluReader
-from udapi.core.root import Root
+
+# HTTP statuses signalling a temporary problem of the service, so that the request can be retried.
+_RETRY_STATUSES = (429, 502, 503, 504)
+
+# Errors caused by the server closing an idle keep-alive connection (RemoteDisconnected is a subclass
+# of ConnectionResetError), the request is then repeated over a new connection without any delay.
+_STALE_CONNECTION_ERRORS = (ConnectionResetError, BrokenPipeError, ConnectionAbortedError)
+
+
+def _read_trees(out_data):
+    conllu_reader = ConlluReader(empty_parent="ignore")
+    conllu_reader.files.filehandle = io.StringIO(out_data)
+    return conllu_reader.read_trees()
+
 
 class UDPipeOnline:
     """Wrapper for UDPipe online web service."""
 
-    def __init__(self, model, server="https://lindat.mff.cuni.cz/services/udpipe/api"):
-        """Create the UDPipeOnline tool object."""
+    # pylint: disable=too-many-arguments,too-many-instance-attributes
+    def __init__(self, model, server="https://lindat.mff.cuni.cz/services/udpipe/api",
+                 workers=4, batch_chars=100_000, max_retries=3, backoff=1.0, timeout=600):
+        """Create the UDPipeOnline tool object.
+
+        Args:
+        model: the name of the UDPipe model (or its prefix, e.g. "en")
+        server: URL of the UDPipe REST API
+        workers: the maximum number of requests processed in parallel
+        batch_chars: the maximum number of characters of sentences sent in one request
+        max_retries: how many times a failed request should be repeated
+        backoff: the number of seconds before the first retry (doubled with each retry)
+        timeout: socket timeout in seconds
+        """
         self.model = model
         self.server = server
+        self.workers = workers
+        self.batch_chars = batch_chars
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self._url = urllib.parse.urlsplit(server)
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._executor = None
 
     def list_models(self):
         with urllib.request.urlopen(self.server + "/models") as request:
             response = json.loads(request.read())
         return list(response["models"].keys())
 
+    def close(self):
+        """Close all the persistent connections and stop the worker threads."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections = []
+        self._local = threading.local()
+
+    def _connection(self):
+        """Return the persistent HTTP connection of the current thread."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            if self._url.scheme == "https":
+                connection = http.client.HTTPSConnection(self._url.netloc, timeout=self.timeout)
+            else:
+                connection = http.client.HTTPConnection(self._url.netloc, timeout=self.timeout)
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def _post(self, method, data, headers):
+        """Send a POST request (with retries) and return the response and its body."""
+        path = f"{self._url.path.rstrip('/')}/{method}"
+        attempt = 0
+        while True:
+            connection = self._connection()
+            reused = connection.sock is not None
+            try:
+                connection.request("POST", path, body=data, headers=headers)
+                response = connection.getresponse()
+                body = response.read()
+            except (OSError, http.client.HTTPException) as exception:
+                # The connection is reopened automatically by the next request.
+                connection.close()
+                if reused and isinstance(exception, _STALE_CONNECTION_ERRORS):
+                    continue
+                if attempt == self.max_retries:
+                    raise
+            else:
+                if response.will_close:
+                    connection.close()
+                if response.status not in _RETRY_STATUSES or attempt == self.max_retries:
+                    return response, body
+            time.sleep(self.backoff * 2 ** attempt)
+            attempt += 1
+
     def perform_request_urlencoded(self, params, method="process"):
         """Perform a request using application/x-www-form-urlencoded to preserve LF newlines.
 
@@ -36,16 +130,15 @@ class UDPipeOnline:
         request_data = urllib.parse.urlencode(params).encode("utf-8")
         request_headers = {"Content-Type": "application/x-www-form-urlencoded; charset=utf-8"}
 
-        try:
-            with urllib.request.urlopen(urllib.request.Request(
-                url=f"{self.server}/{method}", headers=request_headers, data=request_data
-            )) as request:
-                response = json.loads(request.read())
-        except urllib.error.HTTPError as e:
+        response, body = self._post(method, request_data, request_headers)
+        if response.status >= 400:
             print("An exception was raised during UDPipe '{}' REST request.\n"
                   "The service returned the following error:\n"
-                  "  {}".format(method, e.fp.read().decode("utf-8")), file=sys.stderr)
-            raise
+                  "  {}".format(method, body.decode("utf-8", errors="replace")), file=sys.stderr)
+            raise urllib.error.HTTPError(f"{self.server}/{method}", response.status, response.reason,
+                                         response.headers, io.BytesIO(body))
+        try:
+            response = json.loads(body)
         except json.JSONDecodeError as e:
             print("Cannot parse the JSON response of UDPipe '{}' REST request.\n"
                   "  {}".format(method, e.msg), file=sys.stderr)
@@ -56,32 +149,66 @@ class UDPipeOnline:
 
         return response["result"]
 
+    def _perform_requests(self, params_list):
+        """Perform the requests in parallel and return the list of their results (in order)."""
+        if len(params_list) <= 1 or self.workers <= 1:
+            return [self.perform_request_urlencoded(params) for params in params_list]
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.workers)
+        return list(self._executor.map(self.perform_request_urlencoded, params_list))
+
+    def _batches(self, texts):
+        """Split the indices of `texts` (one line each) into batches of at most `batch_chars` characters."""
+        batches, batch, size = [], [], 0
+        for i, text in enumerate(texts):
+            if batch and size + len(text) + 1 > self.batch_chars:
+                batches.append(batch)
+                batch, size = [], 0
+            batch.append(i)
+            size += len(text) + 1
+        if batch:
+            batches.append(batch)
+        return batches
+
     def tag_parse_tree(self, root, tag=True, parse=True):
         """Tag (+lemmatize, fill FEATS) and parse a tree (already tokenized)."""
+        self.tag_parse_trees([root], tag=tag, parse=parse)
+
+    def tag_parse_trees(self, roots, tag=True, parse=True):
+        """Tag (+lemmatize, fill FEATS) and parse trees (already tokenized).
+
+        Many trees are sent in one request and the requests are performed in parallel.
+        """
         if not tag and not parse:
             raise ValueError('tag_parse_tree(root, tag=False, parse=False) does not make sense.')
-        descendants = root.descendants
-        if not descendants:
+        roots = [root for root in roots if root.descendants]
+        if not roots:
             return
-        in_data = " ".join([n.form for n in descendants])
-        params = {"model": self.model, "data": in_data, "input":"horizontal", "tagger":""}
+        lines = [" ".join([n.form for n in root.descendants]) for root in roots]
+        params = {"model": self.model, "input": "horizontal", "tagger": ""}
         attrs = 'upos xpos lemma feats'.split() if tag else []
         if parse:
             params["parser"] = ""
             attrs.append('deprel')
 
-        out_data = self.perform_request_urlencoded(params=params)
-        conllu_reader = ConlluReader(empty_parent="ignore")
-        conllu_reader.files.filehandle = io.StringIO(out_data)
-        parsed_root = conllu_reader.read_tree()
-        if parse:
-            root.flatten()
-        for parsed_node in parsed_root.descendants:
-            node = descendants[parsed_node.ord - 1]
-            if parse:
-                node.parent = descendants[parsed_node.parent.ord - 1] if parsed_node.parent.ord else root
-            for attr in attrs:
-                setattr(node, attr, getattr(parsed_node, attr))
+        batches = self._batches(lines)
+        results = self._perform_requests([dict(params, data="\n".join(lines[i] for i in batch))
+                                          for batch in batches])
+        for batch, out_data in zip(batches, results):
+            parsed_roots = _read_trees(out_data)
+            if len(parsed_roots) != len(batch):
+                raise ValueError(f"UDPipe returned {len(parsed_roots)} sentences instead of {len(batch)}")
+            for i, parsed_root in zip(batch, parsed_roots):
+                root = roots[i]
+                descendants = root.descendants
+                if parse:
+                    root.flatten()
+                for parsed_node in parsed_root.descendants:
+                    node = descendants[parsed_node.ord - 1]
+                    if parse:
+                        node.parent = descendants[parsed_node.parent.ord - 1] if parsed_node.parent.ord else root
+                    for attr in attrs:
+                        setattr(node, attr, getattr(parsed_node, attr))
 
     def tokenize_tag_parse_tree(self, root, resegment=False, tag=True, parse=True, ranges=False):
         """Tokenize, tag (+lemmatize, fill FEATS) and parse the text stored in `root.text`.
@@ -89,31 +216,67 @@ class UDPipeOnline:
         If resegment=True, the returned list of Udapi trees may contain multiple trees.
         If ranges=True, each token will contain `node.misc[TokenRange]` will contain character level 0-based ranges, e.g. `0:2`.
         """
+        return self.tokenize_tag_parse_trees([root], resegment, tag, parse, ranges)[0]
+
+    def tokenize_tag_parse_trees(self, roots, resegment=False, tag=True, parse=True, ranges=False):
+        """Tokenize, tag (+lemmatize, fill FEATS) and parse the texts stored in `root.text` of all roots.
+
+        Return a list with a list of Udapi trees for each of the roots,
+        see `tokenize_tag_parse_tree` for details.
+        Without resegment and ranges, many sentences are sent in one request.
+        The requests are performed in parallel.
+        """
         if parse and not tag:
             raise ValueError('Combination parse=True tag=False is not allowed.')
-        if root.children:
+        if any(root.children for root in roots):
             raise ValueError('Tree already contained nodes before tokenization')
 
         # Tokenize and possibly segment the input text
-        params = {"model": self.model, "data": root.text, "tokenizer":"" if resegment else "presegmented"}
+        params = {"model": self.model, "tokenizer":"" if resegment else "presegmented"}
         if tag:
             params["tagger"] = ""
         if parse:
             params["parser"] = ""
         if ranges:
             params["tokenizer"] = "presegmented;ranges" if resegment else "ranges"
-        out_data = self.perform_request_urlencoded(params=params)
-        conllu_reader = ConlluReader(empty_parent="ignore")
-        conllu_reader.files.filehandle = io.StringIO(out_data)
-        trees = conllu_reader.read_trees()
 
-        # The input "root" object must be the first item in "trees".
+        # With resegment or ranges (the character offsets are relative to the whole data),
+        # and for texts with newlines, each text must be sent in a separate request.
+        results = [[root] for root in roots]
+        batchable, batches = [], []
+        for i, root in enumerate(roots):
+            if not root.text:
+                continue
+            if resegment or ranges or "\n" in root.text:
+                batches.append([i])
+            else:
+                batchable.append(i)
+        batches.extend([[batchable[j] for j in batch] for batch in
+                        self._batches([roots[i].text for i in batchable])])
+        responses = self._perform_requests([dict(params, data="\n".join(roots[i].text for i in batch))
+                                            for batch in batches])
+        for batch, out_data in zip(batches, responses):
+            trees = _read_trees(out_data)
+            if len(batch) == 1:
+                results[batch[0]] = self._adopt_trees(roots[batch[0]], trees)
+                continue
+            if len(trees) != len(batch):
+                raise ValueError(f"UDPipe returned {len(trees)} sentences instead of {len(batch)}")
+            for i, tree in zip(batch, trees):
+                results[i] = self._adopt_trees(roots[i], [tree])
+        return results
+
+    @staticmethod
+    def _adopt_trees(root, trees):
+        """Move the content of trees[0] into the input `root` object and substitute it in `trees`."""
+        # pylint: disable=protected-access
         for attr in ('_children', '_descendants', '_mwts', 'text', 'comment'):
             setattr(root, attr, getattr(trees[0], attr))
         for node in root._children:
             node._parent = root
         for node in root._descendants:
             node._root = root
+        root._version += 1
         trees[0] = root
         return trees
 
@@ -122,8 +285,21 @@ class UDPipeOnline:
         params = {"model": self.model, "data": text, "tokenizer":"", "output": "plaintext=normalized_spaces"}
         return self.perform_request_urlencoded(params=params).rstrip().split("\n")
 
+    def segment_texts(self, texts):
+        """Segment each of the provided texts into sentences, return a list of lists of sentences.
+
+        The requests (one for each text) are performed in parallel.
+        """
+        params = {"model": self.model, "tokenizer": "", "output": "plaintext=normalized_spaces"}
+        results = self._perform_requests([dict(params, data=text) for text in texts])
+        return [result.rstrip().split("\n") for result in results]
+
     def process_document(self, doc, tokenize=True, tag=True, parse=True, resegment=False, ranges=False):
-        """Delete all existing bundles and substitute them with those parsed by UDPipe."""
+        """Delete all existing bundles and substitute them with those parsed by UDPipe.
+
+        Without resegment and ranges, the document is split into batches of sentences,
+        which are sent in parallel requests.
+        """
         if parse and not tag:
             raise ValueError('Combination parse=True tag=False is not allowed.')
         params = {"model": self.model}
@@ -139,14 +315,19 @@ class UDPipeOnline:
             params["input"] = "conllu"
 
         if tokenize:
-            params["data"] = "\n".join(root.text for root in doc.trees) + "\n"
+            chunks, separator = [root.text for root in doc.trees], "\n"
         else:
-            params["data"] = doc.to_conllu_string() + "\n"
-
-        out_data = self.perform_request_urlencoded(params=params)
-        conllu_reader = ConlluReader(empty_parent="ignore")
-        conllu_reader.files.filehandle = io.StringIO(out_data)
-        trees = conllu_reader.read_trees()
+            chunks, separator = [c for c in doc.to_conllu_string().split("\n\n") if c], "\n\n"
+        batches = [list(range(len(chunks)))] if resegment or ranges else self._batches(chunks)
+        responses = self._perform_requests([dict(params, data=separator.join(chunks[i] for i in batch) + separator)
+                                            for batch in batches])
+        trees = []
+        for out_data in responses:
+            batch_trees = _read_trees(out_data)
+            # The UDPipe tokenizer marks the first sentence of each request as a new document and paragraph.
+            if tokenize and trees and batch_trees:
+                batch_trees[0].newdoc, batch_trees[0].newpar = None, None
+            trees.extend(batch_trees)
 
         bundles = list(reversed(doc.bundles))
         for tree in trees: